@@ -197,11 +197,42 @@ STATIC_ROOT = os.path.join(os.path.dirname(BASE_DIR), env("STATIC", default="sta
 ELASTICSEARCH_HOST = env("ELASTICSEARCH_HOST", default="localhost")
 ELASTICSEARCH_PORT = env("ELASTICSEARCH_PORT", default="9200")
 ELASTICSEARCH_DSL = {
-    "default": {"hosts": f"{ELASTICSEARCH_HOST}:{ELASTICSEARCH_PORT}"},
+    "default": {
+        "hosts": f"{ELASTICSEARCH_HOST}:{ELASTICSEARCH_PORT}",
+        # a single client is shared by each process, so its connection pool should be large enough for every thread
+        "maxsize": env.int("ELASTICSEARCH_MAXSIZE", default=25),
+    },
 }
 
 ELASTICSEARCH_DSL_AUTOSYNC = False
 
+# The backend used for editor searches - either "elasticsearch" or "in_memory". The in-memory backend builds an index
+# from the database in each process, which is suitable for small catalogs. Explore searches always use Elasticsearch.
+SEARCH_BACKEND = env("SEARCH_BACKEND", default="elasticsearch")
+# Precise (non-fuzzy) editor searches are exact matches on card names, which the database can answer on its own
+PRECISE_SEARCH_FROM_DATABASE = env.bool("PRECISE_SEARCH_FROM_DATABASE", default=True)
+# Store each serialised card in its search document, so explore searches and `post_cards` can be answered without
+# reading from the database. The search index must be rebuilt after enabling this.
+SERIALISED_CARDS_IN_SEARCH_ENGINE = env.bool("SERIALISED_CARDS_IN_SEARCH_ENGINE", default=False)
+# Route each search document to a shard by its card type, so searches for a single card type only query one shard
+# rather than every shard. The search index must be rebuilt after changing this.
+SEARCH_INDEX_ROUTING_BY_CARD_TYPE = env.bool("SEARCH_INDEX_ROUTING_BY_CARD_TYPE", default=False)
+# Serve the editor, explore, and cardback search endpoints with async views, which query Elasticsearch with an async
+# client. This only helps when the site is served under ASGI (`MPCAutofill.asgi:application`).
+ASYNC_SEARCH_VIEWS = env.bool("ASYNC_SEARCH_VIEWS", default=False)
+
+# Cache settings
+# Search results are cached in the default cache, which is local to each web server process unless `CACHE_URL` points
+# at a cache shared between them (e.g. redis://). The catalog generation (which invalidates cached search results) and
+# the artefacts built at the end of `update_database` are kept in the catalog cache instead, which must be shared
+# between web server workers and management commands and must never evict entries. It only holds a handful of entries,
+# so the database cache never culls it. Run `python manage.py createcachetable` to set it up.
+CACHES = {
+    "default": env.cache("CACHE_URL", default="locmemcache://mpcautofill_cache?max_entries=100000"),
+    "catalog": env.cache("CATALOG_CACHE_URL", default="dbcache://mpcautofill_catalog_cache"),
+}
+SEARCH_RESULTS_CACHE_TIMEOUT = env.int("SEARCH_RESULTS_CACHE_TIMEOUT", default=60 * 60 * 24)  # seconds
+
 # Email for logging
 ADMINS = [("admin", env("TARGET_EMAIL", default=""))]
 EMAIL_BACKEND = "django.core.mail.backends.smtp.EmailBackend"
@@ -8,6 +8,7 @@ from .models import (
     DFCPair,
     Project,
     ProjectMember,
+    SearchIndexOutboxEntry,
     Source,
     Tag,
 )
@@ -72,3 +73,8 @@ class AdminCanonicalExpansion(admin.ModelAdmin[CanonicalExpansion]):
 class AdminCanonicalCard(admin.ModelAdmin[CanonicalCard]):
     list_display = ("identifier", "name", "expansion", "collector_number", "is_default")
     search_fields = ("name",)
+
+
+@admin.register(SearchIndexOutboxEntry)
+class AdminSearchIndexOutboxEntry(admin.ModelAdmin[SearchIndexOutboxEntry]):
+    list_display = ("card_pk", "date_created", "date_available", "attempts")
@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class CardpickerConfig(AppConfig):
     name = "cardpicker"
+
+    def ready(self) -> None:
+        from cardpicker import signals  # noqa: F401  # registers signal receivers
@@ -6,8 +6,35 @@ DEFAULT_LANGUAGE = pycountry.languages.get(alpha_2="EN")
 NEW_CARDS_PAGE_SIZE = 12
 NEW_CARDS_DAYS = 14
 EDITOR_SEARCH_MAX_QUERIES = 300
+EDITOR_SEARCH_STREAM_CHUNK_SIZE = 20  # number of queries searched for together before their results are streamed
+EDITOR_SEARCH_MSEARCH_BATCH_SIZE = 100  # number of queries sent to elasticsearch in each `_msearch` request
+EDITOR_SEARCH_MSEARCH_PAGE_SIZE = 1000  # queries with more hits than this are paged through with a point in time
+EDITOR_SEARCH_PIT_PAGE_SIZE = 5000
+EDITOR_SEARCH_PIT_KEEP_ALIVE = "1m"
+ASYNC_SEARCH_MAX_CONCURRENCY = 4  # number of requests to elasticsearch which an async search view makes at once
+SEARCH_SINGLE_FLIGHT_TIMEOUT = 30  # seconds that a request waits on another request's in-flight search
+SEARCH_SINGLE_FLIGHT_POLL_INTERVAL = 0.05  # seconds between checks for another process' in-flight search
+CATALOG_FILTER_FALSE_POSITIVE_RATE = 0.01
+CATALOG_ARTEFACT_REFRESH_INTERVAL = 10  # seconds between checks for a newer catalog artefact while holding a stale one
+CATALOG_ARTEFACT_REBUILD_INTERVAL = 5 * 60  # minimum seconds between rebuilds of each artefact by outbox drains
+SEARCH_ENGINE_HEALTH_TTL = 10  # seconds that a healthy search engine status is trusted for before being refreshed
 CARDS_PAGE_SIZE = 1000
 EXPLORE_SEARCH_MAX_PAGE_SIZE = 100
+SEARCH_INDEX_BULK_CHUNK_SIZE = 500  # number of documents in each bulk request when rebuilding the search index
+SEARCH_INDEX_QUERYSET_CHUNK_SIZE = 2000  # number of cards fetched from each server-side cursor at a time
+SEARCH_INDEX_BULK_THREAD_COUNT = 4  # number of concurrent bulk requests made when syncing the search index
+SEARCH_INDEX_SYNC_CHUNK_SIZE = 5000  # maximum number of documents in each bulk request when syncing the search index
+SEARCH_INDEX_SYNC_CHUNK_BYTES = 10 * 1024 * 1024  # maximum size of each bulk request when syncing the search index
+SEARCH_INDEX_SUSPEND_REFRESH_THRESHOLD = 5000  # syncs of at least this many cards don't refresh the index until the end
+SEARCH_INDEX_OUTBOX_BATCH_SIZE = 5000  # maximum number of outbox entries synced with the search index at a time
+SEARCH_INDEX_OUTBOX_RETRY_DELAY = 30  # seconds before retrying outbox entries which failed to sync for the first time
+SEARCH_INDEX_OUTBOX_MAX_RETRY_DELAY = 60 * 60  # upper limit on the delay before retrying outbox entries, in seconds
+SEARCH_INDEX_OUTBOX_LEASE = 10 * 60  # seconds that outbox entries are claimed for by the worker syncing them
+AUTOCOMPLETE_DEFAULT_LIMIT = 10
+AUTOCOMPLETE_MAX_LIMIT = 50
+SPELLING_MAX_EDIT_DISTANCE = 2
+SPELLING_PREFIX_LENGTH = 7  # number of characters at the start of each name which spelling mistakes are indexed for
+SPELLING_MAX_SUGGESTIONS = 3
 
 MAX_SIZE_MB = 30
 NSFW = "NSFW"
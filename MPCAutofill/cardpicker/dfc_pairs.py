@@ -4,6 +4,8 @@ from bulk_sync import bulk_sync
 
 from cardpicker.integrations.integrations import get_configured_game_integration
 from cardpicker.models import DFCPair
+from cardpicker.search.caching import bump_catalog_generation
+from cardpicker.search.catalog_filter import update_catalog_filter
 
 
 def sync_dfcs() -> None:
@@ -16,4 +18,6 @@ def sync_dfcs() -> None:
     dfc_pairs = game_integration.get_dfc_pairs()
     key_fields = ("front",)
     bulk_sync(new_models=dfc_pairs, key_fields=key_fields, filters=None, db_class=DFCPair)
+    bump_catalog_generation()
+    update_catalog_filter()  # the catalog filter is only consulted under the generation it was built under
     print(f"Finished importing DFC pairs - this task took {(time.time() - t0):.2f} seconds.")
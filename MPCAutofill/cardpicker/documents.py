@@ -1,7 +1,10 @@
+from typing import Any, Optional
+
 from django_elasticsearch_dsl import Document, fields
 from django_elasticsearch_dsl.registries import registry
 from elasticsearch_dsl import analyzer
 
+from django.conf import settings
 from django.db.models import QuerySet
 
 from cardpicker.models import Card
@@ -15,7 +18,8 @@ fuzzy_analyser = analyzer("fuzzy_analyser", tokenizer="standard", filter=["apost
 
 @registry.register_document
 class CardSearch(Document):
-    source_pk = fields.TextField(attr="get_source_pk", analyzer="keyword")
+    identifier = fields.KeywordField()  # a keyword so that identifiers can be retrieved from doc values
+    source_pk = fields.IntegerField(attr="get_source_pk")  # numeric so that results can be sorted by source order
     searchq_fuzzy = fields.TextField(attr="searchq", analyzer=fuzzy_analyser)
     searchq_precise = fields.TextField(attr="searchq", analyzer=precise_analyser)
     searchq_keyword = fields.KeywordField(attr="searchq")
@@ -26,6 +30,8 @@ class CardSearch(Document):
     tags = fields.KeywordField()  # all elasticsearch fields support arrays by default
     expansion_code = fields.KeywordField(attr="get_expansion_code")
     collector_number = fields.KeywordField(attr="get_collector_number")
+    # stored in `_source` but not indexed. only populated if `settings.SERIALISED_CARDS_IN_SEARCH_ENGINE` is enabled
+    serialised = fields.ObjectField(enabled=False)
 
     class Index:
         # name of the elasticsearch index
@@ -35,8 +41,39 @@ class CardSearch(Document):
 
     class Django:
         model = Card
-        fields = ["identifier", "priority", "dpi", "size"]
+        fields = ["priority", "dpi", "size"]
 
     def get_queryset(self) -> QuerySet[Card]:
         # https://django-elasticsearch-dsl.readthedocs.io/en/latest/fields.html#handle-relationship-with-nestedfield-objectfield
-        return super().get_queryset().select_related("canonical_card", "canonical_card__expansion")
+        return (
+            super()
+            .get_queryset()
+            .select_related(
+                "source",
+                "canonical_card",
+                "canonical_card__expansion",
+                "canonical_card__artist",
+                "canonical_artist",
+                "inferred_canonical_card",
+                "inferred_canonical_card__expansion",
+            )
+        )
+
+    def prepare_serialised(self, instance: Card) -> Optional[dict[str, Any]]:
+        return instance.to_dict() if settings.SERIALISED_CARDS_IN_SEARCH_ENGINE else None
+
+    @classmethod
+    def get_routing(cls, instance: Card) -> Optional[str]:
+        """
+        The routing key of `instance`'s document, which is its card type if `settings.SEARCH_INDEX_ROUTING_BY_CARD_TYPE`
+        is enabled. Documents without a routing key are routed by their id.
+        """
+
+        return instance.card_type if settings.SEARCH_INDEX_ROUTING_BY_CARD_TYPE else None
+
+    def _prepare_action(self, object_instance: Card, action: str) -> dict[str, Any]:
+        # routes the documents indexed by django-elasticsearch-dsl (e.g. by `search_index --rebuild`)
+        prepared_action = super()._prepare_action(object_instance, action)
+        if (routing := self.get_routing(object_instance)) is not None:
+            prepared_action["_routing"] = routing
+        return prepared_action
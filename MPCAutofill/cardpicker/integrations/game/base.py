@@ -15,6 +15,9 @@ from cardpicker.models import (
     DFCPair,
 )
 from cardpicker.schema_types import Game
+from cardpicker.search.caching import bump_catalog_generation
+from cardpicker.search.catalog_filter import update_catalog_filter
+from cardpicker.search.dependencies import get_tracked_state, record_changes_since
 from cardpicker.utils import section_timer
 
 
@@ -151,6 +154,8 @@ class GameIntegration(ABC):
         cards, artists = retrieve_all_cards_and_identifiers()
         bulk_sync_artists(artists_=artists)
         add_cards(cards_=cards)
+        bump_catalog_generation()
+        update_catalog_filter()  # the catalog filter is only consulted under the generation it was built under
 
     @classmethod
     def import_canonical_expansions(cls) -> None:
@@ -161,9 +166,16 @@ class GameIntegration(ABC):
         print(f"Retrieved {len(expansions)} expansions in {round(t1 - t0, 2)} seconds.")
 
         print("Beginning expansion bulk sync...")
+        previous_states = get_tracked_state(CanonicalExpansion)
         bulk_sync(new_models=expansions, key_fields=["identifier"], db_class=CanonicalExpansion, filters=None)
+        # bulk updates don't send signals, so the cards which depend on changed expansions are recorded here
+        recorded = record_changes_since(CanonicalExpansion, previous_states)
+        bump_catalog_generation()
+        update_catalog_filter()
         t2 = time.time()
         print(f"Bulk synced expansions in {round(t2 - t1, 2)} seconds.")
+        if recorded:
+            print(f"Recorded {recorded} cards whose search documents depend on changed expansions.")
 
 
 __all__ = ["ImportSite", "GameIntegration"]
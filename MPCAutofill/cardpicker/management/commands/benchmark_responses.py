@@ -0,0 +1,73 @@
+import json
+import timeit
+from typing import Any
+
+from pydantic import BaseModel
+
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse, JsonResponse
+
+from cardpicker.constants import (
+    CARDS_PAGE_SIZE,
+    EDITOR_SEARCH_MAX_QUERIES,
+    EXPLORE_SEARCH_MAX_PAGE_SIZE,
+    NEW_CARDS_PAGE_SIZE,
+)
+from cardpicker.models import Card, Source, serialise_cards
+from cardpicker.responses import SchemaResponse
+from cardpicker.schema_types import (
+    CardsResponse,
+    EditorSearchResponse,
+    ExploreSearchResponse,
+    NewCardsPageResponse,
+    SourcesResponse,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the time taken to encode the largest response of each endpoint with `JsonResponse` against "
+        "`SchemaResponse`, using the cards in the database."
+    )
+
+    def add_arguments(self, parser) -> None:  # type: ignore
+        parser.add_argument("-n", "--number", type=int, default=100, help="Number of times to encode each response")
+
+    def handle(self, *args: Any, **kwargs: Any) -> None:
+        number: int = kwargs["number"]
+        cards = serialise_cards(Card.objects.order_by("pk")[:CARDS_PAGE_SIZE])
+        if not cards:
+            print("There are no cards in the database to benchmark with.")
+            return
+        identifiers = [card.identifier for card in cards]
+        responses: dict[str, BaseModel] = {
+            "post_cards": CardsResponse(results={card.identifier: card for card in cards}),
+            "post_editor_search": EditorSearchResponse(
+                results={f"query {i}": identifiers[: len(identifiers) // 10] for i in range(EDITOR_SEARCH_MAX_QUERIES)}
+            ),
+            "post_explore_search": ExploreSearchResponse(
+                cards=cards[:EXPLORE_SEARCH_MAX_PAGE_SIZE], count=len(cards), cursor="cursor"
+            ),
+            "get_new_cards_page": NewCardsPageResponse(cards=cards[:NEW_CARDS_PAGE_SIZE]),
+            "get_sources": SourcesResponse(
+                results={str(source.pk): source.serialise() for source in Source.objects.order_by("ordinal", "pk")}
+            ),
+        }
+
+        print(f"Encoding each response {number:,d} times ({len(cards):,d} cards)")
+        print(f"{'Endpoint':<24}{'JsonResponse (ms)':>20}{'SchemaResponse (ms)':>22}{'Speedup':>10}")
+        for endpoint, model in responses.items():
+
+            def encode_with_json_response() -> HttpResponse:
+                return JsonResponse(model.model_dump())
+
+            def encode_with_schema_response() -> HttpResponse:
+                return SchemaResponse(model)
+
+            assert json.loads(encode_with_json_response().content) == json.loads(encode_with_schema_response().content)
+            json_response_time = timeit.timeit(encode_with_json_response, number=number) / number * 1000
+            schema_response_time = timeit.timeit(encode_with_schema_response, number=number) / number * 1000
+            print(
+                f"{endpoint:<24}{json_response_time:>20.3f}{schema_response_time:>22.3f}"
+                f"{json_response_time / schema_response_time:>9.1f}x"
+            )
@@ -0,0 +1,102 @@
+import random
+import re
+import string
+import time
+from typing import Any, Callable
+
+from django.core.management.base import BaseCommand
+
+from cardpicker.search.sanitisation import to_searchable, to_searchable_many
+
+NAMES = [
+    "Lightning Bolt",
+    "Black Lotus",
+    "Kodama’s Reach",
+    "Adanto, the First Fort",
+    "Huntmaster of the Fells",
+    "Ravager of the Fells",
+    "Past in Flames",
+    "Delver of Secrets",
+    "Insectile Aberration",
+    "Jace, the Mind Sculptor",
+    "Fire // Ice",
+    "Who/What/When/Where/Why",
+    "Juzám Djinn",
+    "Æther Vial",
+    "Urza's Saga",
+    "Sol Ring",
+    "Island",
+    "Mountain",
+    "Treasure",
+    "消灭邪物",
+]
+ARTISTS = ["Rebecca Guay", "Terese Nielsen", "John Avon", "Seb McKinnon", "Chilli_Axe", "Mark Tedin"]
+TAGS = ["NSFW", "Full Art", "Extended", "Borderless", "EN", "DE", "JP"]
+
+
+def to_searchable_reference(input_str: str) -> str:
+    """
+    The implementation of `to_searchable` before its regular expressions and translation tables were precompiled.
+    """
+
+    if not input_str:
+        return ""
+    input_str = input_str.lower()
+    input_str = re.sub(r"[\(\[].*?[\)\]]", "", input_str)
+    input_str = input_str.replace("-", " ").replace("’", "'")
+    input_str = input_str.translate(str.maketrans("", "", string.punctuation))
+    input_str = input_str.translate(str.maketrans("", "", string.digits))
+    return re.sub(r"\s+", " ", input_str).strip()
+
+
+def generate_file_name(rng: random.Random) -> str:
+    """
+    Generate a file name shaped like the names of images in the sources we index, without its extension.
+    """
+
+    name = rng.choice(NAMES)
+    if rng.random() < 0.2:
+        name = f"{rng.randint(1, 4)}. {name}"  # ordered basics and tokens
+    if rng.random() < 0.6:
+        name += f" ({rng.choice(ARTISTS)})"
+    if rng.random() < 0.3:
+        name += f" [{', '.join(rng.sample(TAGS, k=rng.randint(1, 3)))}]"
+    if rng.random() < 0.1:
+        name = f"  {name} - Copy"
+    return name
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the time taken to normalise a large number of realistic card file names with `to_searchable` and "
+        "`to_searchable_many` against the original implementation, and checks that their output is identical."
+    )
+
+    def add_arguments(self, parser) -> None:  # type: ignore
+        parser.add_argument("-n", "--number", type=int, default=1_000_000, help="Number of file names to normalise")
+        parser.add_argument("-s", "--seed", type=int, default=0, help="Seed for generating file names")
+
+    def handle(self, *args: Any, **kwargs: Any) -> None:
+        number: int = kwargs["number"]
+        rng = random.Random(kwargs["seed"])
+        names = [generate_file_name(rng) for _ in range(number)]
+
+        implementations: dict[str, Callable[[list[str]], list[str]]] = {
+            "reference": lambda input_strs: [to_searchable_reference(input_str) for input_str in input_strs],
+            "to_searchable": lambda input_strs: [to_searchable(input_str) for input_str in input_strs],
+            "to_searchable_many": to_searchable_many,
+        }
+        print(f"Normalising {number:,d} file names")
+        print(f"{'Implementation':<24}{'Time (s)':>12}{'Names per second':>20}{'Speedup':>10}")
+        expected, reference_time = None, None
+        for implementation_name, implementation in implementations.items():
+            t0 = time.perf_counter()
+            results = implementation(names)
+            elapsed = time.perf_counter() - t0
+            if expected is None:
+                expected, reference_time = results, elapsed
+            assert results == expected, f"{implementation_name} does not match the reference implementation"
+            print(
+                f"{implementation_name:<24}{elapsed:>12.3f}{number / elapsed:>20,.0f}"
+                f"{(reference_time or elapsed) / elapsed:>9.1f}x"
+            )
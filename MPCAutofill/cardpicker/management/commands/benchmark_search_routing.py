@@ -0,0 +1,145 @@
+import random
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+
+from elasticsearch_dsl import MultiSearch
+
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from cardpicker.constants import EDITOR_SEARCH_MSEARCH_PAGE_SIZE
+from cardpicker.models import Card, Source
+from cardpicker.schema_types import CardType, SearchQuery, SearchSettings
+from cardpicker.search.indexing import (
+    create_versioned_index,
+    finish_loading_index,
+    populate_index,
+)
+from cardpicker.search.search_functions import (
+    get_editor_search,
+    get_elasticsearch_connection,
+    ping_elasticsearch,
+)
+
+# the share of the queries in each editor search which are for tokens - the rest are for cards
+TOKEN_QUERY_PROPORTION = 0.1
+
+
+def get_search_settings() -> SearchSettings:
+    return SearchSettings.model_validate(
+        {
+            "searchTypeSettings": {"fuzzySearch": True, "filterCardbacks": False},
+            "sourceSettings": {
+                "sources": [[pk, True] for pk in Source.objects.order_by("ordinal", "pk").values_list("pk", flat=True)]
+            },
+            "filterSettings": {
+                "minimumDPI": 0,
+                "maximumDPI": 1500,
+                "maximumSize": 30,
+                "languages": [],
+                "includesTags": [],
+                "excludesTags": [],
+            },
+        }
+    )
+
+
+def generate_requests(rng: random.Random, request_count: int, query_count: int) -> list[list[SearchQuery]]:
+    """
+    Generate editor searches for the names of cards and tokens in the database, each with `query_count` queries.
+    """
+
+    names = {
+        card_type: list(Card.objects.filter(card_type=card_type.name).values_list("searchq", flat=True).distinct())
+        for card_type in [CardType.CARD, CardType.TOKEN]
+    }
+    requests: list[list[SearchQuery]] = []
+    for _ in range(request_count):
+        request: list[SearchQuery] = []
+        for _ in range(query_count):
+            card_type = (
+                CardType.TOKEN if rng.random() < TOKEN_QUERY_PROPORTION and names[CardType.TOKEN] else CardType.CARD
+            )
+            request.append(SearchQuery(query=rng.choice(names[card_type]), cardType=card_type))
+        requests.append(request)
+    return requests
+
+
+class Command(BaseCommand):
+    help = (
+        "Compares the throughput of concurrent editor searches against a search index whose documents are routed to "
+        "shards by card type with one whose documents aren't, using the cards in the database. Both indices are built "
+        "for the benchmark and deleted afterwards."
+    )
+
+    def add_arguments(self, parser) -> None:  # type: ignore
+        parser.add_argument("-r", "--requests", type=int, default=200, help="Number of editor searches to make")
+        parser.add_argument("-q", "--queries", type=int, default=100, help="Number of queries in each editor search")
+        parser.add_argument("-c", "--concurrency", type=int, default=8, help="Number of editor searches made at once")
+        parser.add_argument("-s", "--seed", type=int, default=0, help="Seed for choosing the names searched for")
+
+    def handle(self, *args: Any, **kwargs: Any) -> None:
+        if not ping_elasticsearch():
+            raise Exception("Elasticsearch is offline!")
+        if not Card.objects.filter(card_type=CardType.CARD.name).exists():
+            print("There are no cards in the database to benchmark with.")
+            return
+        requests = generate_requests(random.Random(kwargs["seed"]), kwargs["requests"], kwargs["queries"])
+        search_settings = get_search_settings()
+        es = get_elasticsearch_connection()
+
+        print(
+            f"Making {kwargs['requests']:,d} editor searches of {kwargs['queries']:,d} queries each, "
+            f"{kwargs['concurrency']:,d} at a time ({Card.objects.count():,d} cards)"
+        )
+        print(f"{'Routing':<24}{'Searches/s':>12}{'Queries/s':>12}{'Mean (ms)':>12}{'p95 (ms)':>12}")
+        results: dict[bool, list[list[list[str]]]] = {}
+        for routed in [False, True]:
+            # the search index and searches are only routed while the setting is overridden
+            with override_settings(SEARCH_INDEX_ROUTING_BY_CARD_TYPE=routed):
+                index_name = create_versioned_index(es)
+                try:
+                    populate_index(es, index_name)
+                    finish_loading_index(es, index_name)
+                    # searches are built before they're timed, so only time spent in elasticsearch is measured
+                    bodies = []
+                    for request in requests:
+                        multi_search = MultiSearch(index=index_name)
+                        for search_query in request:
+                            multi_search = multi_search.add(
+                                get_editor_search(search_settings=search_settings, search_query=search_query).extra(
+                                    size=EDITOR_SEARCH_MSEARCH_PAGE_SIZE
+                                )
+                            )
+                        bodies.append(multi_search.to_dict())
+
+                    def search(body: list[dict[str, Any]]) -> tuple[float, list[list[str]]]:
+                        t0 = time.perf_counter()
+                        response = es.msearch(index=index_name, body=body)
+                        elapsed = time.perf_counter() - t0
+                        return elapsed, [
+                            sorted(hit["fields"]["identifier"][0] for hit in query_response["hits"]["hits"])
+                            for query_response in response["responses"]
+                        ]
+
+                    with ThreadPoolExecutor(max_workers=kwargs["concurrency"]) as pool:
+                        # warm up each shard's caches before timing
+                        list(pool.map(search, bodies[: kwargs["concurrency"] * 2]))
+                        t0 = time.perf_counter()
+                        timed = list(pool.map(search, bodies))
+                        elapsed = time.perf_counter() - t0
+                finally:
+                    es.indices.delete(index=index_name, ignore=404)
+
+            latencies = [latency * 1000 for latency, _ in timed]
+            p95_latency = statistics.quantiles(latencies, n=20)[-1] if len(latencies) > 1 else latencies[0]
+            results[routed] = [identifiers for _, identifiers in timed]
+            print(
+                f"{'By card type' if routed else 'By document id':<24}"
+                f"{len(bodies) / elapsed:>12.1f}{len(bodies) * kwargs['queries'] / elapsed:>12.1f}"
+                f"{statistics.mean(latencies):>12.2f}{p95_latency:>12.2f}"
+            )
+        if results[False] != results[True]:
+            raise Exception("Routed and unrouted searches returned different results!")
@@ -0,0 +1,36 @@
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from cardpicker.constants import SEARCH_INDEX_OUTBOX_BATCH_SIZE
+from cardpicker.search.indexing import drain_search_index_outbox
+from cardpicker.search.search_functions import ping_elasticsearch
+from cardpicker.utils import TEXT_BOLD, TEXT_END
+
+
+class Command(BaseCommand):
+    help = (
+        "Writes the changes to cards recorded in the search index outbox (e.g. edits made in the admin panel) to the "
+        "search index."
+    )
+
+    def add_arguments(self, parser) -> None:  # type: ignore
+        parser.add_argument(
+            "-b",
+            "--batch-size",
+            type=int,
+            default=SEARCH_INDEX_OUTBOX_BATCH_SIZE,
+            help="Maximum number of outbox entries synced with the search index at a time",
+        )
+
+    def handle(self, *args: Any, **kwargs: Any) -> None:
+        if not ping_elasticsearch():
+            raise Exception("Elasticsearch is offline!")
+        t0 = time.time()
+        drained = drain_search_index_outbox(batch_size=kwargs["batch_size"])
+        if drained:
+            print(
+                f"Synced {TEXT_BOLD}{drained}{TEXT_END} search index outbox entries in "
+                f"{TEXT_BOLD}{(time.time() - t0):.2f}{TEXT_END} seconds."
+            )
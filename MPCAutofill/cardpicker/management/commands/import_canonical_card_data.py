@@ -3,6 +3,7 @@ from typing import Any
 from django.core.management.base import BaseCommand
 
 from cardpicker.integrations.integrations import get_configured_game_integration
+from cardpicker.search.autocomplete import update_autocomplete_index
 
 
 class Command(BaseCommand):
@@ -14,3 +15,6 @@ class Command(BaseCommand):
             raise Exception("No game integration is configured.")
         game_integration.import_canonical_expansions()
         game_integration.import_canonical_cards_and_artists()
+        print("Rebuilding the autocomplete index...")
+        index = update_autocomplete_index()
+        print(f"The autocomplete index holds {len(index):,} names.")
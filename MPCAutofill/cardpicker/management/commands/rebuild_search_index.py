@@ -0,0 +1,56 @@
+import functools
+import time
+from typing import Any
+
+from django.core.management.base import BaseCommand
+
+from cardpicker.documents import CardSearch
+from cardpicker.search.indexing import populate_index_in_parallel, rebuild_search_index
+from cardpicker.search.search_functions import ping_elasticsearch
+from cardpicker.utils import TEXT_BOLD, TEXT_END
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuilds the search index without downtime. A new index is built and validated in the background, then "
+        "swapped in for the current one."
+    )
+
+    def add_arguments(self, parser) -> None:  # type: ignore
+        parser.add_argument(
+            "-k", "--keep-old-indices", action="store_true", help="Don't delete the indices which were swapped out"
+        )
+        parser.add_argument(
+            "-p",
+            "--processes",
+            type=int,
+            default=1,
+            help="Number of processes to build documents in, each loading a range of cards",
+        )
+        parser.add_argument(
+            "-t", "--threads", type=int, default=4, help="Number of concurrent bulk requests made by each process"
+        )
+
+    def handle(self, *args: Any, **kwargs: Any) -> None:
+        if not ping_elasticsearch():
+            raise Exception("Elasticsearch is offline!")
+        print(
+            f"Rebuilding the search index {TEXT_BOLD}{CardSearch.Index.name}{TEXT_END} with "
+            f"{TEXT_BOLD}{kwargs['processes']}{TEXT_END} processes and {TEXT_BOLD}{kwargs['threads']}{TEXT_END} "
+            f"bulk requests per process...",
+            end="",
+            flush=True,
+        )
+        t0 = time.time()
+        index_name, document_count = rebuild_search_index(
+            populate=functools.partial(
+                populate_index_in_parallel, process_count=kwargs["processes"], thread_count=kwargs["threads"]
+            ),
+            keep_old_indices=kwargs["keep_old_indices"],
+        )
+        elapsed = time.time() - t0
+        print(
+            f" and done! Indexed {TEXT_BOLD}{document_count:,}{TEXT_END} cards into {TEXT_BOLD}{index_name}{TEXT_END} "
+            f"in {TEXT_BOLD}{elapsed:.2f}{TEXT_END} seconds ({TEXT_BOLD}{document_count / elapsed:,.0f}{TEXT_END} "
+            f"documents per second)."
+        )
@@ -0,0 +1,35 @@
+# Generated by Django 4.2.27 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+from cardpicker.search.sanitisation import to_precise_search_key
+
+BATCH_SIZE = 1000
+
+
+def populate_searchq_precise(apps, schema_editor):  # type: ignore  # TODO
+    Card = apps.get_model("cardpicker", "Card")
+    cards = []
+    for card in Card.objects.only("pk", "searchq").iterator(chunk_size=BATCH_SIZE):
+        card.searchq_precise = to_precise_search_key(card.searchq)
+        cards.append(card)
+        if len(cards) >= BATCH_SIZE:
+            Card.objects.bulk_update(cards, ["searchq_precise"])
+            cards = []
+    Card.objects.bulk_update(cards, ["searchq_precise"])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cardpicker", "0049_card_canonical_artist"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="card",
+            name="searchq_precise",
+            field=models.CharField(db_index=True, default="", max_length=200),
+        ),
+        migrations.RunPython(populate_searchq_precise, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 4.2.27 on 2026-10-17 14:05
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def create_schedules(apps, schema_editor):  # type: ignore  # TODO
+    Schedule = apps.get_model("django_q", "Schedule")
+    Schedule.objects.create(
+        name="drain_search_index_outbox",
+        func="django.core.management.call_command",
+        args="'drain_search_index_outbox'",
+        schedule_type="I",
+        minutes=1,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cardpicker", "0050_card_searchq_precise"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="SearchIndexOutboxEntry",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("card_pk", models.BigIntegerField()),
+                ("date_created", models.DateTimeField(default=django.utils.timezone.now)),
+                ("date_available", models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ("attempts", models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.RunPython(create_schedules),
+    ]
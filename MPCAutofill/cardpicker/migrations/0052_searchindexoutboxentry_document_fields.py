@@ -0,0 +1,21 @@
+# Generated by Django 4.2.27 on 2026-10-17 16:30
+
+import django.contrib.postgres.fields
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("cardpicker", "0051_searchindexoutboxentry"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="searchindexoutboxentry",
+            name="document_fields",
+            field=django.contrib.postgres.fields.ArrayField(
+                base_field=models.CharField(max_length=50), blank=True, default=list, size=None
+            ),
+        ),
+    ]
@@ -2,7 +2,7 @@ import itertools
 import uuid
 from collections import defaultdict
 from datetime import datetime
-from typing import Any, Optional
+from typing import Any, Iterable, Optional, Type
 
 from django.contrib.auth.models import User
 from django.contrib.postgres.fields import ArrayField
@@ -18,6 +18,8 @@ from cardpicker.schema_types import CardType, ChildElement, Game
 from cardpicker.schema_types import Source as SerialisedSource
 from cardpicker.schema_types import SourceContribution, SourceType
 from cardpicker.schema_types import Tag as SerialisedTag
+from cardpicker.search.sanitisation import to_precise_search_key
+from cardpicker.sources.source_types import SourceType as SourceTypeImplementation
 from cardpicker.sources.source_types import SourceTypeChoices
 
 
@@ -258,6 +260,8 @@ class Card(models.Model):
     folder_location = models.CharField(max_length=300)
     dpi = models.IntegerField(default=0)
     searchq = models.CharField(max_length=200)
+    # `searchq` as normalised by elasticsearch's `precise_analyser`, which allows precise searches to be answered here
+    searchq_precise = models.CharField(max_length=200, db_index=True, default="")
     extension = models.CharField(max_length=200)
     date_created = models.DateTimeField(default=datetime.now)
     date_modified = models.DateTimeField(default=datetime.now)
@@ -284,39 +288,66 @@ class Card(models.Model):
             f"Priority: {self.priority}]"
         )
 
+    def save(self, *args: Any, **kwargs: Any) -> None:
+        # keep the precise search key in step with `searchq` however the card is edited (e.g. in the admin panel)
+        self.searchq_precise = to_precise_search_key(self.searchq)
+        if (update_fields := kwargs.get("update_fields")) is not None and "searchq" in update_fields:
+            kwargs["update_fields"] = {*update_fields, "searchq_precise"}
+        super().save(*args, **kwargs)
+
     def serialise(self) -> SerialisedCard:
+        return self.serialise_with_related(
+            source=self.source,
+            source_type=self.get_source_type(),
+            source_type_implementation=SourceTypeChoices.get_source_type(self.get_source_type_choices()),
+            canonical_card=(
+                self.canonical_card.serialise()
+                if self.canonical_card
+                else (self.inferred_canonical_card.serialise() if self.inferred_canonical_card else None)
+            ),
+            canonical_artist=(
+                self.canonical_artist.serialise()
+                if self.canonical_artist
+                else (self.canonical_card.artist.serialise() if self.canonical_card else None)
+            ),
+        )
+
+    def serialise_with_related(
+        self,
+        source: Source,
+        source_type: SourceType,
+        source_type_implementation: Type[SourceTypeImplementation],
+        canonical_card: Optional[SerialisedCanonicalCard],
+        canonical_artist: Optional[SerialisedCanonicalArtist],
+    ) -> SerialisedCard:
+        """
+        Serialise this card given its related objects, which lets `serialise_cards` load them in bulk.
+        """
+
         return SerialisedCard(
             identifier=self.identifier,
             cardType=CardType(self.card_type),
             name=self.name,
             priority=self.priority,
             # TODO: consider only including source_pk here. reference the other data from sourceDocuments in frontend
-            source=self.source.key,
-            sourceName=self.source.name,
-            sourceId=self.source.pk,
+            source=source.key,
+            sourceName=source.name,
+            sourceId=source.pk,
             sourceVerbose=self.source_verbose,
-            sourceType=self.get_source_type(),
-            sourceExternalLink=self.get_source_external_link(),
+            sourceType=source_type,
+            sourceExternalLink=source.external_link or None,
             dpi=self.dpi,
             searchq=self.searchq,
             extension=self.extension,
             dateCreated=dateformat.format(self.date_created, DATE_FORMAT),
             dateModified=dateformat.format(self.date_modified, DATE_FORMAT),
             size=self.size,
-            smallThumbnailUrl=self.get_small_thumbnail_url() or "",
-            mediumThumbnailUrl=self.get_medium_thumbnail_url() or "",
+            smallThumbnailUrl=source_type_implementation.get_small_thumbnail_url(self.identifier) or "",
+            mediumThumbnailUrl=source_type_implementation.get_medium_thumbnail_url(self.identifier) or "",
             tags=sorted(self.tags),
             language=self.language,
-            canonicalCard=(
-                self.canonical_card.serialise()
-                if self.canonical_card
-                else (self.inferred_canonical_card.serialise() if self.inferred_canonical_card else None)
-            ),
-            canonicalArtist=(
-                self.canonical_artist.serialise()
-                if self.canonical_artist
-                else (self.canonical_card.artist.serialise() if self.canonical_card else None)
-            ),
+            canonicalCard=canonical_card,
+            canonicalArtist=canonical_artist,
         )
 
     def to_dict(self) -> dict[str, Any]:
@@ -357,6 +388,58 @@ class Card(models.Model):
         ordering = ["-priority"]
 
 
+def serialise_cards(cards: Iterable[Card]) -> list[SerialisedCard]:
+    """
+    Equivalent to calling `serialise` on each of `cards`, but the related objects of every card are loaded in a fixed
+    number of queries (rather than several per card), and each source's details are only resolved once.
+    """
+
+    cards = list(cards)
+    sources = Source.objects.in_bulk({card.source_id for card in cards})
+    source_types = {pk: SourceType(SourceTypeChoices[source.source_type].label) for pk, source in sources.items()}
+    source_type_implementations = {
+        pk: SourceTypeChoices.get_source_type(SourceTypeChoices.from_source_type_schema(source_type))
+        for pk, source_type in source_types.items()
+    }
+    canonical_cards = CanonicalCard.objects.select_related("expansion", "artist").in_bulk(
+        {card.canonical_card_id for card in cards if card.canonical_card_id is not None}
+        | {card.inferred_canonical_card_id for card in cards if card.inferred_canonical_card_id is not None}
+    )
+    serialised_canonical_cards = {pk: canonical_card.serialise() for pk, canonical_card in canonical_cards.items()}
+    serialised_canonical_artists = {
+        pk: canonical_artist.serialise()
+        for pk, canonical_artist in CanonicalArtist.objects.in_bulk(
+            {card.canonical_artist_id for card in cards if card.canonical_artist_id is not None}
+        ).items()
+    } | {canonical_card.artist_id: canonical_card.artist.serialise() for canonical_card in canonical_cards.values()}
+
+    serialised_cards: list[SerialisedCard] = []
+    for card in cards:
+        canonical_card_id = (
+            card.canonical_card_id if card.canonical_card_id is not None else card.inferred_canonical_card_id
+        )
+        if card.canonical_artist_id is not None:
+            canonical_artist_id = card.canonical_artist_id
+        elif card.canonical_card_id is not None:
+            canonical_artist_id = canonical_cards[card.canonical_card_id].artist_id
+        else:
+            canonical_artist_id = None
+        serialised_cards.append(
+            card.serialise_with_related(
+                source=sources[card.source_id],
+                source_type=source_types[card.source_id],
+                source_type_implementation=source_type_implementations[card.source_id],
+                canonical_card=(
+                    serialised_canonical_cards[canonical_card_id] if canonical_card_id is not None else None
+                ),
+                canonical_artist=(
+                    serialised_canonical_artists[canonical_artist_id] if canonical_artist_id is not None else None
+                ),
+            )
+        )
+    return serialised_cards
+
+
 class Tag(models.Model):
     name = models.CharField(unique=True)
     # null=True is just for admin panel
@@ -504,6 +587,27 @@ class ProjectMember(models.Model):
         }
 
 
+class SearchIndexOutboxEntry(models.Model):
+    """
+    Records that a card (or a row its search document depends on) has been created, updated or deleted since it was last
+    written to the search index. Entries are written in the same transaction as the change, and drained into the search
+    index in the background by `drain_search_index_outbox`.
+    """
+
+    # not a foreign key, since the entries of deleted cards must outlive them
+    card_pk = models.BigIntegerField()
+    # the fields of the card's search document to update, for changes to the rows it depends on (e.g. its canonical
+    # card). empty if the whole document should be indexed (or deleted, if the card no longer exists)
+    document_fields = ArrayField(models.CharField(max_length=50), default=list, blank=True)
+    date_created = models.DateTimeField(default=timezone.now)
+    # entries which fail to sync are retried after a delay which grows with each attempt
+    date_available = models.DateTimeField(default=timezone.now, db_index=True)
+    attempts = models.PositiveIntegerField(default=0)
+
+    def __str__(self) -> str:
+        return f"Card {self.card_pk}, recorded {self.date_created}, {self.attempts} failed attempts"
+
+
 __all__ = [
     "Faces",
     "CardTypes",
@@ -515,9 +619,11 @@ __all__ = [
     "Source",
     "summarise_contributions",
     "Card",
+    "serialise_cards",
     "Tag",
     "DFCPair",
     "get_default_cardback",
     "Project",
     "ProjectMember",
+    "SearchIndexOutboxEntry",
 ]
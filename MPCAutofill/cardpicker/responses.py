@@ -0,0 +1,23 @@
+from typing import Any, Optional
+
+from pydantic import BaseModel
+
+from django.http import HttpResponse
+
+
+class SchemaResponse(HttpResponse):
+    """
+    An HTTP response whose body is a `schema_types` model encoded as JSON.
+
+    `JsonResponse(model.model_dump())` converts the model to a dict and then encodes the dict with the standard
+    library's encoder. This response encodes the model straight to bytes with pydantic's (compiled) serialiser instead.
+    The bodies decode to the same JSON, although the bytes differ - this response uses compact separators and doesn't
+    escape non-ASCII characters.
+    """
+
+    def __init__(self, model: BaseModel, exclude: Optional[set[str]] = None, **kwargs: Any) -> None:
+        kwargs.setdefault("content_type", "application/json")
+        super().__init__(content=model.model_dump_json(exclude=exclude), **kwargs)
+
+
+__all__ = ["SchemaResponse"]
@@ -177,6 +177,21 @@ class SearchSettings(BaseModel):
         return result
 
 
+class AutocompleteResponse(BaseModel):
+    completions: List[str]
+
+    @staticmethod
+    def from_dict(obj: Any) -> "AutocompleteResponse":
+        assert isinstance(obj, dict)
+        completions = from_list(from_str, obj.get("completions"))
+        return AutocompleteResponse(completions)
+
+    def to_dict(self) -> dict:
+        result: dict = {}
+        result["completions"] = from_list(from_str, self.completions)
+        return result
+
+
 class CardbacksRequest(BaseModel):
     searchSettings: SearchSettings
 
@@ -531,33 +546,47 @@ class SearchQuery(BaseModel):
 class EditorSearchRequest(BaseModel):
     queries: Dict[str, SearchQuery]
     searchSettings: SearchSettings
+    suggest: Optional[bool] = None
+    """Whether to suggest alternative names for queries which have no results."""
 
     @staticmethod
     def from_dict(obj: Any) -> "EditorSearchRequest":
         assert isinstance(obj, dict)
         queries = from_dict(SearchQuery.from_dict, obj.get("queries"))
         searchSettings = SearchSettings.from_dict(obj.get("searchSettings"))
-        return EditorSearchRequest(queries, searchSettings)
+        suggest = from_union([from_bool, from_none], obj.get("suggest"))
+        return EditorSearchRequest(queries, searchSettings, suggest)
 
     def to_dict(self) -> dict:
         result: dict = {}
         result["queries"] = from_dict(lambda x: to_class(SearchQuery, x), self.queries)
         result["searchSettings"] = to_class(SearchSettings, self.searchSettings)
+        if self.suggest is not None:
+            result["suggest"] = from_union([from_bool, from_none], self.suggest)
         return result
 
 
 class EditorSearchResponse(BaseModel):
     results: Dict[str, List[str]]
+    suggestions: Optional[Dict[str, List[str]]] = None
+    """Alternative names for each query which has no results. Only included when requested."""
 
     @staticmethod
     def from_dict(obj: Any) -> "EditorSearchResponse":
         assert isinstance(obj, dict)
         results = from_dict(lambda x: from_list(from_str, x), obj.get("results"))
-        return EditorSearchResponse(results)
+        suggestions = from_union(
+            [lambda x: from_dict(lambda x: from_list(from_str, x), x), from_none], obj.get("suggestions")
+        )
+        return EditorSearchResponse(results, suggestions)
 
     def to_dict(self) -> dict:
         result: dict = {}
         result["results"] = from_dict(lambda x: from_list(from_str, x), self.results)
+        if self.suggestions is not None:
+            result["suggestions"] = from_union(
+                [lambda x: from_dict(lambda x: from_list(from_str, x), x), from_none], self.suggestions
+            )
         return result
 
 
@@ -601,6 +630,9 @@ class ExploreSearchRequest(BaseModel):
     pageStart: int
     searchSettings: SearchSettings
     sortBy: SortBy
+    cursor: Optional[str] = None
+    """The cursor returned with the previous page of results. When specified, `pageStart` is ignored."""
+
     query: Optional[str] = None
 
     @staticmethod
@@ -611,8 +643,9 @@ class ExploreSearchRequest(BaseModel):
         pageStart = from_int(obj.get("pageStart"))
         searchSettings = SearchSettings.from_dict(obj.get("searchSettings"))
         sortBy = SortBy(obj.get("sortBy"))
+        cursor = from_union([from_str, from_none], obj.get("cursor"))
         query = from_union([from_none, from_str], obj.get("query"))
-        return ExploreSearchRequest(cardTypes, pageSize, pageStart, searchSettings, sortBy, query)
+        return ExploreSearchRequest(cardTypes, pageSize, pageStart, searchSettings, sortBy, cursor, query)
 
     def to_dict(self) -> dict:
         result: dict = {}
@@ -621,6 +654,8 @@ class ExploreSearchRequest(BaseModel):
         result["pageStart"] = from_int(self.pageStart)
         result["searchSettings"] = to_class(SearchSettings, self.searchSettings)
         result["sortBy"] = to_enum(SortBy, self.sortBy)
+        if self.cursor is not None:
+            result["cursor"] = from_union([from_str, from_none], self.cursor)
         result["query"] = from_union([from_none, from_str], self.query)
         return result
 
@@ -628,18 +663,23 @@ class ExploreSearchRequest(BaseModel):
 class ExploreSearchResponse(BaseModel):
     cards: List[Card]
     count: int
+    cursor: Optional[str] = None
+    """Pass this in the next request to retrieve the following page of results. Omitted on the last page."""
 
     @staticmethod
     def from_dict(obj: Any) -> "ExploreSearchResponse":
         assert isinstance(obj, dict)
         cards = from_list(Card.from_dict, obj.get("cards"))
         count = from_int(obj.get("count"))
-        return ExploreSearchResponse(cards, count)
+        cursor = from_union([from_str, from_none], obj.get("cursor"))
+        return ExploreSearchResponse(cards, count, cursor)
 
     def to_dict(self) -> dict:
         result: dict = {}
         result["cards"] = from_list(lambda x: to_class(Card, x), self.cards)
         result["count"] = from_int(self.count)
+        if self.cursor is not None:
+            result["cursor"] = from_union([from_str, from_none], self.cursor)
         return result
 
 
@@ -1320,6 +1360,14 @@ def Tagtodict(x: Tag) -> Any:
     return to_class(Tag, x)
 
 
+def AutocompleteResponsefromdict(s: Any) -> AutocompleteResponse:
+    return AutocompleteResponse.from_dict(s)
+
+
+def AutocompleteResponsetodict(x: AutocompleteResponse) -> Any:
+    return to_class(AutocompleteResponse, x)
+
+
 def CardbacksRequestfromdict(s: Any) -> CardbacksRequest:
     return CardbacksRequest.from_dict(s)
 
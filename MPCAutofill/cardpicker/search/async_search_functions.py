@@ -0,0 +1,187 @@
+"""
+Async equivalents of the Elasticsearch functions in `search_functions`, which let the async search views wait on the
+search engine without blocking a worker. Searches are built with `elasticsearch_dsl` as usual, then sent with
+`AsyncElasticsearch` rather than executed by `elasticsearch_dsl`'s (synchronous) client.
+"""
+
+import asyncio
+from typing import Any, AsyncGenerator, Awaitable, Callable, Optional, TypeVar, cast
+
+from elasticsearch import AsyncElasticsearch
+from elasticsearch.exceptions import TransportError
+from elasticsearch_dsl import MultiSearch
+from elasticsearch_dsl.response import Response
+
+from django.conf import settings
+
+from cardpicker.constants import (
+    ASYNC_SEARCH_MAX_CONCURRENCY,
+    EDITOR_SEARCH_MSEARCH_BATCH_SIZE,
+    EDITOR_SEARCH_MSEARCH_PAGE_SIZE,
+    EDITOR_SEARCH_PIT_KEEP_ALIVE,
+    EDITOR_SEARCH_PIT_PAGE_SIZE,
+)
+from cardpicker.documents import CardSearch
+from cardpicker.schema_types import SearchQuery, SearchSettings
+from cardpicker.search.search_functions import (
+    elastic_errors,
+    get_editor_search,
+    get_identifiers,
+    get_search_routing,
+)
+
+AF = TypeVar("AF", bound=Callable[..., Awaitable[Any]])
+
+# aiohttp sessions can only be used from the event loop they were created in
+async_connections: dict[asyncio.AbstractEventLoop, tuple[AsyncElasticsearch, AsyncGenerator[None, None]]] = {}
+
+
+async def close_on_loop_shutdown(es: AsyncElasticsearch) -> AsyncGenerator[None, None]:
+    """
+    Closes `es` when this generator is finalised. Event loops finalise the async generators which are still suspended
+    when they shut down (with `loop.shutdown_asyncgens`, which `asyncio.run` calls - so the loops created by ASGI
+    servers and by `async_to_sync` both do), so this closes `es` when the loop it was created in shuts down.
+    """
+
+    try:
+        yield
+    finally:
+        async_connections.pop(asyncio.get_running_loop(), None)
+        await es.close()
+
+
+async def get_async_elasticsearch_connection() -> AsyncElasticsearch:
+    """
+    The async Elasticsearch client for the running event loop, configured by `settings.ELASTICSEARCH_DSL`. The client
+    is closed when the loop shuts down.
+    """
+
+    loop = asyncio.get_running_loop()
+    if (connection := async_connections.get(loop)) is None:
+        es = AsyncElasticsearch(**settings.ELASTICSEARCH_DSL["default"])
+        closer = close_on_loop_shutdown(es)
+        await closer.asend(None)  # the loop only tracks async generators once they've started
+        connection = async_connections[loop] = (es, closer)
+    return connection[0]
+
+
+def async_elastic_connection(func: AF) -> AF:
+    """
+    The async equivalent of `elastic_connection`.
+    """
+
+    async def wrapper(*args: Any, **kwargs: Any) -> Any:
+        with elastic_errors():
+            return await func(*args, **kwargs)
+
+    return cast(AF, wrapper)
+
+
+@async_elastic_connection
+async def async_execute_search(s: CardSearch) -> Response:
+    es = await get_async_elasticsearch_connection()
+    return Response(s, await es.search(index=CardSearch.Index.name, body=s.to_dict(), **s._params))
+
+
+async def async_page_card_identifiers(
+    search_settings: SearchSettings, search_query: SearchQuery, semaphore: asyncio.Semaphore
+) -> list[str]:
+    """
+    The async equivalent of `page_card_identifiers`. Each page is requested while holding `semaphore`.
+    """
+
+    es = await get_async_elasticsearch_connection()
+    async with semaphore:
+        pit_id = (
+            await es.open_point_in_time(
+                index=CardSearch.Index.name,
+                keep_alive=EDITOR_SEARCH_PIT_KEEP_ALIVE,
+                routing=get_search_routing([search_query.cardType]),
+            )
+        )["id"]
+    # searches against a point in time must not specify an index or a routing key (pages are requested with their body
+    # alone, so the routing key isn't sent)
+    s = get_editor_search(search_settings=search_settings, search_query=search_query).index()
+    identifiers: list[str] = []
+    search_after: Optional[list[Any]] = None
+    try:
+        while True:
+            page_search = s.extra(
+                size=EDITOR_SEARCH_PIT_PAGE_SIZE,
+                pit={"id": pit_id, "keep_alive": EDITOR_SEARCH_PIT_KEEP_ALIVE},
+                **({"search_after": search_after} if search_after is not None else {}),
+            )
+            async with semaphore:
+                page = Response(page_search, await es.search(body=page_search.to_dict()))
+            identifiers += get_identifiers(page.hits)
+            pit_id = page.pit_id  # elasticsearch may return a new id for the point in time with each page
+            if len(page.hits) < EDITOR_SEARCH_PIT_PAGE_SIZE:
+                break
+            # point in time searches add an implicit tiebreaker to the sort, so this identifies a unique hit
+            search_after = list(page.hits[-1].meta.sort)
+    finally:
+        await es.close_point_in_time(body={"id": pit_id})
+    return identifiers
+
+
+@async_elastic_connection
+async def async_search_card_identifiers_batch(
+    search_settings: SearchSettings, queries: list[SearchQuery]
+) -> list[list[str]]:
+    """
+    The async equivalent of `search_card_identifiers_batch`. Each `_msearch` request, and each query which needs to be
+    paged through with a point in time, is sent concurrently - with at most `ASYNC_SEARCH_MAX_CONCURRENCY` requests
+    to Elasticsearch in flight at once.
+    Results are returned in the same order as `queries`.
+    """
+
+    es = await get_async_elasticsearch_connection()
+    semaphore = asyncio.Semaphore(ASYNC_SEARCH_MAX_CONCURRENCY)
+
+    async def search_batch(batch: list[SearchQuery]) -> list[list[str]]:
+        searches = [
+            get_editor_search(search_settings=search_settings, search_query=search_query).extra(
+                size=EDITOR_SEARCH_MSEARCH_PAGE_SIZE
+            )
+            for search_query in batch
+        ]
+        multi_search = MultiSearch(index=CardSearch.Index.name)
+        for s in searches:
+            multi_search = multi_search.add(s)
+        async with semaphore:
+            responses = await es.msearch(index=CardSearch.Index.name, body=multi_search.to_dict())
+
+        async def get_results(search_query: SearchQuery, s: CardSearch, raw_response: dict[str, Any]) -> list[str]:
+            # as in `MultiSearch.execute`
+            if raw_response.get("error", False):
+                raise TransportError("N/A", raw_response["error"]["type"], raw_response["error"])
+            response = Response(s, raw_response)
+            if response.hits.total.value > len(response.hits):
+                return await async_page_card_identifiers(
+                    search_settings=search_settings, search_query=search_query, semaphore=semaphore
+                )
+            return get_identifiers(response.hits)
+
+        return await asyncio.gather(
+            *(
+                get_results(search_query=search_query, s=s, raw_response=raw_response)
+                for search_query, s, raw_response in zip(batch, searches, responses["responses"])
+            )
+        )
+
+    batch_results = await asyncio.gather(
+        *(
+            search_batch(queries[i : i + EDITOR_SEARCH_MSEARCH_BATCH_SIZE])
+            for i in range(0, len(queries), EDITOR_SEARCH_MSEARCH_BATCH_SIZE)
+        )
+    )
+    return [results for batch in batch_results for results in batch]
+
+
+__all__ = [
+    "get_async_elasticsearch_connection",
+    "async_elastic_connection",
+    "async_execute_search",
+    "async_page_card_identifiers",
+    "async_search_card_identifiers_batch",
+]
@@ -0,0 +1,98 @@
+"""
+A prefix index over the names in the catalog, which lets typeahead requests be answered without querying the search
+engine or the database.
+
+The index is a sorted array of search keys (names passed through `to_searchable` and `to_precise_search_key`), with a
+name to display for each key. Canonical card names are preferred for display, falling back on the normalised names of
+cards in the database. Completing a prefix is a binary search for the first key which starts with the prefix, followed
+by a scan over the keys after it.
+
+The index is rebuilt at the end of `update_database`, `import_canonical_card_data` and `drain_search_index_outbox`, and
+stamped with the catalog generation at that time. Requests are served from the latest index which has been published,
+even if the catalog generation has changed since, so they never wait on a rebuild. It's only built within a request if
+no index has been published yet.
+"""
+
+import bisect
+
+from cardpicker.models import CanonicalCard, Card
+from cardpicker.search.caching import (
+    CatalogArtefactMemo,
+    get_catalog_generation,
+    publish_catalog_artefact,
+)
+from cardpicker.search.sanitisation import to_precise_search_key, to_searchable
+
+AUTOCOMPLETE_INDEX_KEY = "autocomplete-index"
+
+
+def get_autocomplete_key(input_str: str) -> str:
+    return to_precise_search_key(to_searchable(input_str))
+
+
+class AutocompleteIndex:
+    def __init__(self, keys: list[str], names: list[str]) -> None:
+        self.keys = keys
+        self.names = names
+
+    @classmethod
+    def build(cls) -> "AutocompleteIndex":
+        names: dict[str, str] = {}
+        for name in CanonicalCard.objects.values_list("name", flat=True).distinct().iterator(chunk_size=10_000):
+            if key := get_autocomplete_key(name):
+                names.setdefault(key, name)
+        for searchq in Card.objects.values_list("searchq", flat=True).distinct().iterator(chunk_size=10_000):
+            # `searchq` has already been passed through `to_searchable`
+            if key := to_precise_search_key(searchq):
+                names.setdefault(key, searchq)
+        keys = sorted(names.keys())
+        return cls(keys=keys, names=[names[key] for key in keys])
+
+    def __len__(self) -> int:
+        return len(self.keys)
+
+    def complete(self, prefix: str, limit: int) -> list[str]:
+        """
+        Retrieve the names of up to `limit` entries whose search keys start with `prefix`'s, in alphabetical order of
+        their search keys. An exact match for `prefix` is always first, since it sorts before any longer key.
+        """
+
+        if not (key := get_autocomplete_key(prefix)):
+            return []
+        start = bisect.bisect_left(self.keys, key)
+        completions: list[str] = []
+        for i in range(start, min(start + limit, len(self.keys))):
+            if not self.keys[i].startswith(key):
+                break
+            completions.append(self.names[i])
+        return completions
+
+
+def update_autocomplete_index() -> AutocompleteIndex:
+    """
+    Rebuild the autocomplete index against the current contents of the database and publish it to the catalog cache.
+    """
+
+    generation = get_catalog_generation()
+    index = AutocompleteIndex.build()
+    publish_catalog_artefact(AUTOCOMPLETE_INDEX_KEY, generation, (index.keys, index.names))
+    return index
+
+
+autocomplete_index: CatalogArtefactMemo[AutocompleteIndex] = CatalogArtefactMemo(
+    key=AUTOCOMPLETE_INDEX_KEY, load=lambda stored: AutocompleteIndex(*stored), build=update_autocomplete_index
+)
+
+
+def get_autocomplete_index(generation: int) -> AutocompleteIndex:
+    """
+    Returns the latest autocomplete index which has been published, which may have been built under an earlier catalog
+    generation than `generation`.
+    """
+
+    if (held := autocomplete_index.get(generation=generation)) is None:
+        return AutocompleteIndex.build()  # the published index couldn't be read from the catalog cache
+    return held[1]
+
+
+__all__ = ["AutocompleteIndex", "update_autocomplete_index", "autocomplete_index", "get_autocomplete_index"]
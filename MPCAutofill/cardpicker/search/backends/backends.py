@@ -0,0 +1,18 @@
+from typing import Type
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+
+from cardpicker.search.backends.base import SearchBackend
+from cardpicker.search.backends.elastic import ElasticsearchSearchBackend
+from cardpicker.search.backends.in_memory import InMemorySearchBackend
+
+
+def get_configured_search_backend() -> Type[SearchBackend]:
+    search_backends: list[Type[SearchBackend]] = [ElasticsearchSearchBackend, InMemorySearchBackend]
+    backends = {backend.get_name(): backend for backend in search_backends}
+    if (backend := backends.get(settings.SEARCH_BACKEND)) is None:
+        raise ImproperlyConfigured(
+            f"Unknown search backend {settings.SEARCH_BACKEND}. Must be one of {', '.join(backends.keys())}."
+        )
+    return backend
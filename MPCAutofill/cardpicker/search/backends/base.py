@@ -0,0 +1,204 @@
+from abc import ABC, abstractmethod
+from typing import Optional
+
+from asgiref.sync import sync_to_async
+
+from cardpicker.schema_types import CardType, SearchQuery, SearchSettings
+from cardpicker.search.caching import (
+    SearchResultsCache,
+    aget_catalog_generation,
+    async_search_single_flight,
+    search_single_flight,
+)
+from cardpicker.search.catalog_filter import (
+    BloomFilter,
+    aget_catalog_filter,
+    get_catalog_filter,
+    may_match,
+)
+
+
+class SearchBackend(ABC):
+    """
+    Abstract base class for a search backend. These retrieve the identifiers of the cards which match editor search
+    queries. Every backend is expected to return the same results in the same order - cards are ordered by the
+    position of their source in the user's search settings, then by priority (descending).
+
+    Search results are cached independently of the configured backend.
+    """
+
+    # region abstract methods
+
+    @staticmethod
+    @abstractmethod
+    def get_name() -> str:
+        """
+        The name used to select this backend with `settings.SEARCH_BACKEND`.
+        """
+
+        ...
+
+    @classmethod
+    @abstractmethod
+    def ensure_available(cls) -> None:
+        """
+        Raises an exception from `SearchExceptions` if this backend can't currently serve searches.
+        """
+
+        ...
+
+    @classmethod
+    @abstractmethod
+    def search_card_identifiers_batch(
+        cls, search_settings: SearchSettings, queries: list[SearchQuery]
+    ) -> list[list[str]]:
+        """
+        Retrieve every hit for each of `queries`, bypassing the search results cache.
+        Results are returned in the same order as `queries`.
+        """
+
+        ...
+
+    # endregion
+
+    @classmethod
+    def retrieve_card_identifiers(
+        cls,
+        search_settings: SearchSettings,
+        query: str,
+        card_type: CardType,
+        expansion_code: str | None = None,
+        collector_number: str | None = None,
+    ) -> list[str]:
+        return cls.retrieve_card_identifiers_batch(
+            search_settings=search_settings,
+            queries=[
+                SearchQuery(
+                    query=query, cardType=card_type, expansionCode=expansion_code, collectorNumber=collector_number
+                )
+            ],
+        )[0]
+
+    @classmethod
+    async def async_search_card_identifiers_batch(
+        cls, search_settings: SearchSettings, queries: list[SearchQuery]
+    ) -> list[list[str]]:
+        """
+        The async equivalent of `search_card_identifiers_batch`. By default, this runs the synchronous search in a
+        worker thread - backends with an async client should override it.
+        """
+
+        return await sync_to_async(cls.search_card_identifiers_batch)(search_settings=search_settings, queries=queries)
+
+    @classmethod
+    def retrieve_card_identifiers_batch(
+        cls, search_settings: SearchSettings, queries: list[SearchQuery]
+    ) -> list[list[str]]:
+        """
+        Equivalent to calling `retrieve_card_identifiers` for each of `queries`, but the queries which miss the
+        search results cache are searched for together. Results are returned in the same order as `queries`.
+        """
+
+        search_results_cache = SearchResultsCache(search_settings=search_settings)
+        cache_keys = cls.get_card_keys(search_results_cache=search_results_cache, queries=queries)
+        # queries which are guaranteed to have no hits don't need to be searched for (or cached)
+        results = cls.get_unmatchable_results(
+            bloom_filter=get_catalog_filter(generation=search_results_cache.generation),
+            search_settings=search_settings,
+            cache_keys=cache_keys,
+            queries=queries,
+        )
+        results |= search_results_cache.get_many([cache_key for cache_key in cache_keys if cache_key not in results])
+        # identical queries share a cache key, so this also ensures each distinct query is only searched for once
+        uncached_queries = {
+            cache_key: search_query for cache_key, search_query in zip(cache_keys, queries) if cache_key not in results
+        }
+        if uncached_queries:
+
+            def search(keys: list[str]) -> dict[str, list[str]]:
+                return dict(
+                    zip(
+                        keys,
+                        cls.search_card_identifiers_batch(
+                            search_settings=search_settings, queries=[uncached_queries[key] for key in keys]
+                        ),
+                    )
+                )
+
+            # concurrent requests for the same queries wait on one search rather than each searching
+            results |= search_single_flight.search(search_results_cache, uncached_queries.keys(), search)
+        return [results[cache_key] for cache_key in cache_keys]
+
+    @classmethod
+    async def async_retrieve_card_identifiers_batch(
+        cls, search_settings: SearchSettings, queries: list[SearchQuery]
+    ) -> list[list[str]]:
+        """
+        The async equivalent of `retrieve_card_identifiers_batch`. The search results cache is read and written, and
+        concurrent searches are waited on, without blocking the event loop.
+        """
+
+        search_results_cache = SearchResultsCache(
+            search_settings=search_settings, generation=await aget_catalog_generation()
+        )
+        cache_keys = cls.get_card_keys(search_results_cache=search_results_cache, queries=queries)
+        results = cls.get_unmatchable_results(
+            bloom_filter=await aget_catalog_filter(generation=search_results_cache.generation),
+            search_settings=search_settings,
+            cache_keys=cache_keys,
+            queries=queries,
+        )
+        results |= await search_results_cache.aget_many(
+            [cache_key for cache_key in cache_keys if cache_key not in results]
+        )
+        uncached_queries = {
+            cache_key: search_query for cache_key, search_query in zip(cache_keys, queries) if cache_key not in results
+        }
+        if uncached_queries:
+
+            async def search(keys: list[str]) -> dict[str, list[str]]:
+                return dict(
+                    zip(
+                        keys,
+                        await cls.async_search_card_identifiers_batch(
+                            search_settings=search_settings, queries=[uncached_queries[key] for key in keys]
+                        ),
+                    )
+                )
+
+            results |= await async_search_single_flight.search(search_results_cache, uncached_queries.keys(), search)
+        return [results[cache_key] for cache_key in cache_keys]
+
+    @staticmethod
+    def get_card_keys(search_results_cache: SearchResultsCache, queries: list[SearchQuery]) -> list[str]:
+        return [
+            search_results_cache.get_card_key(
+                query=search_query.query,
+                card_type=search_query.cardType,
+                expansion_code=search_query.expansionCode,
+                collector_number=search_query.collectorNumber,
+            )
+            for search_query in queries
+        ]
+
+    @staticmethod
+    def get_unmatchable_results(
+        bloom_filter: Optional[BloomFilter],
+        search_settings: SearchSettings,
+        cache_keys: list[str],
+        queries: list[SearchQuery],
+    ) -> dict[str, list[str]]:
+        """
+        Returns empty results for each of `queries` which `bloom_filter` guarantees has no hits, by cache key.
+        """
+
+        if bloom_filter is None:
+            return {}
+        return {
+            cache_key: []
+            for cache_key, search_query in zip(cache_keys, queries)
+            if not may_match(bloom_filter=bloom_filter, search_settings=search_settings, search_query=search_query)
+        }
+
+
+__all__ = ["SearchBackend"]
@@ -0,0 +1,95 @@
+import asyncio
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+
+from cardpicker.schema_types import SearchQuery, SearchSettings
+from cardpicker.search.async_search_functions import async_search_card_identifiers_batch
+from cardpicker.search.backends.base import SearchBackend
+from cardpicker.search.search_functions import (
+    ensure_search_engine_is_available,
+    query_precise_card_identifiers_batch,
+    search_card_identifiers_batch,
+)
+
+
+class ElasticsearchSearchBackend(SearchBackend):
+    """
+    Searches the Elasticsearch index defined by `CardSearch`.
+    Precise searches are exact matches, so unless `settings.PRECISE_SEARCH_FROM_DATABASE` is disabled,
+    they're answered from the database instead.
+    """
+
+    @staticmethod
+    def get_name() -> str:
+        return "elasticsearch"
+
+    @classmethod
+    def ensure_available(cls) -> None:
+        ensure_search_engine_is_available()
+
+    @classmethod
+    def search_card_identifiers_batch(
+        cls, search_settings: SearchSettings, queries: list[SearchQuery]
+    ) -> list[list[str]]:
+        if search_settings.searchTypeSettings.fuzzySearch or not settings.PRECISE_SEARCH_FROM_DATABASE:
+            return search_card_identifiers_batch(search_settings=search_settings, queries=queries)
+
+        database_queries, elasticsearch_queries = cls.partition_queries(queries=queries)
+        results: dict[int, list[str]] = {}
+        if database_queries:
+            results.update(
+                zip(
+                    database_queries.keys(),
+                    query_precise_card_identifiers_batch(
+                        search_settings=search_settings, queries=list(database_queries.values())
+                    ),
+                )
+            )
+        if elasticsearch_queries:
+            results.update(
+                zip(
+                    elasticsearch_queries.keys(),
+                    search_card_identifiers_batch(
+                        search_settings=search_settings, queries=list(elasticsearch_queries.values())
+                    ),
+                )
+            )
+        return [results[i] for i in range(len(queries))]
+
+    @classmethod
+    async def async_search_card_identifiers_batch(
+        cls, search_settings: SearchSettings, queries: list[SearchQuery]
+    ) -> list[list[str]]:
+        if search_settings.searchTypeSettings.fuzzySearch or not settings.PRECISE_SEARCH_FROM_DATABASE:
+            return await async_search_card_identifiers_batch(search_settings=search_settings, queries=queries)
+
+        # the database and elasticsearch are queried concurrently
+        database_queries, elasticsearch_queries = cls.partition_queries(queries=queries)
+        database_results, elasticsearch_results = await asyncio.gather(
+            sync_to_async(query_precise_card_identifiers_batch)(
+                search_settings=search_settings, queries=list(database_queries.values())
+            ),
+            async_search_card_identifiers_batch(
+                search_settings=search_settings, queries=list(elasticsearch_queries.values())
+            ),
+        )
+        results = dict(zip(database_queries.keys(), database_results)) | dict(
+            zip(elasticsearch_queries.keys(), elasticsearch_results)
+        )
+        return [results[i] for i in range(len(queries))]
+
+    @staticmethod
+    def partition_queries(queries: list[SearchQuery]) -> tuple[dict[int, SearchQuery], dict[int, SearchQuery]]:
+        """
+        Split `queries` (by index) into those which are answered from the database and those which are answered by
+        elasticsearch. Empty queries match every card, so they're left to elasticsearch.
+        """
+
+        database_queries = {i: search_query for i, search_query in enumerate(queries) if search_query.query}
+        elasticsearch_queries = {i: search_query for i, search_query in enumerate(queries) if i not in database_queries}
+        return database_queries, elasticsearch_queries
+
+
+__all__ = ["ElasticsearchSearchBackend"]
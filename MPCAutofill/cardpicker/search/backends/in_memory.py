@@ -0,0 +1,240 @@
+"""
+An in-process search backend for deployments which don't want to run Elasticsearch.
+
+The index is built from the `Card` table at the end of `update_database` and `drain_search_index_outbox`, and the
+rows it's built from are published to the catalog cache. Each process builds its index from the latest rows which have
+been published in a background thread, and serves its current index in the meantime, so searches never wait on a
+rebuild. It's only built within a request if no rows have been published yet.
+"""
+
+from array import array
+from bisect import bisect_left
+from typing import Any, Callable, Hashable, Iterable, Iterator, Optional, Sequence
+
+from cardpicker.models import Card
+from cardpicker.schema_types import SearchQuery, SearchSettings
+from cardpicker.search.backends.base import SearchBackend
+from cardpicker.search.caching import (
+    CatalogArtefactMemo,
+    get_catalog_generation,
+    publish_catalog_artefact,
+)
+from cardpicker.search.sanitisation import (
+    to_fuzzy_search_tokens,
+    to_precise_search_key,
+    to_searchable,
+)
+from cardpicker.search.search_functions import (
+    get_enabled_languages,
+    get_enabled_source_pks,
+    get_scaled_maximum_size,
+    get_source_order,
+)
+
+IN_MEMORY_INDEX_KEY = "in-memory-index"
+
+
+class CategoricalColumn:
+    """
+    Stores one of a small number of distinct values for each row as an index into a table of those values.
+    """
+
+    def __init__(self) -> None:
+        self.values: list[Any] = []
+        self.value_codes: dict[Hashable, int] = {}
+        self.codes = array("I")
+
+    def append(self, value: Hashable) -> None:
+        if (code := self.value_codes.get(value)) is None:
+            code = self.value_codes[value] = len(self.values)
+            self.values.append(value)
+        self.codes.append(code)
+
+    def get_value(self, row: int) -> Any:
+        return self.values[self.codes[row]]
+
+    def get_filter(self, predicate: Callable[[Any], bool]) -> tuple[array[int], set[int]]:
+        """
+        Returns this column's codes and the set of codes whose values satisfy `predicate`.
+        """
+
+        return self.codes, {code for code, value in enumerate(self.values) if predicate(value)}
+
+
+def contains_sorted(postings: array[int], row: int) -> bool:
+    i = bisect_left(postings, row)
+    return i < len(postings) and postings[i] == row
+
+
+class InMemoryIndex:
+    """
+    Inverted indexes over the fuzzy and precise forms of each card's `searchq`, and compact columns for the
+    fields which searches are filtered on. Rows are ordered by priority (descending) so the rows which match a query
+    are already in the order Elasticsearch would return them in before being ordered by source.
+    """
+
+    def __init__(self, cards: Iterable[tuple[Any, ...]]) -> None:
+        self.identifiers: list[str] = []
+        self.dpis = array("l")
+        self.sizes = array("q")
+        self.sources = CategoricalColumn()
+        self.card_types = CategoricalColumn()
+        self.languages = CategoricalColumn()
+        self.tags = CategoricalColumn()
+        self.expansion_codes = CategoricalColumn()
+        self.collector_numbers = CategoricalColumn()
+        self.fuzzy_postings: dict[str, array[int]] = {}
+        self.precise_postings: dict[str, array[int]] = {}
+
+        for row, (
+            identifier,
+            source_pk,
+            searchq,
+            card_type,
+            dpi,
+            size,
+            language,
+            tags,
+            expansion_code,
+            collector_number,
+        ) in enumerate(cards):
+            self.identifiers.append(identifier)
+            self.dpis.append(dpi)
+            self.sizes.append(size)
+            self.sources.append(source_pk)
+            self.card_types.append(card_type)
+            self.languages.append(to_precise_search_key(language))
+            self.tags.append(frozenset(tags))
+            self.expansion_codes.append(expansion_code.upper() if expansion_code else None)
+            self.collector_numbers.append(collector_number)
+            for token in set(to_fuzzy_search_tokens(searchq)):
+                self.fuzzy_postings.setdefault(token, array("I")).append(row)
+            if precise_search_key := to_precise_search_key(searchq):
+                self.precise_postings.setdefault(precise_search_key, array("I")).append(row)
+
+    @staticmethod
+    def get_rows() -> Iterator[tuple[Any, ...]]:
+        return (
+            Card.objects.order_by("-priority", "pk")
+            .values_list(
+                "identifier",
+                "source_id",
+                "searchq",
+                "card_type",
+                "dpi",
+                "size",
+                "language",
+                "tags",
+                "canonical_card__expansion__code",
+                "canonical_card__collector_number",
+            )
+            .iterator(chunk_size=10_000)
+        )
+
+    @classmethod
+    def build(cls) -> "InMemoryIndex":
+        return cls(cls.get_rows())
+
+    def get_candidate_rows(self, search_settings: SearchSettings, query: Optional[str]) -> Sequence[int]:
+        """
+        The rows which match `query`, in ascending order.
+        """
+
+        if not query:
+            return range(len(self.identifiers))
+        query_parsed = to_searchable(query)
+        if not search_settings.searchTypeSettings.fuzzySearch:
+            return self.precise_postings.get(to_precise_search_key(query_parsed), [])
+
+        # the query's words are combined with the AND operator
+        tokens = set(to_fuzzy_search_tokens(query_parsed))
+        if not tokens or any(token not in self.fuzzy_postings for token in tokens):
+            return []
+        smallest, *others = sorted((self.fuzzy_postings[token] for token in tokens), key=len)
+        return [row for row in smallest if all(contains_sorted(postings, row) for postings in others)]
+
+    def search(self, search_settings: SearchSettings, search_query: SearchQuery) -> list[str]:
+        filter_settings = search_settings.filterSettings
+        source_pks = set(get_enabled_source_pks(search_settings))
+        card_type = search_query.cardType.value
+        filters = [
+            self.sources.get_filter(lambda value: value in source_pks),
+            self.card_types.get_filter(lambda value: value == card_type),
+        ]
+        if search_query.expansionCode:
+            expansion_code = search_query.expansionCode.upper()
+            filters.append(self.expansion_codes.get_filter(lambda value: value == expansion_code))
+        if search_query.collectorNumber:
+            collector_number = search_query.collectorNumber
+            filters.append(self.collector_numbers.get_filter(lambda value: value == collector_number))
+        if filter_settings.languages:
+            languages = set(get_enabled_languages(search_settings))
+            filters.append(self.languages.get_filter(lambda value: value in languages))
+        if filter_settings.includesTags:
+            includes_tags = set(filter_settings.includesTags)
+            filters.append(self.tags.get_filter(lambda value: not includes_tags.isdisjoint(value)))
+        if filter_settings.excludesTags:
+            excludes_tags = set(filter_settings.excludesTags)
+            filters.append(self.tags.get_filter(lambda value: excludes_tags.isdisjoint(value)))
+
+        minimum_dpi, maximum_dpi = filter_settings.minimumDPI, filter_settings.maximumDPI
+        maximum_size = get_scaled_maximum_size(search_settings)
+        rows = [
+            row
+            for row in self.get_candidate_rows(search_settings=search_settings, query=search_query.query)
+            if minimum_dpi <= self.dpis[row] <= maximum_dpi
+            and self.sizes[row] <= maximum_size
+            and all(codes[row] in matching_codes for codes, matching_codes in filters)
+        ]
+        # rows are already ordered by priority and python's sort is stable
+        source_order = get_source_order(search_settings)
+        return [
+            self.identifiers[row] for row in sorted(rows, key=lambda row: source_order[self.sources.get_value(row)])
+        ]
+
+
+def update_in_memory_index() -> InMemoryIndex:
+    """
+    Read the rows of the in-memory index from the current contents of the database and publish them to the catalog
+    cache.
+    """
+
+    generation = get_catalog_generation()
+    rows = list(InMemoryIndex.get_rows())
+    publish_catalog_artefact(IN_MEMORY_INDEX_KEY, generation, rows)
+    return InMemoryIndex(rows)
+
+
+in_memory_index: CatalogArtefactMemo[InMemoryIndex] = CatalogArtefactMemo(
+    key=IN_MEMORY_INDEX_KEY, load=InMemoryIndex, build=update_in_memory_index, load_in_background=True
+)
+
+
+class InMemorySearchBackend(SearchBackend):
+    """
+    Searches an `InMemoryIndex` built from the database by each process.
+    """
+
+    @staticmethod
+    def get_name() -> str:
+        return "in_memory"
+
+    @classmethod
+    def get_index(cls) -> InMemoryIndex:
+        if (held := in_memory_index.get(generation=get_catalog_generation())) is None:
+            return InMemoryIndex.build()  # the published rows couldn't be read from the catalog cache
+        return held[1]
+
+    @classmethod
+    def ensure_available(cls) -> None:
+        pass
+
+    @classmethod
+    def search_card_identifiers_batch(
+        cls, search_settings: SearchSettings, queries: list[SearchQuery]
+    ) -> list[list[str]]:
+        index = cls.get_index()
+        return [index.search(search_settings=search_settings, search_query=search_query) for search_query in queries]
+
+
+__all__ = ["InMemoryIndex", "update_in_memory_index", "in_memory_index", "InMemorySearchBackend"]
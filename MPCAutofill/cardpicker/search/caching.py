@@ -0,0 +1,467 @@
+"""
+Caching for search results.
+
+Cached results are namespaced by a catalog generation, which is bumped whenever the contents of the database change
+in a way which could affect search results (e.g. by `update_database`). Bumping the generation orphans every result
+cached under the previous generation, and the cache backend evicts orphaned results as it culls entries.
+
+The catalog generation and the artefacts built against it (e.g. the catalog filter) are kept in the catalog cache
+rather than the default cache, so they're never culled alongside search results.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+import weakref
+from typing import Any, Awaitable, Callable, Generic, Iterable, Optional, TypeVar
+
+from asgiref.sync import sync_to_async
+
+from django.conf import settings
+from django.core.cache import BaseCache, cache, caches
+
+from cardpicker.constants import (
+    CATALOG_ARTEFACT_REFRESH_INTERVAL,
+    SEARCH_SINGLE_FLIGHT_POLL_INTERVAL,
+    SEARCH_SINGLE_FLIGHT_TIMEOUT,
+)
+from cardpicker.schema_types import CardType, SearchSettings
+from cardpicker.search.sanitisation import to_searchable
+
+CATALOG_CACHE_ALIAS = "catalog"
+CATALOG_GENERATION_KEY = "catalog-generation"
+
+T = TypeVar("T")
+
+
+def get_catalog_cache() -> BaseCache:
+    return caches[CATALOG_CACHE_ALIAS]
+
+
+def get_catalog_generation() -> int:
+    catalog_cache = get_catalog_cache()
+    generation: Optional[int] = catalog_cache.get(CATALOG_GENERATION_KEY)
+    if generation is None:
+        # the generation is initialised to the current time rather than to zero in case the catalog cache was cleared -
+        # this ensures that results cached under an earlier generation can never become visible again.
+        generation = time.time_ns()
+        if not catalog_cache.add(CATALOG_GENERATION_KEY, generation, timeout=None):
+            generation = catalog_cache.get(CATALOG_GENERATION_KEY) or generation
+    return generation
+
+
+async def aget_catalog_generation() -> int:
+    """
+    The async equivalent of `get_catalog_generation`.
+    """
+
+    if (generation := await get_catalog_cache().aget(CATALOG_GENERATION_KEY)) is not None:
+        return generation
+    return await sync_to_async(get_catalog_generation)()
+
+
+def bump_catalog_generation() -> None:
+    """
+    Invalidate everything cached against the current contents of the database.
+    """
+
+    get_catalog_cache().set(CATALOG_GENERATION_KEY, time.time_ns(), timeout=None)
+
+
+def get_artefact_generation_key(key: str) -> str:
+    return f"{key}:generation"
+
+
+def publish_catalog_artefact(key: str, generation: int, artefact: Any) -> None:
+    """
+    Store `artefact`, which was built against the contents of the database under catalog generation `generation`, in
+    the catalog cache. The generation is also stored on its own, so processes can check whether a newer artefact has
+    been published without reading the whole thing.
+    """
+
+    get_catalog_cache().set_many(
+        {key: (generation, artefact), get_artefact_generation_key(key): generation}, timeout=None
+    )
+
+
+class CatalogArtefactMemo(Generic[T]):
+    """
+    Holds an artefact which is built against the contents of the database (e.g. the catalog filter) in memory.
+    Artefacts are built outside of requests (e.g. at the end of `update_database`) and published to the catalog cache
+    with `publish_catalog_artefact`, then loaded into each process with `load`.
+
+    When the catalog generation changes, the catalog cache is checked for a newer artefact straight away, and then at
+    most once every `CATALOG_ARTEFACT_REFRESH_INTERVAL` seconds until one is published. The artefact held in memory
+    continues to be served in the meantime. If no artefact has been published at all (e.g. on a fresh deployment), one
+    is built with `build` if it's given.
+
+    With `load_in_background`, newer artefacts are loaded in a background thread and swapped in once they're ready,
+    for artefacts which are expensive to load.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        load: Callable[[Any], T],
+        build: Optional[Callable[[], T]] = None,
+        load_in_background: bool = False,
+    ) -> None:
+        self.key = key
+        self.load = load
+        self.build = build
+        self.load_in_background = load_in_background
+        self.lock = threading.Lock()
+        self.held: Optional[tuple[int, T]] = None
+        self.checked_generation: Optional[int] = None
+        self.checked_at = 0.0
+        self.loading = False
+
+    def load_in_thread(self, generation: int, stored: Any) -> None:
+        try:
+            artefact = self.load(stored)
+            with self.lock:
+                self.held = (generation, artefact)
+        finally:
+            with self.lock:
+                self.loading = False
+
+    def get(self, generation: int) -> Optional[tuple[int, T]]:
+        """
+        Returns the artefact held in memory and the catalog generation it was built under, which may be older than
+        `generation`. Returns None if there isn't one.
+        """
+
+        with self.lock:
+            if self.held is not None and self.held[0] == generation:
+                return self.held
+            now = time.monotonic()
+            if self.checked_generation == generation and now - self.checked_at < CATALOG_ARTEFACT_REFRESH_INTERVAL:
+                return self.held
+            self.checked_generation, self.checked_at = generation, now
+
+            catalog_cache = get_catalog_cache()
+            published_generation: Optional[int] = catalog_cache.get(get_artefact_generation_key(self.key))
+            if published_generation is None:
+                if self.build is not None:
+                    self.held = (generation, self.build())
+                return self.held
+            if (self.held is not None and published_generation == self.held[0]) or self.loading:
+                return self.held
+            if (stored := catalog_cache.get(self.key)) is None:
+                return self.held
+            stored_generation, artefact = stored
+            if self.held is None or not self.load_in_background:
+                self.held = (stored_generation, self.load(artefact))
+            else:
+                self.loading = True
+                threading.Thread(target=self.load_in_thread, args=stored, name=f"load-{self.key}", daemon=True).start()
+            return self.held
+
+    async def aget(self, generation: int) -> Optional[tuple[int, T]]:
+        """
+        The async equivalent of `get`. The held artefact is returned on the event loop unless the catalog cache needs
+        to be checked for a newer one, which happens in a worker thread. The lock isn't taken here, since it's held
+        while artefacts are built - reading these attributes without it can only cause an unnecessary check.
+        """
+
+        held = self.held
+        if (held is not None and held[0] == generation) or (
+            self.checked_generation == generation
+            and time.monotonic() - self.checked_at < CATALOG_ARTEFACT_REFRESH_INTERVAL
+        ):
+            return held
+        return await sync_to_async(self.get)(generation=generation)
+
+
+def hash_cache_key_parts(*parts: Any) -> str:
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def get_search_settings_hash(search_settings: SearchSettings) -> str:
+    """
+    Canonical hash of `search_settings`. The order of sources is significant because it determines the order of
+    search results, but the order in which languages and tags are specified is not.
+    """
+
+    canonical_search_settings = search_settings.model_dump(mode="json")
+    canonical_search_settings["filterSettings"] |= {
+        "languages": sorted(search_settings.filterSettings.languages),
+        "includesTags": sorted(search_settings.filterSettings.includesTags),
+        "excludesTags": sorted(search_settings.filterSettings.excludesTags),
+    }
+    return hash_cache_key_parts(canonical_search_settings)
+
+
+class SearchResultsCache:
+    """
+    Caches the identifiers returned by searches made with a particular set of search settings.
+    """
+
+    def __init__(self, search_settings: SearchSettings, generation: Optional[int] = None) -> None:
+        self.search_settings = search_settings
+        self.generation = generation if generation is not None else get_catalog_generation()
+        self.namespace = f"search:{self.generation}"
+
+    def get_card_key(
+        self, query: Optional[str], card_type: CardType, expansion_code: Optional[str], collector_number: Optional[str]
+    ) -> str:
+        return f"{self.namespace}:cards:" + hash_cache_key_parts(
+            to_searchable(query or ""),
+            card_type.value,
+            (expansion_code or "").upper(),
+            collector_number or "",
+            get_search_settings_hash(self.search_settings),
+        )
+
+    def get_cardbacks_key(self) -> str:
+        # when cardbacks aren't filtered, none of the search settings have any bearing on the results
+        return f"{self.namespace}:cardbacks:" + (
+            get_search_settings_hash(self.search_settings)
+            if self.search_settings.searchTypeSettings.filterCardbacks
+            else "unfiltered"
+        )
+
+    def get(self, key: str) -> Optional[list[str]]:
+        return cache.get(key)
+
+    def get_many(self, keys: list[str]) -> dict[str, list[str]]:
+        return cache.get_many(keys)
+
+    def set(self, key: str, identifiers: list[str]) -> None:
+        cache.set(key, identifiers, timeout=settings.SEARCH_RESULTS_CACHE_TIMEOUT)
+
+    def set_many(self, results: dict[str, list[str]]) -> None:
+        cache.set_many(results, timeout=settings.SEARCH_RESULTS_CACHE_TIMEOUT)
+
+    async def aget_many(self, keys: list[str]) -> dict[str, list[str]]:
+        return await cache.aget_many(keys)
+
+    async def aset_many(self, results: dict[str, list[str]]) -> None:
+        await cache.aset_many(results, timeout=settings.SEARCH_RESULTS_CACHE_TIMEOUT)
+
+
+class SearchSingleFlight:
+    """
+    Coalesces concurrent searches for the same cache key, so a search which is already in flight is waited on
+    rather than repeated. Within a process, waiting threads are woken as soon as the search completes. Across
+    processes, each search is guarded by a lock in the shared cache and waiting processes poll the cache for its
+    results. The locks for a request's keys are claimed together, so a request costs a constant number of round trips
+    to the cache however many keys it searches for. If a search hasn't completed within `SEARCH_SINGLE_FLIGHT_TIMEOUT`
+    seconds (e.g. because the process performing it died), waiting requests give up on it and perform the search
+    themselves.
+    """
+
+    def __init__(self) -> None:
+        self.lock = threading.Lock()
+        self.in_flight: dict[str, threading.Event] = {}
+
+    @staticmethod
+    def get_lock_key(key: str) -> str:
+        return f"{key}:lock"
+
+    def claim(self, keys: Iterable[str]) -> tuple[list[str], list[str], dict[str, threading.Event]]:
+        """
+        Returns the keys which this thread should search for, the keys which this thread should wait for another
+        process to search for, and the keys (with their events) which this thread should wait for another thread in
+        this process to search for.
+        """
+
+        claimed: list[str] = []
+        local_waits: dict[str, threading.Event] = {}
+        with self.lock:
+            for key in keys:
+                if (event := self.in_flight.get(key)) is not None:
+                    local_waits[key] = event
+                else:
+                    self.in_flight[key] = threading.Event()
+                    claimed.append(key)
+        owned: list[str] = []
+        remote_waits: list[str] = []
+        if claimed:
+            # the locks for every key are checked and taken in two round trips to the cache, rather than one atomic
+            # `add` per key. processes which race between them will both search for a key, which is harmless.
+            locked = cache.get_many([self.get_lock_key(key) for key in claimed])
+            for key in claimed:
+                (remote_waits if self.get_lock_key(key) in locked else owned).append(key)
+            cache.set_many({self.get_lock_key(key): True for key in owned}, timeout=SEARCH_SINGLE_FLIGHT_TIMEOUT)
+        return owned, remote_waits, local_waits
+
+    def release(self, keys: list[str]) -> None:
+        with self.lock:
+            for key in keys:
+                self.in_flight.pop(key).set()
+
+    def wait_for_remote(self, search_results_cache: "SearchResultsCache", keys: list[str]) -> dict[str, list[str]]:
+        results: dict[str, list[str]] = {}
+        pending = list(keys)
+        deadline = time.monotonic() + SEARCH_SINGLE_FLIGHT_TIMEOUT
+        while pending and time.monotonic() < deadline:
+            time.sleep(SEARCH_SINGLE_FLIGHT_POLL_INTERVAL)
+            results |= search_results_cache.get_many(pending)
+            # a search whose lock has been released without caching results has failed, so stop waiting for it
+            locked = cache.get_many([self.get_lock_key(key) for key in pending if key not in results])
+            pending = [key for key in pending if key not in results and self.get_lock_key(key) in locked]
+        return results
+
+    def search(
+        self,
+        search_results_cache: "SearchResultsCache",
+        keys: Iterable[str],
+        search: Callable[[list[str]], dict[str, list[str]]],
+    ) -> dict[str, list[str]]:
+        """
+        Returns the results of searching for each of `keys`, which are expected to have missed the cache.
+        `search` is called with the keys which no other request is already searching for and should return the
+        results for each key, which are cached here.
+        """
+
+        owned, remote_waits, local_waits = self.claim(keys)
+        results: dict[str, list[str]] = {}
+        try:
+            if owned:
+                try:
+                    results |= search(owned)
+                    search_results_cache.set_many({key: results[key] for key in owned})
+                finally:
+                    cache.delete_many([self.get_lock_key(key) for key in owned])
+            if remote_waits:
+                results |= self.wait_for_remote(search_results_cache, remote_waits)
+        finally:
+            # threads in this process which are waiting on keys claimed by this thread can now read the cache
+            self.release(owned + remote_waits)
+        for key, event in local_waits.items():
+            event.wait(timeout=SEARCH_SINGLE_FLIGHT_TIMEOUT)
+        if local_waits:
+            results |= search_results_cache.get_many(list(local_waits.keys()))
+
+        # search for anything whose search failed or timed out in another thread or process
+        if missing := [key for key in [*owned, *remote_waits, *local_waits.keys()] if key not in results]:
+            missing_results = search(missing)
+            search_results_cache.set_many(missing_results)
+            results |= missing_results
+        return results
+
+
+search_single_flight = SearchSingleFlight()
+
+
+class AsyncSearchSingleFlight:
+    """
+    The async equivalent of `SearchSingleFlight`. Within an event loop, waiting coroutines are woken as soon as the
+    search completes. Searches in flight in other event loops, threads or processes are coordinated through the same
+    locks in the shared cache as `SearchSingleFlight`, and are polled for without blocking the event loop.
+    """
+
+    def __init__(self) -> None:
+        # events can only be awaited in the event loop they were created in, so each loop tracks its own searches
+        self.in_flight: weakref.WeakKeyDictionary[
+            asyncio.AbstractEventLoop, dict[str, asyncio.Event]
+        ] = weakref.WeakKeyDictionary()
+
+    def get_in_flight(self) -> dict[str, asyncio.Event]:
+        return self.in_flight.setdefault(asyncio.get_running_loop(), {})
+
+    async def claim(self, keys: Iterable[str]) -> tuple[list[str], list[str], dict[str, asyncio.Event]]:
+        """
+        Returns the keys which this coroutine should search for, the keys which this coroutine should wait for
+        another event loop, thread or process to search for, and the keys (with their events) which this coroutine
+        should wait for another coroutine in this event loop to search for.
+        """
+
+        in_flight = self.get_in_flight()
+        claimed: list[str] = []
+        local_waits: dict[str, asyncio.Event] = {}
+        for key in keys:
+            if (event := in_flight.get(key)) is not None:
+                local_waits[key] = event
+            else:
+                in_flight[key] = asyncio.Event()
+                claimed.append(key)
+        owned: list[str] = []
+        remote_waits: list[str] = []
+        if claimed:
+            locked = await cache.aget_many([SearchSingleFlight.get_lock_key(key) for key in claimed])
+            for key in claimed:
+                (remote_waits if SearchSingleFlight.get_lock_key(key) in locked else owned).append(key)
+            await cache.aset_many(
+                {SearchSingleFlight.get_lock_key(key): True for key in owned}, timeout=SEARCH_SINGLE_FLIGHT_TIMEOUT
+            )
+        return owned, remote_waits, local_waits
+
+    def release(self, keys: list[str]) -> None:
+        in_flight = self.get_in_flight()
+        for key in keys:
+            in_flight.pop(key).set()
+
+    async def wait_for_remote(self, search_results_cache: SearchResultsCache, keys: list[str]) -> dict[str, list[str]]:
+        results: dict[str, list[str]] = {}
+        pending = list(keys)
+        deadline = time.monotonic() + SEARCH_SINGLE_FLIGHT_TIMEOUT
+        while pending and time.monotonic() < deadline:
+            await asyncio.sleep(SEARCH_SINGLE_FLIGHT_POLL_INTERVAL)
+            results |= await search_results_cache.aget_many(pending)
+            locked = await cache.aget_many(
+                [SearchSingleFlight.get_lock_key(key) for key in pending if key not in results]
+            )
+            pending = [key for key in pending if key not in results and SearchSingleFlight.get_lock_key(key) in locked]
+        return results
+
+    async def search(
+        self,
+        search_results_cache: SearchResultsCache,
+        keys: Iterable[str],
+        search: Callable[[list[str]], Awaitable[dict[str, list[str]]]],
+    ) -> dict[str, list[str]]:
+        """
+        The async equivalent of `SearchSingleFlight.search`.
+        """
+
+        owned, remote_waits, local_waits = await self.claim(keys)
+        results: dict[str, list[str]] = {}
+        try:
+            if owned:
+                try:
+                    results |= await search(owned)
+                    await search_results_cache.aset_many({key: results[key] for key in owned})
+                finally:
+                    await cache.adelete_many([SearchSingleFlight.get_lock_key(key) for key in owned])
+            if remote_waits:
+                results |= await self.wait_for_remote(search_results_cache, remote_waits)
+        finally:
+            self.release(owned + remote_waits)
+        if local_waits:
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*(event.wait() for event in local_waits.values())),
+                    timeout=SEARCH_SINGLE_FLIGHT_TIMEOUT,
+                )
+            except TimeoutError:
+                pass
+            results |= await search_results_cache.aget_many(list(local_waits.keys()))
+
+        if missing := [key for key in [*owned, *remote_waits, *local_waits.keys()] if key not in results]:
+            missing_results = await search(missing)
+            await search_results_cache.aset_many(missing_results)
+            results |= missing_results
+        return results
+
+
+async_search_single_flight = AsyncSearchSingleFlight()
+
+
+__all__ = [
+    "get_catalog_cache",
+    "get_catalog_generation",
+    "aget_catalog_generation",
+    "bump_catalog_generation",
+    "publish_catalog_artefact",
+    "CatalogArtefactMemo",
+    "get_search_settings_hash",
+    "SearchResultsCache",
+    "SearchSingleFlight",
+    "search_single_flight",
+    "AsyncSearchSingleFlight",
+    "async_search_single_flight",
+]
@@ -0,0 +1,130 @@
+"""
+A compact table of every cardback in the catalog, which lets cardback requests be answered without querying the
+database.
+
+Cardbacks are stored in the order they're returned in when they aren't filtered (by priority, then by source, then by
+name), alongside the columns they can be filtered by. Filtering cardbacks is then a scan over these columns followed
+by a stable sort on source order.
+
+The table is built at the end of `update_database` and `drain_search_index_outbox`, and stamped with the catalog
+generation at that time. Requests are served from the latest table which has been published, even if the catalog
+generation has changed since, so they never wait on a rebuild. It's only built within a request if no table has been
+published yet.
+"""
+
+from array import array
+from typing import Optional
+
+from cardpicker.models import Card, CardTypes
+from cardpicker.search.caching import (
+    CatalogArtefactMemo,
+    get_catalog_generation,
+    publish_catalog_artefact,
+)
+
+CARDBACK_TABLE_KEY = "cardback-table"
+
+
+class CardbackTable:
+    def __init__(
+        self,
+        identifiers: list[str],
+        source_pks: array[int],
+        dpis: array[int],
+        sizes: array[int],
+        languages: list[str],
+        tags: list[frozenset[str]],
+    ) -> None:
+        self.identifiers = identifiers
+        self.source_pks = source_pks
+        self.dpis = dpis
+        self.sizes = sizes
+        self.languages = languages
+        self.tags = tags
+
+    @classmethod
+    def build(cls) -> "CardbackTable":
+        table = cls(identifiers=[], source_pks=array("l"), dpis=array("l"), sizes=array("q"), languages=[], tags=[])
+        for identifier, source_pk, dpi, size, language, tags in (
+            Card.objects.filter(card_type=CardTypes.CARDBACK)
+            .order_by("-priority", "source__ordinal", "source__name", "name", "pk")
+            .values_list("identifier", "source_id", "dpi", "size", "language", "tags")
+        ):
+            table.identifiers.append(identifier)
+            table.source_pks.append(source_pk)
+            table.dpis.append(dpi)
+            table.sizes.append(size)
+            table.languages.append(language)
+            table.tags.append(frozenset(tags))
+        return table
+
+    def __len__(self) -> int:
+        return len(self.identifiers)
+
+    def get_all(self) -> list[str]:
+        return list(self.identifiers)
+
+    def search(
+        self,
+        source_order: dict[int, int],
+        languages: Optional[set[str]],
+        includes_tags: Optional[frozenset[str]],
+        excludes_tags: Optional[frozenset[str]],
+        minimum_dpi: int,
+        maximum_dpi: int,
+        maximum_size: int,
+    ) -> list[str]:
+        """
+        Retrieve the identifiers of the cardbacks which satisfy the given filters, ordered by their source's position
+        in `source_order` and then by their position in the table. Cardbacks from sources missing from `source_order`
+        are excluded. `None` disables the corresponding filter.
+        """
+
+        rows = [
+            row
+            for row in range(len(self))
+            if self.source_pks[row] in source_order
+            and minimum_dpi <= self.dpis[row] <= maximum_dpi
+            and self.sizes[row] <= maximum_size
+            and (languages is None or self.languages[row] in languages)
+            # a cardback matches the included tags if it has all of them or has no tags besides them
+            and (includes_tags is None or self.tags[row] >= includes_tags or self.tags[row] <= includes_tags)
+            and (excludes_tags is None or self.tags[row].isdisjoint(excludes_tags))
+        ]
+        rows.sort(key=lambda row: source_order[self.source_pks[row]])  # python's sort is stable
+        return [self.identifiers[row] for row in rows]
+
+
+def update_cardback_table() -> CardbackTable:
+    """
+    Rebuild the cardback table against the current contents of the database and publish it to the catalog cache.
+    """
+
+    generation = get_catalog_generation()
+    table = CardbackTable.build()
+    publish_catalog_artefact(
+        CARDBACK_TABLE_KEY,
+        generation,
+        (table.identifiers, table.source_pks, table.dpis, table.sizes, table.languages, table.tags),
+    )
+    return table
+
+
+cardback_table: CatalogArtefactMemo[CardbackTable] = CatalogArtefactMemo(
+    key=CARDBACK_TABLE_KEY, load=lambda stored: CardbackTable(*stored), build=update_cardback_table
+)
+
+
+def get_cardback_table(generation: int) -> tuple[int, CardbackTable]:
+    """
+    Returns the latest cardback table which has been published and the catalog generation it was built under, which
+    may be earlier than `generation`.
+    """
+
+    if (held := cardback_table.get(generation=generation)) is None:
+        # the published table couldn't be read from the catalog cache
+        return generation, CardbackTable.build()
+    return held
+
+
+__all__ = ["CardbackTable", "update_cardback_table", "cardback_table", "get_cardback_table"]
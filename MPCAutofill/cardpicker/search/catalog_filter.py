@@ -0,0 +1,154 @@
+"""
+A Bloom filter over the precise search keys in the catalog, which lets editor searches skip precise queries that can't
+match any card.
+
+Precise searches match a card when the query's precise search key equals the card's. Both keys are computed with
+`to_precise_search_key`, so if the filter rules out the query's key, the query is guaranteed to have no hits. Fuzzy
+queries are always sent to the search engine - matching them depends on how the search engine's analyser tokenises
+names, which is only approximated here, and any difference would hide cards which do match.
+
+The filter is built at the end of `update_database` and stamped with the catalog generation at that time. It's only
+consulted while the catalog generation is unchanged, because cards added afterwards aren't reflected in it, so it's
+rebuilt wherever else the catalog generation is bumped. Processes keep checking for a newly published filter while
+theirs is missing or stale, so they pick it up soon after it's built.
+"""
+
+import hashlib
+import math
+from typing import Iterable, Optional
+
+from cardpicker.constants import CATALOG_FILTER_FALSE_POSITIVE_RATE
+from cardpicker.models import Card
+from cardpicker.schema_types import SearchQuery, SearchSettings
+from cardpicker.search.caching import (
+    CatalogArtefactMemo,
+    get_catalog_generation,
+    publish_catalog_artefact,
+)
+from cardpicker.search.sanitisation import to_precise_search_key, to_searchable
+
+CATALOG_FILTER_KEY = "catalog-filter"
+
+
+class BloomFilter:
+    def __init__(self, bit_count: int, hash_count: int, item_count: int = 0, bits: Optional[bytes] = None) -> None:
+        self.bit_count = bit_count
+        self.hash_count = hash_count
+        self.item_count = item_count
+        self.bits = bytearray(bits) if bits is not None else bytearray((bit_count + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, item_count: int, false_positive_rate: float) -> "BloomFilter":
+        """
+        The smallest filter which can hold `item_count` items with at most `false_positive_rate` false positives.
+        """
+
+        bit_count = max(8, math.ceil(-item_count * math.log(false_positive_rate) / math.log(2) ** 2))
+        hash_count = max(1, round(bit_count / max(item_count, 1) * math.log(2)))
+        return cls(bit_count=bit_count, hash_count=hash_count)
+
+    def get_positions(self, item: str) -> Iterable[int]:
+        # the `hash_count` hash functions are simulated by double hashing with two halves of a single digest
+        digest = hashlib.blake2b(item.encode("utf-8"), digest_size=16).digest()
+        h1, h2 = int.from_bytes(digest[:8], "little"), int.from_bytes(digest[8:], "little") | 1
+        return ((h1 + i * h2) % self.bit_count for i in range(self.hash_count))
+
+    def add(self, item: str) -> None:
+        for position in self.get_positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.item_count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[position >> 3] & (1 << (position & 7)) for position in self.get_positions(item))
+
+    @property
+    def size(self) -> int:
+        """
+        The size of the filter in bytes.
+        """
+
+        return len(self.bits)
+
+    @property
+    def false_positive_rate(self) -> float:
+        """
+        The expected false positive rate given the number of items in the filter.
+        """
+
+        return (1 - math.exp(-self.hash_count * self.item_count / self.bit_count)) ** self.hash_count
+
+
+def build_catalog_filter() -> BloomFilter:
+    items: set[str] = set()
+    for searchq in Card.objects.values_list("searchq", flat=True).distinct().iterator(chunk_size=10_000):
+        if precise_search_key := to_precise_search_key(searchq):
+            items.add(precise_search_key)
+    bloom_filter = BloomFilter.for_capacity(
+        item_count=len(items), false_positive_rate=CATALOG_FILTER_FALSE_POSITIVE_RATE
+    )
+    for item in items:
+        bloom_filter.add(item)
+    return bloom_filter
+
+
+def update_catalog_filter() -> BloomFilter:
+    """
+    Rebuild the catalog filter against the current contents of the database and publish it to the catalog cache.
+    """
+
+    generation = get_catalog_generation()
+    bloom_filter = build_catalog_filter()
+    publish_catalog_artefact(
+        CATALOG_FILTER_KEY,
+        generation,
+        (bloom_filter.bit_count, bloom_filter.hash_count, bloom_filter.item_count, bytes(bloom_filter.bits)),
+    )
+    return bloom_filter
+
+
+# the catalog filter isn't built within requests, since searches work without it
+catalog_filter: CatalogArtefactMemo[BloomFilter] = CatalogArtefactMemo(
+    key=CATALOG_FILTER_KEY, load=lambda stored: BloomFilter(*stored)
+)
+
+
+def get_catalog_filter(generation: int) -> Optional[BloomFilter]:
+    """
+    Returns the catalog filter, or None if it's missing or wasn't built under catalog generation `generation`.
+    """
+
+    if (held := catalog_filter.get(generation=generation)) is not None and held[0] == generation:
+        return held[1]
+    return None
+
+
+async def aget_catalog_filter(generation: int) -> Optional[BloomFilter]:
+    """
+    The async equivalent of `get_catalog_filter`.
+    """
+
+    if (held := await catalog_filter.aget(generation=generation)) is not None and held[0] == generation:
+        return held[1]
+    return None
+
+
+def may_match(bloom_filter: BloomFilter, search_settings: SearchSettings, search_query: SearchQuery) -> bool:
+    """
+    Returns False if `search_query` is guaranteed to have no hits, and True if it might have hits.
+    """
+
+    if not search_query.query or search_settings.searchTypeSettings.fuzzySearch:
+        return True
+    precise_search_key = to_precise_search_key(to_searchable(search_query.query))
+    return bool(precise_search_key) and precise_search_key in bloom_filter
+
+
+__all__ = [
+    "BloomFilter",
+    "build_catalog_filter",
+    "update_catalog_filter",
+    "catalog_filter",
+    "get_catalog_filter",
+    "aget_catalog_filter",
+    "may_match",
+]
@@ -0,0 +1,227 @@
+"""
+Tracks which cards' search documents are derived from rows of other models, so that changing one of those rows only
+reindexes the cards which depend on it.
+
+Each tracked model lists the search document fields derived from each of its fields. When a tracked row changes, its
+dependent cards are recorded in the search index outbox along with the document fields to update, and
+`drain_search_index_outbox` sends partial updates of only those fields. `serialised` depends on most tracked fields, but
+is only updated when `settings.SERIALISED_CARDS_IN_SEARCH_ENGINE` is enabled - otherwise, changes to sources and artists
+don't touch the search index at all.
+
+The tags in search documents are copied from `Card.tags`, which also holds the parents of each tag a card is tagged
+with. Renaming, reparenting or deleting a tag rewrites `Card.tags` for the cards which have it. Parents which a tag no
+longer implies are left in place until the next crawl, since they can't be told apart from tags in the card's name.
+"""
+
+from typing import Any, Callable, Iterable, Optional
+
+from django.conf import settings
+from django.db import models
+
+from cardpicker.models import (
+    CanonicalArtist,
+    CanonicalCard,
+    CanonicalExpansion,
+    Card,
+    SearchIndexOutboxEntry,
+    Source,
+    Tag,
+)
+
+OUTBOX_BATCH_SIZE = 1000
+
+
+def get_canonical_card_dependents(**kwargs: Any) -> models.Q:
+    """
+    Filters cards by their canonical card. The canonical cards which were inferred for cards only affect `serialised`.
+    """
+
+    dependents = models.Q(**{f"canonical_card__{key}": value for key, value in kwargs.items()})
+    if settings.SERIALISED_CARDS_IN_SEARCH_ENGINE:
+        dependents |= models.Q(**{f"inferred_canonical_card__{key}": value for key, value in kwargs.items()})
+    return dependents
+
+
+# for each tracked model, the search document fields which are derived from each of its fields
+DOCUMENT_FIELD_DEPENDENCIES: dict[type[models.Model], dict[str, list[str]]] = {
+    CanonicalExpansion: {
+        "code": ["expansion_code", "serialised"],
+        "name": ["serialised"],
+    },
+    CanonicalCard: {
+        "expansion": ["expansion_code", "serialised"],
+        "collector_number": ["collector_number", "serialised"],
+        "identifier": ["serialised"],
+        "canonical_id": ["serialised"],
+        "name": ["serialised"],
+        "artist": ["serialised"],
+        "small_thumbnail_url": ["serialised"],
+        "medium_thumbnail_url": ["serialised"],
+    },
+    CanonicalArtist: {
+        "name": ["serialised"],
+    },
+    Source: {
+        "key": ["serialised"],
+        "name": ["serialised"],
+        "source_type": ["serialised"],
+        "external_link": ["serialised"],
+    },
+}
+
+# for each tracked model, the cards whose search documents are derived from one of its rows
+DEPENDENT_CARDS: dict[type[models.Model], Callable[[Any], models.Q]] = {
+    CanonicalExpansion: lambda expansion: get_canonical_card_dependents(expansion=expansion.pk),
+    CanonicalCard: lambda canonical_card: get_canonical_card_dependents(pk=canonical_card.pk),
+    CanonicalArtist: lambda artist: (
+        models.Q(canonical_artist=artist.pk) | get_canonical_card_dependents(artist=artist.pk)
+    ),
+    Source: lambda source: models.Q(source=source.pk),
+}
+
+
+def get_document_fields(fields: Iterable[str]) -> list[str]:
+    return sorted(field for field in set(fields) if field != "serialised" or settings.SERIALISED_CARDS_IN_SEARCH_ENGINE)
+
+
+def record_card_updates(card_pks: Iterable[int], document_fields: list[str]) -> int:
+    """
+    Record in the search index outbox that the documents of the cards with primary keys `card_pks` should have
+    `document_fields` updated. Returns the number of cards recorded.
+    """
+
+    entries = [SearchIndexOutboxEntry(card_pk=pk, document_fields=document_fields) for pk in card_pks]
+    SearchIndexOutboxEntry.objects.bulk_create(entries, batch_size=OUTBOX_BATCH_SIZE)
+    return len(entries)
+
+
+def get_tracked_state(
+    model: type[models.Model], queryset: Optional[models.QuerySet[Any]] = None
+) -> dict[int, tuple[Any, ...]]:
+    """
+    The values of the tracked fields of each row of `model` (or of `queryset`, if it's given), by primary key.
+    """
+
+    return {
+        pk: tuple(values)
+        for pk, *values in (queryset if queryset is not None else model._default_manager.all()).values_list(
+            "pk", *DOCUMENT_FIELD_DEPENDENCIES[model]
+        )
+    }
+
+
+def record_dependent_card_updates(instance: models.Model, previous_state: Optional[tuple[Any, ...]]) -> int:
+    """
+    Record updates for the documents of the cards which depend on `instance` (of a tracked model), given the values of
+    its tracked fields before it was changed. Only the document fields derived from the fields which changed are
+    updated. Returns the number of cards recorded.
+    """
+
+    model = type(instance)
+    if previous_state is None:
+        return 0  # a new row doesn't have any dependents yet
+    field_dependencies = DOCUMENT_FIELD_DEPENDENCIES[model]
+    document_fields = get_document_fields(
+        document_field
+        for (name, document_fields_of_field), previous_value in zip(field_dependencies.items(), previous_state)
+        if instance.serializable_value(name) != previous_value
+        for document_field in document_fields_of_field
+    )
+    return record_dependent_card_updates_of_fields(instance, document_fields)
+
+
+def record_dependent_card_updates_of_fields(instance: models.Model, document_fields: list[str]) -> int:
+    if not document_fields:
+        return 0
+    return record_card_updates(
+        Card.objects.filter(DEPENDENT_CARDS[type(instance)](instance)).values_list("pk", flat=True).iterator(),
+        document_fields,
+    )
+
+
+def record_dependent_card_deletion(instance: models.Model) -> int:
+    """
+    Record updates for every document field derived from `instance` (of a tracked model) for the cards which depend on
+    it, before it's deleted. Returns the number of cards recorded.
+    """
+
+    return record_dependent_card_updates_of_fields(
+        instance,
+        get_document_fields(
+            document_field
+            for document_fields in DOCUMENT_FIELD_DEPENDENCIES[type(instance)].values()
+            for document_field in document_fields
+        ),
+    )
+
+
+def record_changes_since(model: type[models.Model], previous_states: dict[int, tuple[Any, ...]]) -> int:
+    """
+    Record updates for the documents of the cards which depend on the rows of `model` which changed since
+    `previous_states` was retrieved with `get_tracked_state`, e.g. by bulk operations which don't send signals.
+    Returns the number of cards recorded.
+    """
+
+    recorded = 0
+    for instance in model._default_manager.filter(pk__in=previous_states.keys()):
+        recorded += record_dependent_card_updates(instance, previous_states[instance.pk])
+    return recorded
+
+
+def get_ancestor_names(tag: Optional[Tag]) -> list[str]:
+    names: list[str] = []
+    while tag is not None and tag.name not in names:  # guards against cycles
+        names.append(tag.name)
+        tag = tag.parent
+    return names
+
+
+def rewrite_card_tags(name: str, rewrite: Callable[[list[str]], list[str]]) -> int:
+    """
+    Rewrite the tags of every card tagged with `name` with `rewrite`, and record updates for their documents.
+    Returns the number of cards rewritten.
+    """
+
+    cards = list(Card.objects.filter(tags__contains=[name]).only("pk", "tags"))
+    for card in cards:
+        card.tags = rewrite(card.tags)
+    Card.objects.bulk_update(cards, ["tags"], batch_size=OUTBOX_BATCH_SIZE)
+    return record_card_updates([card.pk for card in cards], get_document_fields(["tags", "serialised"]))
+
+
+def record_tag_change(tag: Tag, previous_name: str, previous_parent_pk: Optional[int]) -> int:
+    """
+    Update the tags of the cards tagged with `tag` after it's been renamed or reparented. Returns the number of cards
+    rewritten.
+    """
+
+    rewritten = 0
+    if tag.name != previous_name:
+        rewritten += rewrite_card_tags(
+            previous_name, lambda tags: list(dict.fromkeys(tag.name if t == previous_name else t for t in tags))
+        )
+    if tag.parent_id != previous_parent_pk and tag.parent_id is not None:
+        ancestor_names = get_ancestor_names(tag.parent)
+        rewritten += rewrite_card_tags(
+            tag.name, lambda tags: tags + [name for name in ancestor_names if name not in tags]
+        )
+    return rewritten
+
+
+def record_tag_deletion(tag: Tag) -> int:
+    """
+    Remove `tag` from the tags of every card. Returns the number of cards rewritten.
+    """
+
+    return rewrite_card_tags(tag.name, lambda tags: [t for t in tags if t != tag.name])
+
+
+__all__ = [
+    "DOCUMENT_FIELD_DEPENDENCIES",
+    "get_tracked_state",
+    "record_dependent_card_updates",
+    "record_dependent_card_deletion",
+    "record_changes_since",
+    "record_tag_change",
+    "record_tag_deletion",
+]
@@ -0,0 +1,566 @@
+"""
+Blue/green rebuilds of the search index.
+
+`CardSearch.Index.name` is served as an alias rather than as a concrete index. A rebuild creates a fresh index with a
+versioned name, loads every card into it, and checks it holds as many documents as there are cards in the database.
+Only then is the alias moved onto the new index - in a single atomic request - so searches are served by the old index
+at full speed until the new index is ready, and never fail with `SearchExceptions.IndexNotFoundException`.
+If a rebuild fails, the new index is deleted and the alias is left where it was.
+
+Writes through the alias (e.g. by `update_database`) during a rebuild go to the old index, so they may be missing from
+the new index. Rebuilds shouldn't be run at the same time as `update_database`.
+
+For large catalogs, `populate_index_in_parallel` splits the `Card` table into ranges of primary keys and loads each range
+in a separate process, with its own database cursor and its own concurrent bulk requests.
+
+Incremental changes (e.g. from `update_database`) are written to the search index through the alias with
+`sync_search_index`. Changes to individual cards made elsewhere (e.g. in the admin panel) are recorded in an outbox in
+the same transaction, and `drain_search_index_outbox` writes them to the search index in the background. Changes to the
+rows which cards' documents are derived from (e.g. canonical cards) are recorded in the outbox as partial updates of the
+dependent cards' documents - see `cardpicker.search.dependencies`.
+
+With `settings.SEARCH_INDEX_ROUTING_BY_CARD_TYPE`, documents are routed to shards by card type. A card whose type has
+changed would then leave its old document behind on another shard, so syncs also delete each indexed card's document
+from the shards of the other card types.
+"""
+
+import datetime as dt
+import functools
+import multiprocessing
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable, Collection, Iterable, Iterator, Mapping, Optional
+
+from elasticsearch import Elasticsearch
+from elasticsearch.exceptions import ElasticsearchException
+from elasticsearch.helpers import bulk, parallel_bulk
+
+from django.conf import settings
+from django.db import connections, transaction
+from django.utils import timezone
+
+from cardpicker.constants import (
+    CATALOG_ARTEFACT_REBUILD_INTERVAL,
+    SEARCH_INDEX_BULK_CHUNK_SIZE,
+    SEARCH_INDEX_BULK_THREAD_COUNT,
+    SEARCH_INDEX_OUTBOX_BATCH_SIZE,
+    SEARCH_INDEX_OUTBOX_LEASE,
+    SEARCH_INDEX_OUTBOX_MAX_RETRY_DELAY,
+    SEARCH_INDEX_OUTBOX_RETRY_DELAY,
+    SEARCH_INDEX_QUERYSET_CHUNK_SIZE,
+    SEARCH_INDEX_SUSPEND_REFRESH_THRESHOLD,
+    SEARCH_INDEX_SYNC_CHUNK_BYTES,
+    SEARCH_INDEX_SYNC_CHUNK_SIZE,
+)
+from cardpicker.documents import CardSearch
+from cardpicker.models import Card, SearchIndexOutboxEntry
+from cardpicker.schema_types import CardType
+from cardpicker.search.autocomplete import (
+    AUTOCOMPLETE_INDEX_KEY,
+    update_autocomplete_index,
+)
+from cardpicker.search.backends.backends import get_configured_search_backend
+from cardpicker.search.backends.in_memory import (
+    IN_MEMORY_INDEX_KEY,
+    InMemorySearchBackend,
+    update_in_memory_index,
+)
+from cardpicker.search.caching import bump_catalog_generation, get_catalog_cache
+from cardpicker.search.cardback_table import CARDBACK_TABLE_KEY, update_cardback_table
+from cardpicker.search.catalog_filter import CATALOG_FILTER_KEY, update_catalog_filter
+from cardpicker.search.search_functions import get_elasticsearch_connection
+from cardpicker.search.spelling import (
+    SPELLING_DICTIONARY_KEY,
+    update_spelling_dictionary,
+)
+
+# the document fields of partial updates which can change the results of searches. partial updates of other fields (i.e.
+# `serialised`) don't need the catalog generation to be bumped
+SEARCH_RESULT_DOCUMENT_FIELDS = frozenset({"tags", "expansion_code", "collector_number"})
+
+# the document fields of partial updates which each catalog artefact is built from. the catalog filter and the cardback
+# table are only fully used under the catalog generation they were built under, so they're rebuilt after every change
+# which bumps it
+CATALOG_ARTEFACT_DOCUMENT_FIELDS: dict[str, frozenset[str]] = {
+    CATALOG_FILTER_KEY: SEARCH_RESULT_DOCUMENT_FIELDS,
+    CARDBACK_TABLE_KEY: SEARCH_RESULT_DOCUMENT_FIELDS,
+    AUTOCOMPLETE_INDEX_KEY: frozenset(),
+    SPELLING_DICTIONARY_KEY: frozenset(),
+    IN_MEMORY_INDEX_KEY: SEARCH_RESULT_DOCUMENT_FIELDS,
+}
+
+
+class IndexingExceptions:
+    class DocumentCountMismatchException(Exception):
+        def __init__(self, index: str, document_count: int, card_count: int) -> None:
+            self.message = (
+                f"The search index {index} holds {document_count} documents, "
+                f"but there are {card_count} cards in the database."
+            )
+            super().__init__(self.message)
+
+    class OutboxSyncException(Exception):
+        def __init__(self, entry_count: int) -> None:
+            self.message = (
+                f"Failed to sync {entry_count} search index outbox entries. They'll be retried after a delay."
+            )
+            super().__init__(self.message)
+
+
+def get_alias_indices(es: Elasticsearch, alias: str) -> list[str]:
+    """
+    The names of the indices which `alias` points to.
+    """
+
+    if not es.indices.exists_alias(name=alias):
+        return []
+    return list(es.indices.get_alias(name=alias).keys())
+
+
+def create_versioned_index(es: Elasticsearch) -> str:
+    """
+    Create an empty index with the same settings and mappings as `CardSearch`'s, under a name unique to this moment.
+    The index isn't refreshed until `finish_loading_index` is called.
+    """
+
+    name = f"{CardSearch.Index.name}-{dt.datetime.now(tz=dt.timezone.utc):%Y%m%d%H%M%S%f}"
+    index = CardSearch._index.clone(name=name)
+    # documents are loaded faster without refreshes and without copying them to replicas
+    index.settings(refresh_interval="-1", number_of_replicas=0)
+    index.create(using=es)
+    return name
+
+
+def get_routing_meta(card: Card) -> dict[str, str]:
+    return {"_routing": routing} if (routing := CardSearch.get_routing(card)) is not None else {}
+
+
+def get_index_actions(index_name: str, cards: Iterable[Card]) -> Iterator[dict[str, Any]]:
+    document = CardSearch()
+    for card in cards:
+        yield {
+            "_index": index_name,
+            "_id": document.generate_id(card),
+            "_source": document.prepare(card),
+            **get_routing_meta(card),
+        }
+
+
+def get_partial_document(document: CardSearch, card: Card, fields: Collection[str]) -> dict[str, Any]:
+    return {name: prepare(card) for name, _, prepare in document._prepared_fields if name in fields}
+
+
+def populate_index(es: Elasticsearch, index_name: str) -> int:
+    """
+    Load every card into the index `index_name`, returning the number of documents indexed.
+    """
+
+    indexed, _ = bulk(
+        es,
+        get_index_actions(index_name, CardSearch().get_indexing_queryset()),
+        chunk_size=SEARCH_INDEX_BULK_CHUNK_SIZE,
+    )
+    return indexed
+
+
+def get_partitions(partition_count: int) -> list[tuple[Optional[int], Optional[int]]]:
+    """
+    Split the `Card` table into up to `partition_count` ranges of primary keys with roughly equal numbers of cards.
+    Each range is `(lower, upper)`, including `lower` and excluding `upper`, where `None` means unbounded.
+    """
+
+    card_count = Card.objects.count()
+    boundaries = [
+        Card.objects.order_by("pk").values_list("pk", flat=True)[i * card_count // partition_count]
+        for i in range(1, partition_count)
+        if card_count > 0
+    ]
+    bounds: list[Optional[int]] = [None, *sorted(set(boundaries)), None]
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def populate_partition(index_name: str, thread_count: int, partition: tuple[Optional[int], Optional[int]]) -> int:
+    """
+    Load the cards whose primary keys are in `partition` into the index `index_name`, with `thread_count` concurrent
+    bulk requests. Cards are read through a server-side cursor. Returns the number of documents indexed.
+    """
+
+    lower, upper = partition
+    cards = CardSearch().get_queryset().order_by("pk")
+    if lower is not None:
+        cards = cards.filter(pk__gte=lower)
+    if upper is not None:
+        cards = cards.filter(pk__lt=upper)
+    # each process needs its own client, because clients can't be shared with forked processes
+    es = Elasticsearch(**settings.ELASTICSEARCH_DSL["default"])
+    try:
+        return sum(
+            1
+            for success, _ in parallel_bulk(
+                es,
+                get_index_actions(index_name, cards.iterator(chunk_size=SEARCH_INDEX_QUERYSET_CHUNK_SIZE)),
+                thread_count=thread_count,
+                chunk_size=SEARCH_INDEX_BULK_CHUNK_SIZE,
+            )
+            if success
+        )
+    finally:
+        es.close()
+
+
+def populate_index_in_parallel(es: Elasticsearch, index_name: str, process_count: int, thread_count: int) -> int:
+    """
+    Load every card into the index `index_name` by splitting the `Card` table into `process_count` ranges of primary
+    keys and loading each range in its own process. With a single process, the range is loaded in this process.
+    Returns the number of documents indexed.
+    """
+
+    partitions = get_partitions(process_count)
+    populate = functools.partial(populate_partition, index_name, thread_count)
+    if process_count <= 1:
+        return sum(map(populate, partitions))
+    # forked processes inherit the parent's database connections, which can't be shared - they open their own instead.
+    # processes are forked rather than spawned so that they inherit django's (possibly modified) settings.
+    connections.close_all()
+    with ProcessPoolExecutor(max_workers=process_count, mp_context=multiprocessing.get_context("fork")) as pool:
+        return sum(pool.map(populate, partitions))
+
+
+def finish_loading_index(es: Elasticsearch, index_name: str) -> int:
+    """
+    Restore the index's refresh interval and replica count (which are reduced while loading) and make its documents
+    visible to searches. Returns the number of documents in the index.
+    """
+
+    es.indices.put_settings(
+        index=index_name,
+        body={
+            "index": {
+                "refresh_interval": None,
+                "number_of_replicas": CardSearch.Index.settings.get("number_of_replicas", 1),
+            }
+        },
+    )
+    es.indices.refresh(index=index_name)
+    return es.count(index=index_name)["count"]
+
+
+def swap_alias(es: Elasticsearch, alias: str, index_name: str) -> list[str]:
+    """
+    Atomically point `alias` at `index_name` and away from every other index. Returns the indices it used to point to.
+    """
+
+    old_indices = get_alias_indices(es, alias)
+    actions: list[dict[str, Any]] = [{"add": {"index": index_name, "alias": alias}}]
+    if old_indices:
+        actions += [{"remove": {"index": old_index, "alias": alias}} for old_index in old_indices]
+    elif es.indices.exists(index=alias):
+        # the search index was created before it was served through an alias, and its name is the alias' name
+        actions.append({"remove_index": {"index": alias}})
+    es.indices.update_aliases(body={"actions": actions})
+    return old_indices
+
+
+def rebuild_search_index(
+    populate: Callable[[Elasticsearch, str], int] = populate_index, keep_old_indices: bool = False
+) -> tuple[str, int]:
+    """
+    Build a new search index with `populate`, validate it against the database, and serve it in place of the current
+    search index. Returns the name of the new index and the number of documents in it.
+    """
+
+    es = get_elasticsearch_connection()
+    alias = CardSearch.Index.name
+    index_name = create_versioned_index(es)
+    try:
+        populate(es, index_name)
+        document_count = finish_loading_index(es, index_name)
+        if document_count != (card_count := CardSearch().get_queryset().count()):
+            raise IndexingExceptions.DocumentCountMismatchException(
+                index=index_name, document_count=document_count, card_count=card_count
+            )
+    except Exception:
+        es.indices.delete(index=index_name, ignore=404)
+        raise
+
+    old_indices = swap_alias(es, alias=alias, index_name=index_name)
+    bump_catalog_generation()
+    update_catalog_filter()  # the catalog filter is only consulted under the generation it was built under
+    if old_indices and not keep_old_indices:
+        es.indices.delete(index=",".join(old_indices), ignore=404)
+    return index_name, document_count
+
+
+def get_routing_shards(es: Elasticsearch, index_name: str) -> dict[str, int]:
+    """
+    The shard of the index `index_name` which the documents of each card type are routed to.
+    """
+
+    return {
+        card_type.name: es.search_shards(index=index_name, routing=card_type.name)["shards"][0][0]["shard"]
+        for card_type in CardType
+    }
+
+
+def get_other_shard_routings(routing_shards: dict[str, int], shard: Optional[int]) -> list[str]:
+    """
+    A routing key for each shard in `routing_shards` other than `shard`. Card types can share a shard, and a document
+    which is deleted under one card type's routing key is deleted under any other routing key to the same shard.
+    """
+
+    routings: dict[int, str] = {}
+    for routing, routing_shard in sorted(routing_shards.items()):
+        if routing_shard != shard:
+            routings.setdefault(routing_shard, routing)
+    return list(routings.values())
+
+
+def get_delete_actions(index_name: str, pk: int, routings: Optional[Iterable[str]] = None) -> Iterator[dict[str, Any]]:
+    if routings is None:
+        yield {"_op_type": "delete", "_index": index_name, "_id": pk}
+    else:
+        for routing in routings:
+            yield {"_op_type": "delete", "_index": index_name, "_id": pk, "_routing": routing}
+
+
+def get_sync_actions(
+    index_name: str,
+    index_pks: Collection[int],
+    delete_pks: Collection[int],
+    update_fields: Optional[Mapping[int, Collection[str]]] = None,
+    routing_shards: Optional[dict[str, int]] = None,
+) -> Iterator[dict[str, Any]]:
+    document = CardSearch()
+    queryset = document.get_queryset()
+    sorted_index_pks = sorted(index_pks)
+    for i in range(0, len(sorted_index_pks), SEARCH_INDEX_QUERYSET_CHUNK_SIZE):
+        for card in queryset.filter(pk__in=sorted_index_pks[i : i + SEARCH_INDEX_QUERYSET_CHUNK_SIZE]):
+            yield from get_index_actions(index_name, [card])
+            if routing_shards is not None:
+                # the card's type may have changed, which would leave its old document on another shard
+                yield from get_delete_actions(
+                    index_name, card.pk, get_other_shard_routings(routing_shards, routing_shards[card.card_type])
+                )
+    update_fields = update_fields or {}
+    sorted_update_pks = sorted(update_fields)
+    for i in range(0, len(sorted_update_pks), SEARCH_INDEX_QUERYSET_CHUNK_SIZE):
+        for card in queryset.filter(pk__in=sorted_update_pks[i : i + SEARCH_INDEX_QUERYSET_CHUNK_SIZE]):
+            yield {
+                "_op_type": "update",
+                "_index": index_name,
+                "_id": document.generate_id(card),
+                "doc": get_partial_document(document, card, update_fields[card.pk]),
+                **get_routing_meta(card),
+            }
+    for pk in delete_pks:
+        yield from get_delete_actions(
+            index_name, pk, get_other_shard_routings(routing_shards, None) if routing_shards is not None else None
+        )
+
+
+def sync_search_index(
+    index_pks: Collection[int],
+    delete_pks: Collection[int],
+    update_fields: Optional[Mapping[int, Collection[str]]] = None,
+) -> None:
+    """
+    Index the cards with primary keys `index_pks` as they're stored in the database, and delete the documents of the
+    cards with primary keys `delete_pks`. `update_fields` maps the primary keys of other cards to the fields of their
+    documents to update in place. This should be called after the changes to these cards have been committed.
+
+    Documents are sent in concurrent bulk requests which are limited by size in bytes as well as by document count.
+    For large syncs, the search index isn't refreshed until every document has been sent.
+    """
+
+    es = get_elasticsearch_connection()
+    alias = CardSearch.Index.name
+    routing_shards = get_routing_shards(es, alias) if settings.SEARCH_INDEX_ROUTING_BY_CARD_TYPE else None
+    sync_count = len(index_pks) + len(delete_pks) + len(update_fields or {})
+    suspend_refresh = sync_count >= SEARCH_INDEX_SUSPEND_REFRESH_THRESHOLD and es.indices.exists(index=alias)
+    if suspend_refresh:
+        es.indices.put_settings(index=alias, body={"index": {"refresh_interval": "-1"}})
+    try:
+        # `parallel_bulk` is lazy, so it's consumed here
+        deque(
+            parallel_bulk(
+                es,
+                get_sync_actions(
+                    alias,
+                    index_pks=index_pks,
+                    delete_pks=delete_pks,
+                    update_fields=update_fields,
+                    routing_shards=routing_shards,
+                ),
+                thread_count=SEARCH_INDEX_BULK_THREAD_COUNT,
+                chunk_size=SEARCH_INDEX_SYNC_CHUNK_SIZE,
+                max_chunk_bytes=SEARCH_INDEX_SYNC_CHUNK_BYTES,
+                ignore_status=(404,),  # the documents of deleted cards may already be missing
+            ),
+            maxlen=0,
+        )
+    finally:
+        if suspend_refresh:
+            es.indices.put_settings(index=alias, body={"index": {"refresh_interval": None}})
+    es.indices.refresh(index=alias)
+
+
+def get_outbox_retry_delay(attempts: int) -> dt.timedelta:
+    """
+    How long to wait before retrying an outbox entry which has failed to sync `attempts` times.
+    """
+
+    return dt.timedelta(
+        seconds=min(SEARCH_INDEX_OUTBOX_RETRY_DELAY * 2 ** (attempts - 1), SEARCH_INDEX_OUTBOX_MAX_RETRY_DELAY)
+    )
+
+
+def drain_search_index_outbox_batch(batch_size: int = SEARCH_INDEX_OUTBOX_BATCH_SIZE) -> list[SearchIndexOutboxEntry]:
+    """
+    Sync up to `batch_size` of the oldest outbox entries which are due with the search index, then delete them.
+    Cards which still exist are indexed as they're stored in the database, and the documents of cards which don't are
+    deleted, so a card with several entries is only synced once. Cards whose entries only list some document fields
+    have just those fields updated.
+    The entries are claimed for `SEARCH_INDEX_OUTBOX_LEASE` seconds in a short transaction before they're synced, so
+    other workers skip them without the rows being locked while waiting on the search engine. If this worker dies
+    mid-sync, the entries are picked up again once the lease runs out. If the sync fails, the entries are rescheduled
+    and `IndexingExceptions.OutboxSyncException` is raised. Returns the entries drained.
+    """
+
+    with transaction.atomic():
+        entries = list(
+            SearchIndexOutboxEntry.objects.select_for_update(skip_locked=True)
+            .filter(date_available__lte=timezone.now())
+            .order_by("pk")[:batch_size]
+        )
+        if not entries:
+            return []
+        SearchIndexOutboxEntry.objects.filter(pk__in=[entry.pk for entry in entries]).update(
+            date_available=timezone.now() + dt.timedelta(seconds=SEARCH_INDEX_OUTBOX_LEASE)
+        )
+
+    card_pks = {entry.card_pk for entry in entries}
+    existing_pks = set(Card.objects.filter(pk__in=card_pks).values_list("pk", flat=True))
+    index_pks = {entry.card_pk for entry in entries if not entry.document_fields} & existing_pks
+    update_fields: defaultdict[int, set[str]] = defaultdict(set)
+    for entry in entries:
+        if entry.card_pk in existing_pks and entry.card_pk not in index_pks:
+            update_fields[entry.card_pk].update(entry.document_fields)
+    try:
+        sync_search_index(index_pks=index_pks, delete_pks=card_pks - existing_pks, update_fields=update_fields)
+    except ElasticsearchException as e:
+        now = timezone.now()
+        for entry in entries:
+            entry.attempts += 1
+            entry.date_available = now + get_outbox_retry_delay(entry.attempts)
+        SearchIndexOutboxEntry.objects.bulk_update(entries, ["attempts", "date_available"])
+        raise IndexingExceptions.OutboxSyncException(entry_count=len(entries)) from e
+    # entries recorded while the batch was syncing aren't deleted, so those changes will be synced next time
+    SearchIndexOutboxEntry.objects.filter(pk__in=[entry.pk for entry in entries]).delete()
+    return entries
+
+
+def is_changed_by(entry: SearchIndexOutboxEntry, document_fields: frozenset[str]) -> bool:
+    # entries without document fields record changes to whole cards, which may change any field
+    return not entry.document_fields or not document_fields.isdisjoint(entry.document_fields)
+
+
+def get_catalog_artefact_updates() -> dict[str, Callable[[], Any]]:
+    """
+    The functions which rebuild and publish each catalog artefact in use, by the artefact's key.
+    """
+
+    updates: dict[str, Callable[[], Any]] = {
+        CATALOG_FILTER_KEY: update_catalog_filter,
+        CARDBACK_TABLE_KEY: update_cardback_table,
+        AUTOCOMPLETE_INDEX_KEY: update_autocomplete_index,
+        SPELLING_DICTIONARY_KEY: update_spelling_dictionary,
+    }
+    if get_configured_search_backend() is InMemorySearchBackend:
+        updates[IN_MEMORY_INDEX_KEY] = update_in_memory_index
+    return updates
+
+
+def get_pending_rebuild_key(key: str) -> str:
+    return f"{key}:pending-rebuild"
+
+
+def get_rebuilt_at_key(key: str) -> str:
+    return f"{key}:rebuilt-at"
+
+
+def rebuild_catalog_artefacts(changed_keys: Collection[str]) -> list[str]:
+    """
+    Record that the catalog artefacts with keys `changed_keys` are out of date, then rebuild each out of date artefact
+    which hasn't been rebuilt in the last `CATALOG_ARTEFACT_REBUILD_INTERVAL` seconds. The others continue to be served
+    as they are until a later call rebuilds them, so frequent drains of the outbox don't rebuild every artefact each
+    time. Returns the keys of the artefacts which were rebuilt.
+    """
+
+    catalog_cache = get_catalog_cache()
+    updates = get_catalog_artefact_updates()
+    if pending_keys := [get_pending_rebuild_key(key) for key in changed_keys if key in updates]:
+        catalog_cache.set_many({pending_key: True for pending_key in pending_keys}, timeout=None)
+    states = catalog_cache.get_many(
+        [get_pending_rebuild_key(key) for key in updates] + [get_rebuilt_at_key(key) for key in updates]
+    )
+    rebuilt: list[str] = []
+    for key, update in updates.items():
+        if (
+            get_pending_rebuild_key(key) in states
+            and time.time() - states.get(get_rebuilt_at_key(key), 0) >= CATALOG_ARTEFACT_REBUILD_INTERVAL
+        ):
+            # the artefact is marked as up to date before it's rebuilt, so changes recorded during the rebuild aren't lost
+            catalog_cache.delete(get_pending_rebuild_key(key))
+            try:
+                update()
+            except Exception:
+                catalog_cache.set(get_pending_rebuild_key(key), True, timeout=None)
+                raise
+            catalog_cache.set(get_rebuilt_at_key(key), time.time(), timeout=None)
+            rebuilt.append(key)
+    return rebuilt
+
+
+def drain_search_index_outbox(batch_size: int = SEARCH_INDEX_OUTBOX_BATCH_SIZE) -> int:
+    """
+    Sync every outbox entry which is due with the search index, in batches of up to `batch_size` entries. If the
+    changes could affect search results, the catalog generation is bumped. The catalog artefacts built from the changed
+    fields are then rebuilt so requests don't need to, at most once every `CATALOG_ARTEFACT_REBUILD_INTERVAL` seconds
+    each - see `rebuild_catalog_artefacts`. Returns the number of entries drained.
+    """
+
+    drained = 0
+    changes_search_results = False
+    changed_keys: set[str] = set()
+    try:
+        while entries := drain_search_index_outbox_batch(batch_size=batch_size):
+            drained += len(entries)
+            changes_search_results |= any(is_changed_by(entry, SEARCH_RESULT_DOCUMENT_FIELDS) for entry in entries)
+            changed_keys |= {
+                key
+                for key, document_fields in CATALOG_ARTEFACT_DOCUMENT_FIELDS.items()
+                if any(is_changed_by(entry, document_fields) for entry in entries)
+            }
+    finally:
+        # the batches drained before a failure have still changed the search index
+        if changes_search_results:
+            bump_catalog_generation()
+        rebuild_catalog_artefacts(changed_keys)
+    return drained
+
+
+__all__ = [
+    "IndexingExceptions",
+    "get_alias_indices",
+    "create_versioned_index",
+    "populate_index",
+    "get_partitions",
+    "populate_index_in_parallel",
+    "finish_loading_index",
+    "swap_alias",
+    "rebuild_search_index",
+    "sync_search_index",
+    "rebuild_catalog_artefacts",
+    "drain_search_index_outbox",
+]
@@ -1,6 +1,9 @@
+import functools
 import json
 import re
 import string
+import unicodedata
+from typing import Iterable
 
 
 def text_to_list(input_text: str) -> list[int]:
@@ -12,9 +15,20 @@ def text_to_list(input_text: str) -> list[int]:
     return []  # Unexpected format, return an empty list
 
 
+WHITESPACE = re.compile(r"\s+")
+
+BRACKETED_TEXT = re.compile(r"[\(\[].*?[\)\]]")
+
+# substitutes hyphens for spaces and removes punctuation and digits in a single pass. right apostrophes (’) are
+# treated as single quotes (') and so are removed too.
+SEARCHABLE_TRANSLATION = str.maketrans(
+    {"-": " ", "’": None, **{character: None for character in string.punctuation + string.digits if character != "-"}}
+)
+
+
 def fix_whitespace(input_str: str) -> str:
     # Replace any consecutive whitespace characters by a single splace and strip the string
-    return re.sub(r"\s+", " ", input_str).strip()
+    return WHITESPACE.sub(" ", input_str).strip()
 
 
 def to_searchable(input_str: str) -> str:
@@ -26,21 +40,92 @@ def to_searchable(input_str: str) -> str:
     input_str = input_str.lower()
 
     # Remove text inside brackets
-    input_str = re.sub(r"[\(\[].*?[\)\]]", "", input_str)
+    if "(" in input_str or "[" in input_str:
+        input_str = BRACKETED_TEXT.sub("", input_str)
 
-    # Remove hyphens and substitute right apostrophes (’) for single quotes (')
-    input_str = input_str.replace("-", " ").replace("’", "'")
+    # Substitute hyphens for spaces, remove punctuation (including right apostrophes) and remove all digits
+    input_str = input_str.translate(SEARCHABLE_TRANSLATION)
 
-    # Remove punctuation
-    input_str = input_str.translate(str.maketrans("", "", string.punctuation))
+    # Fix whitespace
+    return WHITESPACE.sub(" ", input_str).strip()
 
-    # Remove all digits
-    input_str = input_str.translate(str.maketrans("", "", string.digits))
 
-    # Fix whitespace
-    input_str = fix_whitespace(input_str)
+def to_searchable_many(input_strs: Iterable[str]) -> list[str]:
+    """
+    Equivalent to `[to_searchable(input_str) for input_str in input_strs]`, but faster for large batches of names.
+    """
+
+    # bind everything used in the loop to locals to avoid repeated global and attribute lookups
+    remove_bracketed_text = BRACKETED_TEXT.sub
+    fix_whitespace_ = WHITESPACE.sub
+    translation = SEARCHABLE_TRANSLATION
+    results: list[str] = []
+    append = results.append
+    for input_str in input_strs:
+        if not input_str:
+            append("")
+            continue
+        input_str = input_str.lower()
+        if "(" in input_str or "[" in input_str:
+            input_str = remove_bracketed_text("", input_str)
+        append(fix_whitespace_(" ", input_str.translate(translation)).strip())
+    return results
+
+
+# region analyser emulation
+# these functions approximate the analysers configured in `documents.py` for search backends other than elasticsearch.
+# they expect their input to have already been passed through `to_searchable`, which removes apostrophes, so elastic's
+# `apostrophe` token filter is not emulated.
+
+# characters which `asciifolding` folds but which have no unicode decomposition
+ASCII_FOLDING_EXCEPTIONS = str.maketrans(
+    {"æ": "ae", "ð": "d", "đ": "d", "ħ": "h", "ı": "i", "ł": "l", "ø": "o", "œ": "oe", "ß": "ss", "þ": "th"}
+)
+
+# the `standard` tokeniser splits ideographic and hiragana text into one token per character
+CJK_CHARACTERS = r"\u3040-\u309f\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff"
+STANDARD_TOKENS = re.compile(rf"[{CJK_CHARACTERS}]|[^\W_{CJK_CHARACTERS}]+")
+
+
+@functools.cache
+def ascii_fold_character(character: str) -> str:
+    if character.isascii():
+        return character
+    if (folded := character.translate(ASCII_FOLDING_EXCEPTIONS)) != character:
+        return folded
+    # fold characters which decompose to ascii (e.g. "é" to "e") and leave everything else (e.g. "が") untouched
+    decomposed = "".join(c for c in unicodedata.normalize("NFKD", character) if not unicodedata.combining(c))
+    return decomposed if decomposed and decomposed.isascii() else character
+
+
+def ascii_fold(input_str: str) -> str:
+    return "".join(ascii_fold_character(character) for character in input_str)
+
+
+def to_precise_search_key(input_str: str) -> str:
+    """
+    Emulates `precise_analyser`, which produces a single token for the entire string.
+    """
+
+    return ascii_fold(input_str.lower())
+
+
+def to_fuzzy_search_tokens(input_str: str) -> list[str]:
+    """
+    Emulates `fuzzy_analyser`, which splits the string into words.
+    """
+
+    return STANDARD_TOKENS.findall(to_precise_search_key(input_str))
 
-    return input_str
 
+# endregion
 
-__all__ = ["text_to_list", "fix_whitespace", "to_searchable"]
+__all__ = [
+    "text_to_list",
+    "fix_whitespace",
+    "to_searchable",
+    "to_searchable_many",
+    "ascii_fold",
+    "to_precise_search_key",
+    "to_fuzzy_search_tokens",
+]
@@ -1,24 +1,43 @@
 import datetime as dt
 import threading
-from typing import Any, Callable, TypeVar, cast
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from typing import Any, Callable, Iterable, Iterator, Optional, TypeVar, cast
 
 import pycountry
 from elasticsearch import Elasticsearch
 from elasticsearch.exceptions import ConnectionError as ElasticConnectionError
+from elasticsearch.exceptions import NotFoundError, TransportError
+from elasticsearch_dsl import Index, MultiSearch, connections
 from elasticsearch_dsl.query import Bool, Match, Range, Terms
 
 from django.conf import settings
 from django.core.paginator import Paginator
-from django.db.models import Q, QuerySet
+from django.db.models import QuerySet
+from django.db.models.functions import Upper
 from django.utils import timezone
 
-from cardpicker.constants import NEW_CARDS_DAYS, NEW_CARDS_PAGE_SIZE
+from cardpicker.constants import (
+    EDITOR_SEARCH_MSEARCH_BATCH_SIZE,
+    EDITOR_SEARCH_MSEARCH_PAGE_SIZE,
+    EDITOR_SEARCH_PIT_KEEP_ALIVE,
+    EDITOR_SEARCH_PIT_PAGE_SIZE,
+    NEW_CARDS_DAYS,
+    NEW_CARDS_PAGE_SIZE,
+    SEARCH_ENGINE_HEALTH_TTL,
+)
 from cardpicker.documents import CardSearch
-from cardpicker.models import Card, CardTypes, Source
-from cardpicker.schema_types import CardType, SearchSettings
-from cardpicker.search.sanitisation import to_searchable
-
-thread_local = threading.local()  # Should only be called once per thread
+from cardpicker.models import Card, Source
+from cardpicker.schema_types import Card as SerialisedCard
+from cardpicker.schema_types import CardType, SearchQuery, SearchSettings
+from cardpicker.search.caching import SearchResultsCache, get_catalog_generation
+from cardpicker.search.cardback_table import CardbackTable, get_cardback_table
+from cardpicker.search.sanitisation import (
+    to_precise_search_key,
+    to_searchable,
+    to_searchable_many,
+)
 
 # https://mypy.readthedocs.io/en/stable/generics.html#declaring-decorators
 F = TypeVar("F", bound=Callable[..., Any])
@@ -45,25 +64,125 @@ class SearchExceptions:
 
 
 def get_elasticsearch_connection() -> Elasticsearch:
-    if (es := getattr(thread_local, "elasticsearch", None)) is None:
-        es = Elasticsearch([settings.ELASTICSEARCH_HOST], port=settings.ELASTICSEARCH_PORT)
-    return es
+    """
+    The process-wide Elasticsearch client configured by `settings.ELASTICSEARCH_DSL`. The client is thread-safe and
+    maintains its own connection pool, so it should be reused rather than constructed for each request.
+    """
+
+    return connections.get_connection()
 
 
 def ping_elasticsearch() -> bool:
     return get_elasticsearch_connection().ping()
 
 
+class SearchEngineHealthMonitor:
+    """
+    Tracks whether the search engine is online and whether the search index exists, so search requests don't need to
+    make two round trips to the search engine to check before doing any work.
+
+    A healthy status is trusted for `ttl` seconds, after which it's refreshed in a background thread while the stale
+    status continues to be served. An unhealthy status is never trusted - it's re-checked on each read so the site
+    recovers as soon as the search engine does.
+    """
+
+    def __init__(self, ttl: float = SEARCH_ENGINE_HEALTH_TTL) -> None:
+        self.ttl = ttl
+        self.lock = threading.Lock()
+        self.online = False
+        self.index_exists = False
+        self.checked_at: Optional[float] = None
+        self.refreshing = False
+
+    @property
+    def healthy(self) -> bool:
+        return self.online and self.index_exists
+
+    def check(self) -> tuple[bool, bool]:
+        es = get_elasticsearch_connection()
+        try:
+            online = es.ping()
+            index_exists = online and Index(CardSearch.Index.name, using=es).exists()
+        except TransportError:  # e.g. the search engine is unreachable or responds with a server error
+            online, index_exists = False, False
+        return online, index_exists
+
+    def refresh(self) -> None:
+        try:
+            online, index_exists = self.check()
+            with self.lock:
+                self.online, self.index_exists = online, index_exists
+                self.checked_at = time.monotonic()
+        finally:
+            # background refreshes must be able to resume even if this one failed unexpectedly
+            with self.lock:
+                self.refreshing = False
+
+    def refresh_in_background(self) -> None:
+        with self.lock:
+            if self.refreshing:
+                return
+            self.refreshing = True
+        threading.Thread(target=self.refresh, name="search-engine-health", daemon=True).start()
+
+    def get_status(self) -> tuple[bool, bool]:
+        """
+        Returns whether the search engine is online and whether the search index exists.
+        """
+
+        if self.checked_at is None or not self.healthy:
+            self.refresh()
+        elif time.monotonic() - self.checked_at > self.ttl:
+            self.refresh_in_background()
+        return self.online, self.index_exists
+
+    def invalidate(self) -> None:
+        """
+        Forget the current status. Called when a search request observes that the search engine is unhealthy.
+        """
+
+        with self.lock:
+            self.checked_at = None
+
+
+search_engine_health = SearchEngineHealthMonitor()
+
+
+def ensure_search_engine_is_available() -> None:
+    online, index_exists = search_engine_health.get_status()
+    if not online:
+        raise SearchExceptions.ElasticsearchOfflineException
+    if not index_exists:
+        raise SearchExceptions.IndexNotFoundException(CardSearch.__name__)
+
+
+@contextmanager
+def elastic_errors() -> Iterator[None]:
+    """
+    Makes elasticsearch's connection error more readable.
+    Errors which indicate that the search engine is unhealthy also invalidate its cached health status.
+    """
+
+    try:
+        yield
+    except ElasticConnectionError:
+        search_engine_health.invalidate()
+        raise SearchExceptions.ConnectionTimedOutException
+    except NotFoundError as e:
+        if e.error != "index_not_found_exception":
+            raise
+        search_engine_health.invalidate()
+        raise SearchExceptions.IndexNotFoundException(CardSearch.__name__)
+
+
 def elastic_connection(func: F) -> F:
     """
     Small function wrapper which makes elasticsearch's connection error more readable.
     """
 
     def wrapper(*args: Any, **kwargs: dict[str, Any]) -> F:
-        try:
+        with elastic_errors():
             return func(*args, **kwargs)
-        except ElasticConnectionError:
-            raise SearchExceptions.ConnectionTimedOutException
 
     return cast(F, wrapper)
 
@@ -72,6 +191,30 @@ def get_source_order(search_settings: SearchSettings) -> dict[int, int]:
     return {pk: i for i, (pk, _) in enumerate(search_settings.sourceSettings.sources) if isinstance(pk, int)}
 
 
+def get_source_order_sort(search_settings: SearchSettings) -> list[dict[str, Any]]:
+    """
+    Sorts search results by the position of their source in `search_settings`, then by priority (descending).
+    Script params must be JSON objects, so the source order is keyed by each source's stringified primary key.
+    """
+
+    return [
+        {
+            "_script": {
+                "type": "number",
+                "order": "asc",
+                "script": {
+                    "lang": "painless",
+                    "source": "params.order[String.valueOf(doc['source_pk'].value)]",
+                    "params": {
+                        "order": {str(pk): i for pk, i in get_source_order(search_settings=search_settings).items()}
+                    },
+                },
+            }
+        },
+        {"priority": {"order": "desc"}},
+    ]
+
+
 def get_enabled_source_pks(search_settings: SearchSettings) -> list[int]:
     return [pk for (pk, enabled) in search_settings.sourceSettings.sources if isinstance(pk, int) and enabled is True]
 
@@ -88,6 +231,17 @@ def get_scaled_maximum_size(search_settings: SearchSettings) -> int:
     return search_settings.filterSettings.maximumSize * 1_000_000
 
 
+def get_search_routing(card_types: Iterable[CardType]) -> Optional[str]:
+    """
+    The routing key for searches for cards of `card_types`, or None if every shard must be searched. With
+    `settings.SEARCH_INDEX_ROUTING_BY_CARD_TYPE`, a search for a single card type only queries the shard holding it.
+    """
+
+    if not settings.SEARCH_INDEX_ROUTING_BY_CARD_TYPE or not card_types:
+        return None
+    return ",".join(sorted({card_type.name for card_type in card_types}))
+
+
 def get_search(
     search_settings: SearchSettings,
     query: str | None,
@@ -120,7 +274,7 @@ def get_search(
             )
         )
         .filter(Range(size={"lte": get_scaled_maximum_size(search_settings=search_settings)}))
-        .source(fields=["identifier", "source_pk", "searchq"])
+        .source(fields=["identifier"])
     )
     if query:
         query_parsed = to_searchable(query)
@@ -136,6 +290,8 @@ def get_search(
                 minimum_should_match=1,
             )
         )
+        if (routing := get_search_routing(card_types)) is not None:
+            s = s.params(routing=routing)
     if expansion_code:
         s = s.filter("term", expansion_code=expansion_code.upper())
     if collector_number:
@@ -154,75 +310,237 @@ def get_search(
     return s
 
 
-@elastic_connection
-def retrieve_card_identifiers(
-    search_settings: SearchSettings,
-    query: str,
-    card_type: CardType,
-    expansion_code: str | None = None,
-    collector_number: str | None = None,
-) -> list[str]:
-    hits_iterable = (
+def get_editor_search(search_settings: SearchSettings, search_query: SearchQuery) -> CardSearch:
+    """
+    The search for a single editor search query. Only card identifiers are retrieved (from doc values rather than
+    from `_source`) and hits are sorted by source order, then by priority.
+    """
+
+    return (
         get_search(
             search_settings=search_settings,
-            query=query,
-            card_types=[card_type],
-            expansion_code=expansion_code,
-            collector_number=collector_number,
+            query=search_query.query,
+            card_types=[search_query.cardType],
+            expansion_code=search_query.expansionCode,
+            collector_number=search_query.collectorNumber,
         )
-        .sort({"priority": {"order": "desc"}})
-        .params(preserve_order=True)
-        .scan()
+        .sort(*get_source_order_sort(search_settings=search_settings))
+        .source(False)
+        .extra(docvalue_fields=["identifier"])
     )
-    source_order = get_source_order(search_settings=search_settings)
-    return [result.identifier for result in sorted(hits_iterable, key=lambda result: source_order[result.source_pk])]
 
 
-def retrieve_cardback_identifiers(search_settings: SearchSettings) -> list[str]:
+def get_identifiers(hits: Iterable[CardSearch]) -> list[str]:
+    return [hit.meta.fields.identifier[0] for hit in hits]
+
+
+def page_card_identifiers(search_settings: SearchSettings, search_query: SearchQuery) -> list[str]:
     """
-    Retrieve the IDs of all cardbacks in the database, possibly filtered by search settings.
+    Retrieve every hit for a single query, bypassing the search results cache. Pages of hits are retrieved from a
+    point in time with `search_after`, which (unlike a scroll search) doesn't hold a search context open on each shard.
     """
 
-    cardbacks: list[str]
-    order_by = ["-priority", "source__ordinal", "source__name", "name"]
-    if search_settings.searchTypeSettings.filterCardbacks:
-        # afaik, `~Q(pk__in=[])` is the best way to have an always-true filter
-        language_filter = (
-            Q(language__in=[lang.upper() for lang in get_enabled_languages(search_settings)])
-            if search_settings.filterSettings.languages
-            else ~Q(pk__in=[])
-        )
-        includes_tag_filter = (
-            (
-                Q(tags__contains=search_settings.filterSettings.includesTags)
-                | Q(tags__contained_by=search_settings.filterSettings.includesTags)
+    es = get_elasticsearch_connection()
+    pit_id = es.open_point_in_time(
+        index=CardSearch.Index.name,
+        keep_alive=EDITOR_SEARCH_PIT_KEEP_ALIVE,
+        routing=get_search_routing([search_query.cardType]),
+    )["id"]
+    # searches against a point in time must not specify an index or a routing key (it's specified when the point in time
+    # is opened instead)
+    s = get_editor_search(search_settings=search_settings, search_query=search_query).index().params(routing=None)
+    identifiers: list[str] = []
+    search_after: Optional[list[Any]] = None
+    try:
+        while True:
+            page = s.extra(
+                size=EDITOR_SEARCH_PIT_PAGE_SIZE,
+                pit={"id": pit_id, "keep_alive": EDITOR_SEARCH_PIT_KEEP_ALIVE},
+                **({"search_after": search_after} if search_after is not None else {}),
+            ).execute()
+            identifiers += get_identifiers(page.hits)
+            pit_id = page.pit_id  # elasticsearch may return a new id for the point in time with each page
+            if len(page.hits) < EDITOR_SEARCH_PIT_PAGE_SIZE:
+                break
+            # point in time searches add an implicit tiebreaker to the sort, so this identifies a unique hit
+            search_after = list(page.hits[-1].meta.sort)
+    finally:
+        es.close_point_in_time(body={"id": pit_id})
+    return identifiers
+
+
+@elastic_connection
+def search_card_identifiers_batch(search_settings: SearchSettings, queries: list[SearchQuery]) -> list[list[str]]:
+    """
+    Retrieve every hit for each of `queries`, bypassing the search results cache. The queries are sent to
+    Elasticsearch in as few `_msearch` requests as possible, retrieving a single page of hits for each query.
+    Any query with more hits than fit in that page is paged through with a point in time instead.
+    Results are returned in the same order as `queries`.
+    """
+
+    results: list[list[str]] = []
+    for i in range(0, len(queries), EDITOR_SEARCH_MSEARCH_BATCH_SIZE):
+        batch = queries[i : i + EDITOR_SEARCH_MSEARCH_BATCH_SIZE]
+        multi_search = MultiSearch(index=CardSearch.Index.name)
+        for search_query in batch:
+            multi_search = multi_search.add(
+                get_editor_search(search_settings=search_settings, search_query=search_query).extra(
+                    size=EDITOR_SEARCH_MSEARCH_PAGE_SIZE
+                )
             )
-            if search_settings.filterSettings.includesTags
-            else ~Q(pk__in=[])
+        for search_query, response in zip(batch, multi_search.execute()):
+            if response.hits.total.value > len(response.hits):
+                results.append(page_card_identifiers(search_settings=search_settings, search_query=search_query))
+            else:
+                results.append(get_identifiers(response.hits))
+    return results
+
+
+def get_serialised_cards(hits: Iterable[CardSearch]) -> dict[str, SerialisedCard]:
+    """
+    The serialised cards stored in the documents of `hits`, keyed by identifier. Hits must include `identifier` and
+    `serialised` in their `_source`. Documents indexed without `settings.SERIALISED_CARDS_IN_SEARCH_ENGINE` don't store
+    serialised cards, so these hits are omitted.
+    """
+
+    return {
+        hit.identifier: SerialisedCard.model_validate(serialised.to_dict())
+        for hit in hits
+        if (serialised := getattr(hit, "serialised", None)) is not None
+    }
+
+
+@elastic_connection
+def search_serialised_cards(card_identifiers: list[str]) -> dict[str, SerialisedCard]:
+    """
+    Retrieve the serialised cards stored in the search engine for `card_identifiers` in a single request.
+    Cards which aren't stored there are omitted.
+    """
+
+    if not card_identifiers:
+        return {}
+    s = (
+        CardSearch.search()
+        .filter(Terms(identifier=card_identifiers))
+        .source(fields=["identifier", "serialised"])
+        .extra(size=len(card_identifiers))
+    )
+    return get_serialised_cards(s.execute())
+
+
+def query_precise_card_identifiers_batch(
+    search_settings: SearchSettings, queries: list[SearchQuery]
+) -> list[list[str]]:
+    """
+    Answer precise (non-fuzzy) searches from the database rather than from Elasticsearch. Precise searches are exact
+    matches on the normalised card name, so each of `queries` is equivalent to a lookup on `Card.searchq_precise`.
+    Every query is retrieved with a single database query, with each query's results then ordered the same way as
+    Elasticsearch would order them. Results are returned in the same order as `queries`, and queries must not be empty.
+    """
+
+    filter_settings = search_settings.filterSettings
+    query_keys = [
+        to_precise_search_key(query_parsed)
+        for query_parsed in to_searchable_many(search_query.query or "" for search_query in queries)
+    ]
+    cards = Card.objects.filter(
+        searchq_precise__in={query_key for query_key in query_keys if query_key},
+        card_type__in={search_query.cardType.value for search_query in queries},
+        source__pk__in=get_enabled_source_pks(search_settings=search_settings),
+        dpi__gte=filter_settings.minimumDPI,
+        dpi__lte=filter_settings.maximumDPI,
+        size__lte=get_scaled_maximum_size(search_settings=search_settings),
+    )
+    if filter_settings.languages:
+        # languages are matched case-insensitively in elasticsearch
+        cards = cards.alias(language_upper=Upper("language")).filter(
+            language_upper__in=[language.upper() for language in get_enabled_languages(search_settings)]
         )
-        excludes_tag_filter = (
-            ~Q(tags__overlap=search_settings.filterSettings.excludesTags)
-            if search_settings.filterSettings.excludesTags
-            else ~Q(pk__in=[])
+    if filter_settings.includesTags:
+        cards = cards.filter(tags__overlap=filter_settings.includesTags)
+    if filter_settings.excludesTags:
+        cards = cards.exclude(tags__overlap=filter_settings.excludesTags)
+
+    hits: dict[tuple[str, str], list[tuple[str, int, Optional[str], Optional[str]]]] = defaultdict(list)
+    for identifier, searchq_precise, card_type, source_pk, expansion_code, collector_number in cards.order_by(
+        "-priority", "pk"
+    ).values_list(
+        "identifier",
+        "searchq_precise",
+        "card_type",
+        "source_id",
+        "canonical_card__expansion__code",
+        "canonical_card__collector_number",
+    ):
+        hits[(searchq_precise, card_type)].append((identifier, source_pk, expansion_code, collector_number))
+
+    # hits are ordered by priority and python's sort is stable
+    source_order = get_source_order(search_settings=search_settings)
+    results: list[list[str]] = []
+    for query_key, search_query in zip(query_keys, queries):
+        query_expansion_code = search_query.expansionCode.upper() if search_query.expansionCode else None
+        results.append(
+            [
+                identifier
+                for identifier, _, hit_expansion_code, hit_collector_number in sorted(
+                    hits[(query_key, search_query.cardType.value)], key=lambda hit: source_order[hit[1]]
+                )
+                if (query_expansion_code is None or (hit_expansion_code or "").upper() == query_expansion_code)
+                and (not search_query.collectorNumber or hit_collector_number == search_query.collectorNumber)
+            ]
         )
-        source_order = get_source_order(search_settings=search_settings)
-        hits_iterable = Card.objects.filter(
-            language_filter,
-            includes_tag_filter,
-            excludes_tag_filter,
-            card_type=CardTypes.CARDBACK,
-            source__pk__in=get_enabled_source_pks(search_settings=search_settings),
-            dpi__gte=search_settings.filterSettings.minimumDPI,
-            dpi__lte=search_settings.filterSettings.maximumDPI,
-            size__lte=get_scaled_maximum_size(search_settings=search_settings),
-        ).order_by(*order_by)
-        hits = sorted(hits_iterable, key=lambda card: source_order[card.source.pk])
-        cardbacks = [card.identifier for card in hits]
-    else:
-        cardbacks = [card.identifier for card in Card.objects.filter(card_type=CardTypes.CARDBACK).order_by(*order_by)]
+    return results
+
+
+def retrieve_cardback_identifiers(search_settings: SearchSettings) -> list[str]:
+    """
+    Retrieve the IDs of all cardbacks in the database, possibly filtered by search settings.
+    """
+
+    search_results_cache = SearchResultsCache(search_settings=search_settings)
+    cache_key = search_results_cache.get_cardbacks_key()
+    if (cardbacks := search_results_cache.get(cache_key)) is None:
+        table_generation, table = get_cardback_table(generation=search_results_cache.generation)
+        cardbacks = search_cardback_table(table=table, search_settings=search_settings)
+        # a table built under an earlier generation is served until it's rebuilt, but its results mustn't be cached
+        # under the current generation or they'd outlive the rebuild
+        if table_generation == search_results_cache.generation:
+            search_results_cache.set(cache_key, cardbacks)
     return cardbacks
 
 
+def query_cardback_identifiers(search_settings: SearchSettings) -> list[str]:
+    """
+    Retrieve the IDs of all cardbacks from the cardback table, bypassing the search results cache.
+    """
+
+    _, table = get_cardback_table(generation=get_catalog_generation())
+    return search_cardback_table(table=table, search_settings=search_settings)
+
+
+def search_cardback_table(table: CardbackTable, search_settings: SearchSettings) -> list[str]:
+    if not search_settings.searchTypeSettings.filterCardbacks:
+        return table.get_all()
+
+    filter_settings = search_settings.filterSettings
+    enabled_source_pks = set(get_enabled_source_pks(search_settings=search_settings))
+    return table.search(
+        source_order={
+            pk: i for pk, i in get_source_order(search_settings=search_settings).items() if pk in enabled_source_pks
+        },
+        languages=(
+            {language.upper() for language in get_enabled_languages(search_settings)}
+            if filter_settings.languages
+            else None
+        ),
+        includes_tags=frozenset(filter_settings.includesTags) if filter_settings.includesTags else None,
+        excludes_tags=frozenset(filter_settings.excludesTags) if filter_settings.excludesTags else None,
+        minimum_dpi=filter_settings.minimumDPI,
+        maximum_dpi=filter_settings.maximumDPI,
+        maximum_size=get_scaled_maximum_size(search_settings=search_settings),
+    )
+
+
 def get_new_cards_paginator(source: Source) -> Paginator[QuerySet[Card]]:
     now = timezone.now()
     cards = Card.objects.filter(
@@ -235,9 +553,23 @@ __all__ = [
     "SearchExceptions",
     "get_elasticsearch_connection",
     "ping_elasticsearch",
+    "SearchEngineHealthMonitor",
+    "search_engine_health",
+    "ensure_search_engine_is_available",
+    "elastic_errors",
     "elastic_connection",
+    "get_identifiers",
+    "get_source_order_sort",
+    "get_search_routing",
     "get_search",
-    "retrieve_card_identifiers",
+    "get_editor_search",
+    "page_card_identifiers",
+    "search_card_identifiers_batch",
+    "get_serialised_cards",
+    "search_serialised_cards",
+    "query_precise_card_identifiers_batch",
     "retrieve_cardback_identifiers",
+    "query_cardback_identifiers",
+    "search_cardback_table",
     "get_new_cards_paginator",
 ]
@@ -0,0 +1,182 @@
+"""
+A spelling dictionary over the names in the catalog, which lets editor searches suggest names for queries that have no
+hits (e.g. "lightening bolt" -> "lightning bolt") without an extra fuzzy search per query.
+
+The dictionary implements the symmetric delete algorithm (SymSpell). Every name is indexed under each string which can
+be produced by deleting up to `SPELLING_MAX_EDIT_DISTANCE` characters from the start of its search key, so the names
+within that edit distance of a query are found by looking up each of the query's deletes. Only the first
+`SPELLING_PREFIX_LENGTH` characters are considered when generating deletes, which keeps the index small - candidates
+are then checked against the full query.
+
+The names and their frequencies are extracted at the end of `update_database` and `drain_search_index_outbox`, and
+stamped with the catalog generation at that time. Each process builds the delete index from the latest names in a
+background thread and swaps it in once it's ready, so requests never wait on it. Only a process which doesn't have a
+dictionary yet builds one within a request, and only extracts the names from the database if none have been published.
+"""
+
+from collections import Counter, defaultdict
+from typing import Iterable, Optional
+
+from django.db.models import Count
+
+from cardpicker.constants import (
+    SPELLING_MAX_EDIT_DISTANCE,
+    SPELLING_MAX_SUGGESTIONS,
+    SPELLING_PREFIX_LENGTH,
+)
+from cardpicker.models import Card
+from cardpicker.schema_types import CardType
+from cardpicker.search.caching import (
+    CatalogArtefactMemo,
+    get_catalog_generation,
+    publish_catalog_artefact,
+)
+from cardpicker.search.sanitisation import to_precise_search_key, to_searchable
+
+SPELLING_DICTIONARY_KEY = "spelling-dictionary"
+
+
+def get_deletes(term: str, max_distance: int) -> set[str]:
+    """
+    Every string which can be produced by deleting up to `max_distance` characters from `term`, including `term`.
+    """
+
+    deletes = {term}
+    frontier = {term}
+    for _ in range(max_distance):
+        frontier = {t[:i] + t[i + 1 :] for t in frontier for i in range(len(t))}
+        deletes |= frontier
+    return deletes
+
+
+def get_edit_distance(a: str, b: str, max_distance: int) -> Optional[int]:
+    """
+    The optimal string alignment distance between `a` and `b` (the Levenshtein distance, with transpositions of
+    adjacent characters counted as a single edit), or None if it exceeds `max_distance`.
+    """
+
+    if abs(len(a) - len(b)) > max_distance:
+        return None
+    previous_previous_row: list[int] = []
+    previous_row = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        row = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            row[j] = min(previous_row[j] + 1, row[j - 1] + 1, previous_row[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                row[j] = min(row[j], previous_previous_row[j - 2] + 1)
+        if min(row) > max_distance:
+            return None
+        previous_previous_row, previous_row = previous_row, row
+    return previous_row[-1] if previous_row[-1] <= max_distance else None
+
+
+class SpellingDictionary:
+    def __init__(self, terms: list[str], names: list[str], frequencies: list[int]) -> None:
+        self.terms = terms
+        self.names = names
+        self.frequencies = frequencies
+        prefixes: defaultdict[str, list[int]] = defaultdict(list)
+        for i, term in enumerate(terms):
+            prefixes[term[:SPELLING_PREFIX_LENGTH]].append(i)
+        self.deletes: defaultdict[str, list[int]] = defaultdict(list)
+        # names which share a prefix share its deletes, so each prefix's deletes are only generated once
+        for prefix, indices in prefixes.items():
+            for delete in get_deletes(prefix, SPELLING_MAX_EDIT_DISTANCE):
+                self.deletes[delete] += indices
+
+    @classmethod
+    def from_names(cls, names: Iterable[tuple[str, int]]) -> "SpellingDictionary":
+        """
+        Build a dictionary from `(name, frequency)` pairs. Names with the same search key are merged into the most
+        frequent of them.
+        """
+
+        frequencies: Counter[str] = Counter()
+        display_names: dict[str, tuple[int, str]] = {}
+        for name, frequency in names:
+            if term := to_precise_search_key(to_searchable(name)):
+                frequencies[term] += frequency
+                display_names[term] = max(display_names.get(term, (0, name)), (frequency, name))
+        terms = sorted(frequencies.keys())
+        return cls(
+            terms=terms,
+            names=[display_names[term][1] for term in terms],
+            frequencies=[frequencies[term] for term in terms],
+        )
+
+    def __len__(self) -> int:
+        return len(self.terms)
+
+    def suggest(self, query: str, max_suggestions: int = SPELLING_MAX_SUGGESTIONS) -> list[str]:
+        """
+        Retrieve the names of up to `max_suggestions` entries within `SPELLING_MAX_EDIT_DISTANCE` edits of `query`,
+        closest first, and then most frequent first. An exact match for `query` isn't suggested.
+        """
+
+        if not (term := to_precise_search_key(to_searchable(query))):
+            return []
+        candidates: set[int] = set()
+        for delete in get_deletes(term[:SPELLING_PREFIX_LENGTH], SPELLING_MAX_EDIT_DISTANCE):
+            candidates.update(self.deletes.get(delete, ()))
+        suggestions: list[tuple[int, int, str, str]] = []
+        for i in candidates:
+            distance = get_edit_distance(term, self.terms[i], SPELLING_MAX_EDIT_DISTANCE)
+            if distance is not None and distance > 0:
+                suggestions.append((distance, -self.frequencies[i], self.terms[i], self.names[i]))
+        return [name for *_, name in sorted(suggestions)[:max_suggestions]]
+
+
+def extract_names() -> dict[str, list[tuple[str, int]]]:
+    """
+    The distinct `searchq` values of the cards of each type, and the number of cards with each.
+    """
+
+    names: dict[str, list[tuple[str, int]]] = {card_type.name: [] for card_type in CardType}
+    for card_type, searchq, count in (
+        Card.objects.values_list("card_type", "searchq").annotate(count=Count("pk")).order_by().iterator()
+    ):
+        names[card_type].append((searchq, count))
+    return names
+
+
+def update_spelling_dictionary() -> dict[str, list[tuple[str, int]]]:
+    """
+    Extract the names in the spelling dictionary from the current contents of the database and publish them to the
+    catalog cache.
+    """
+
+    generation = get_catalog_generation()
+    names = extract_names()
+    publish_catalog_artefact(SPELLING_DICTIONARY_KEY, generation, names)
+    return names
+
+
+def build_spelling_dictionaries(names: dict[str, list[tuple[str, int]]]) -> dict[str, SpellingDictionary]:
+    return {
+        card_type_name: SpellingDictionary.from_names(names_of_type) for card_type_name, names_of_type in names.items()
+    }
+
+
+# building the dictionaries from their names is expensive, so newer names are built into dictionaries in the background
+spelling_dictionaries: CatalogArtefactMemo[dict[str, SpellingDictionary]] = CatalogArtefactMemo(
+    key=SPELLING_DICTIONARY_KEY,
+    load=build_spelling_dictionaries,
+    build=lambda: build_spelling_dictionaries(update_spelling_dictionary()),
+    load_in_background=True,
+)
+
+
+def get_spelling_dictionary(generation: int, card_type: CardType) -> SpellingDictionary:
+    """
+    Returns the latest spelling dictionary for cards of type `card_type` which has been built, which may have been
+    built under an earlier catalog generation than `generation`.
+    """
+
+    if (held := spelling_dictionaries.get(generation=generation)) is None:
+        return SpellingDictionary(terms=[], names=[], frequencies=[])  # the published names couldn't be read
+    return held[1][card_type.name]
+
+
+__all__ = ["SpellingDictionary", "update_spelling_dictionary", "spelling_dictionaries", "get_spelling_dictionary"]
@@ -0,0 +1,107 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Iterator
+
+from django.db import models
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from cardpicker.models import CanonicalCard, Card, SearchIndexOutboxEntry, Tag
+from cardpicker.search.dependencies import (
+    DOCUMENT_FIELD_DEPENDENCIES,
+    get_tracked_state,
+    record_dependent_card_deletion,
+    record_dependent_card_updates,
+    record_tag_change,
+    record_tag_deletion,
+)
+
+# the name of the attribute which holds a row's tracked fields as they were before it was saved
+PREVIOUS_STATE_ATTRIBUTE = "_search_index_previous_state"
+
+# whether the caller records changes to cards in the search index outbox itself - see `card_changes_recorded_in_bulk`
+card_changes_are_recorded_in_bulk: ContextVar[bool] = ContextVar("card_changes_are_recorded_in_bulk", default=False)
+
+
+@contextmanager
+def card_changes_recorded_in_bulk() -> Iterator[None]:
+    """
+    Within this context, changes to cards (e.g. deleting them with `QuerySet.delete`) aren't recorded in the search
+    index outbox one at a time by `record_card_change` - the caller records them itself with `bulk_create`.
+    """
+
+    token = card_changes_are_recorded_in_bulk.set(True)
+    try:
+        yield
+    finally:
+        card_changes_are_recorded_in_bulk.reset(token)
+
+
+@receiver(post_save, sender=Card)
+@receiver(post_delete, sender=Card)
+def record_card_change(sender: type[Card], instance: Card, **kwargs: Any) -> None:
+    """
+    Record each change to a card made through the ORM (e.g. in the admin panel) in the search index outbox, within the
+    same transaction as the change. `bulk_create` and `bulk_update` (which `update_database` uses) don't send these
+    signals, and `update_database` deletes cards within `card_changes_recorded_in_bulk` - it records its changes in
+    the outbox itself.
+    """
+
+    if not card_changes_are_recorded_in_bulk.get():
+        SearchIndexOutboxEntry.objects.create(card_pk=instance.pk)
+
+
+def remember_previous_state(sender: type[models.Model], instance: models.Model, **kwargs: Any) -> None:
+    previous_state = (
+        get_tracked_state(sender, sender._default_manager.filter(pk=instance.pk)).get(instance.pk)
+        if instance.pk is not None
+        else None
+    )
+    setattr(instance, PREVIOUS_STATE_ATTRIBUTE, previous_state)
+
+
+def record_dependent_changes(sender: type[models.Model], instance: models.Model, **kwargs: Any) -> None:
+    """
+    Record updates for the search documents of the cards which depend on a row of a tracked model (e.g. a canonical
+    card) after it's saved, within the same transaction.
+    """
+
+    record_dependent_card_updates(instance, getattr(instance, PREVIOUS_STATE_ATTRIBUTE, None))
+
+
+for tracked_model in DOCUMENT_FIELD_DEPENDENCIES:
+    pre_save.connect(remember_previous_state, sender=tracked_model)
+    post_save.connect(record_dependent_changes, sender=tracked_model)
+
+
+@receiver(pre_delete, sender=CanonicalCard)
+def record_canonical_card_deletion(sender: type[CanonicalCard], instance: CanonicalCard, **kwargs: Any) -> None:
+    """
+    Cards are unlinked from deleted canonical cards with a bulk update which doesn't send signals, so their documents
+    are recorded for updates before the canonical card is deleted.
+    """
+
+    record_dependent_card_deletion(instance)
+
+
+@receiver(pre_save, sender=Tag)
+def remember_previous_tag_state(sender: type[Tag], instance: Tag, **kwargs: Any) -> None:
+    previous_state = (
+        Tag.objects.filter(pk=instance.pk).values_list("name", "parent_id").first() if instance.pk is not None else None
+    )
+    setattr(instance, PREVIOUS_STATE_ATTRIBUTE, previous_state)
+
+
+@receiver(post_save, sender=Tag)
+def record_tag_changes(sender: type[Tag], instance: Tag, **kwargs: Any) -> None:
+    if (previous_state := getattr(instance, PREVIOUS_STATE_ATTRIBUTE, None)) is not None:
+        previous_name, previous_parent_pk = previous_state
+        record_tag_change(instance, previous_name=previous_name, previous_parent_pk=previous_parent_pk)
+
+
+@receiver(pre_delete, sender=Tag)
+def record_tag_deletion_changes(sender: type[Tag], instance: Tag, **kwargs: Any) -> None:
+    record_tag_deletion(instance)
+
+
+__all__ = ["card_changes_recorded_in_bulk", "record_card_change", "record_dependent_changes"]
@@ -5,13 +5,27 @@ from concurrent.futures import ThreadPoolExecutor
 from itertools import groupby
 from typing import Optional, Type
 
+from elasticsearch.exceptions import ElasticsearchException
+
 from django.conf import settings
 from django.db import transaction
+from django.utils import timezone
 
 from cardpicker.constants import DEFAULT_LANGUAGE, MAX_SIZE_MB
-from cardpicker.documents import CardSearch
-from cardpicker.models import Card, CardTypes, Source
-from cardpicker.search.sanitisation import to_searchable
+from cardpicker.models import Card, CardTypes, SearchIndexOutboxEntry, Source
+from cardpicker.search.autocomplete import update_autocomplete_index
+from cardpicker.search.backends.backends import get_configured_search_backend
+from cardpicker.search.backends.in_memory import (
+    InMemorySearchBackend,
+    update_in_memory_index,
+)
+from cardpicker.search.caching import bump_catalog_generation
+from cardpicker.search.cardback_table import update_cardback_table
+from cardpicker.search.catalog_filter import update_catalog_filter
+from cardpicker.search.indexing import get_outbox_retry_delay, sync_search_index
+from cardpicker.search.sanitisation import to_precise_search_key, to_searchable
+from cardpicker.search.spelling import update_spelling_dictionary
+from cardpicker.signals import card_changes_recorded_in_bulk
 from cardpicker.sources.api import Folder, Image
 from cardpicker.sources.source_types import SourceType, SourceTypeChoices
 from cardpicker.tags import Tags
@@ -91,6 +105,7 @@ def transform_image_into_object(source: Source, image: Image, tags: Tags) -> Car
         folder_location=folder_location,
         dpi=dpi,
         searchq=searchable_name,
+        searchq_precise=to_precise_search_key(searchable_name),
         extension=extension,
         date_created=image.created_time,
         date_modified=image.modified_time,
@@ -183,7 +198,6 @@ def bulk_sync_objects(source: Source, cards: list[Card]) -> None:
     with transaction.atomic():
         if created:
             Card.objects.bulk_create(created)
-            CardSearch().update(list(created), action="index")
         if updated:
             Card.objects.bulk_update(
                 updated,
@@ -197,6 +211,7 @@ def bulk_sync_objects(source: Source, cards: list[Card]) -> None:
                     "folder_location",
                     "dpi",
                     "searchq",
+                    "searchq_precise",
                     "extension",
                     "date_created",
                     "date_modified",
@@ -208,12 +223,30 @@ def bulk_sync_objects(source: Source, cards: list[Card]) -> None:
                 ],
                 batch_size=1000,
             )
-            # as per this thread https://github.com/django-es/django-elasticsearch-dsl/issues/224#issuecomment-551955511
-            # action type "index" is used for indexing new objects as well as updating existing objects
-            CardSearch().update(list(updated), action="index")
         if deleted_ids:
-            Card.objects.filter(identifier__in=deleted_ids).delete()
-            CardSearch().update(list(deleted), action="delete")
+            with card_changes_recorded_in_bulk():
+                Card.objects.filter(identifier__in=deleted_ids).delete()
+        # the changes are also recorded in the search index outbox in case syncing the search index below fails. the
+        # entries aren't due until the sync has had time to complete, so `drain_search_index_outbox` normally doesn't
+        # see them.
+        index_pks = [card.pk for card in created] + [card.pk for card in updated]
+        delete_pks = [card.pk for card in deleted]
+        date_available = timezone.now() + get_outbox_retry_delay(attempts=1)
+        outbox_entries = SearchIndexOutboxEntry.objects.bulk_create(
+            [SearchIndexOutboxEntry(card_pk=pk, date_available=date_available) for pk in index_pks + delete_pks],
+            batch_size=1000,
+        )
+        outbox_entry_pks = [entry.pk for entry in outbox_entries]
+    # the search index is synchronised with the committed changes outside of the transaction, so that the rows
+    # written above aren't locked while waiting on the search engine
+    if created or updated or deleted_ids:
+        try:
+            sync_search_index(index_pks=index_pks, delete_pks=delete_pks)
+        except ElasticsearchException as e:
+            print(f"\nFailed to sync the search index ({e}) - the changes will be synced from the outbox instead.")
+        else:
+            SearchIndexOutboxEntry.objects.filter(pk__in=outbox_entry_pks).delete()
+        bump_catalog_generation()
     print(
         f" and done! That took {TEXT_BOLD}{(time.time() - t0):.2f}{TEXT_END} seconds.\n"
         f"Created {TEXT_BOLD}{len(created)}{TEXT_END}, "
@@ -269,5 +302,49 @@ def update_database(source_key: Optional[str] = None) -> None:
                     )
                     print("")
 
+    print("Building the catalog filter...", end="", flush=True)
+    t0 = time.time()
+    bloom_filter = update_catalog_filter()
+    print(
+        f" and done! That took {TEXT_BOLD}{(time.time() - t0):.2f}{TEXT_END} seconds.\n"
+        f"The filter holds {TEXT_BOLD}{bloom_filter.item_count:,}{TEXT_END} names "
+        f"in {TEXT_BOLD}{bloom_filter.size / 1000:,.1f}{TEXT_END} KB "
+        f"with an expected false positive rate of {TEXT_BOLD}{bloom_filter.false_positive_rate:.2%}{TEXT_END}."
+    )
+
+    print("Building the cardback table...", end="", flush=True)
+    t0 = time.time()
+    table = update_cardback_table()
+    print(
+        f" and done! That took {TEXT_BOLD}{(time.time() - t0):.2f}{TEXT_END} seconds.\n"
+        f"The table holds {TEXT_BOLD}{len(table):,}{TEXT_END} cardbacks."
+    )
+
+    print("Building the autocomplete index...", end="", flush=True)
+    t0 = time.time()
+    index = update_autocomplete_index()
+    print(
+        f" and done! That took {TEXT_BOLD}{(time.time() - t0):.2f}{TEXT_END} seconds.\n"
+        f"The index holds {TEXT_BOLD}{len(index):,}{TEXT_END} names."
+    )
+
+    print("Extracting names for the spelling dictionary...", end="", flush=True)
+    t0 = time.time()
+    names = update_spelling_dictionary()
+    print(
+        f" and done! That took {TEXT_BOLD}{(time.time() - t0):.2f}{TEXT_END} seconds.\n"
+        f"The dictionary holds {TEXT_BOLD}{sum(len(names_of_type) for names_of_type in names.values()):,}{TEXT_END} "
+        f"names."
+    )
+
+    if get_configured_search_backend() is InMemorySearchBackend:
+        print("Building the in-memory search index...", end="", flush=True)
+        t0 = time.time()
+        search_index = update_in_memory_index()
+        print(
+            f" and done! That took {TEXT_BOLD}{(time.time() - t0):.2f}{TEXT_END} seconds.\n"
+            f"The index holds {TEXT_BOLD}{len(search_index.identifiers):,}{TEXT_END} cards."
+        )
+
 
 __all__ = ["update_database"]
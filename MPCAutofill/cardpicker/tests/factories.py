@@ -5,7 +5,7 @@ import factory
 
 from cardpicker import models
 from cardpicker.models import Games
-from cardpicker.search.sanitisation import to_searchable
+from cardpicker.search.sanitisation import to_precise_search_key, to_searchable
 
 
 class DFCPairFactory(factory.django.DjangoModelFactory):
@@ -45,6 +45,7 @@ class CardFactory(factory.django.DjangoModelFactory):
     folder_location = factory.LazyFunction(lambda: "path")
     dpi = factory.LazyFunction(lambda: 800)
     searchq = factory.LazyAttribute(lambda o: to_searchable(o.name))
+    searchq_precise = factory.LazyAttribute(lambda o: to_precise_search_key(o.searchq))
     extension = factory.LazyFunction(lambda: "png")
     size = factory.LazyFunction(lambda: 100)
     language = factory.LazyAttribute(lambda o: "en")
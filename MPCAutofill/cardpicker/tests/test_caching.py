@@ -0,0 +1,179 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from django.core.cache import cache
+from django.db import connection
+
+from cardpicker.schema_types import SearchSettings
+from cardpicker.search.caching import (
+    CatalogArtefactMemo,
+    SearchResultsCache,
+    SearchSingleFlight,
+    async_search_single_flight,
+    bump_catalog_generation,
+    get_catalog_generation,
+    publish_catalog_artefact,
+    search_single_flight,
+)
+from cardpicker.tests.test_views import BASE_SEARCH_SETTINGS
+
+
+class TestCatalogGeneration:
+    @pytest.mark.django_db
+    def test_generation_is_not_evicted_with_search_results(self):
+        generation = get_catalog_generation()
+        cache.clear()
+        assert get_catalog_generation() == generation
+        bump_catalog_generation()
+        assert get_catalog_generation() != generation
+
+
+@pytest.mark.django_db
+class TestCatalogArtefactMemo:
+    def test_missing_artefact_is_checked_for_again(self, monkeypatch):
+        monkeypatch.setattr("cardpicker.search.caching.CATALOG_ARTEFACT_REFRESH_INTERVAL", 0)
+        memo = CatalogArtefactMemo(key="test-artefact", load=str.upper)
+        generation = get_catalog_generation()
+        assert memo.get(generation) is None
+        publish_catalog_artefact("test-artefact", generation, "artefact")
+        assert memo.get(generation) == (generation, "ARTEFACT")
+
+    def test_stale_artefact_is_served_until_a_newer_one_is_published(self):
+        builds: list[str] = []
+
+        def build() -> str:
+            builds.append("built")
+            return "built"
+
+        memo = CatalogArtefactMemo(key="test-artefact", load=str.upper, build=build)
+        first_generation = get_catalog_generation()
+        assert memo.get(first_generation) == (first_generation, "built")  # nothing has been published, so it's built
+        bump_catalog_generation()
+        second_generation = get_catalog_generation()
+        publish_catalog_artefact("test-artefact", second_generation, "second")
+        bump_catalog_generation()
+        assert memo.get(get_catalog_generation()) == (second_generation, "SECOND")
+        bump_catalog_generation()
+        assert memo.get(get_catalog_generation()) == (second_generation, "SECOND")
+        assert builds == ["built"]
+
+    def test_newer_artefacts_can_be_loaded_in_background(self):
+        can_load = threading.Event()
+
+        def load(stored: str) -> str:
+            can_load.wait(timeout=5)
+            return stored.upper()
+
+        memo = CatalogArtefactMemo(key="test-artefact", load=load, load_in_background=True)
+        first_generation = get_catalog_generation()
+        publish_catalog_artefact("test-artefact", first_generation, "first")
+        can_load.set()
+        assert memo.get(first_generation) == (first_generation, "FIRST")  # nothing is held yet, so it's loaded now
+
+        can_load.clear()
+        bump_catalog_generation()
+        second_generation = get_catalog_generation()
+        publish_catalog_artefact("test-artefact", second_generation, "second")
+        assert memo.get(second_generation) == (first_generation, "FIRST")
+        can_load.set()
+        deadline = time.monotonic() + 5
+        while memo.get(second_generation) != (second_generation, "SECOND") and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert memo.get(second_generation) == (second_generation, "SECOND")
+
+
+class TestAsyncSearchSingleFlight:
+    @pytest.mark.django_db(transaction=True)
+    def test_concurrent_searches_for_the_same_key_are_coalesced(self):
+        search_results_cache = SearchResultsCache(search_settings=SearchSettings.model_validate(BASE_SEARCH_SETTINGS))
+        searched_keys: list[list[str]] = []
+
+        async def search(keys: list[str]) -> dict[str, list[str]]:
+            searched_keys.append(keys)
+            await asyncio.sleep(0.5)  # long enough for every coroutine to find this search in flight
+            return {key: [f"{key} result"] for key in keys}
+
+        async def requests() -> list[dict[str, list[str]]]:
+            return await asyncio.gather(
+                *(async_search_single_flight.search(search_results_cache, ["key"], search) for _ in range(4))
+            )
+
+        assert async_to_sync(requests)() == [{"key": ["key result"]}] * 4
+        assert searched_keys == [["key"]]
+        assert search_results_cache.get("key") == ["key result"]
+
+    @pytest.mark.django_db(transaction=True)
+    def test_searches_in_other_processes_are_waited_on(self):
+        search_results_cache = SearchResultsCache(search_settings=SearchSettings.model_validate(BASE_SEARCH_SETTINGS))
+        lock_key = SearchSingleFlight.get_lock_key("key")
+        cache.set(lock_key, True)
+
+        def search_in_other_process() -> None:
+            time.sleep(0.5)
+            search_results_cache.set("key", ["key result"])
+            cache.delete(lock_key)
+
+        async def search(keys: list[str]) -> dict[str, list[str]]:
+            raise AssertionError("the search in the other process should have been waited on")
+
+        thread = threading.Thread(target=search_in_other_process)
+        thread.start()
+        try:
+            assert async_to_sync(async_search_single_flight.search)(search_results_cache, ["key"], search) == {
+                "key": ["key result"]
+            }
+        finally:
+            thread.join()
+
+
+class TestSearchSingleFlight:
+    @pytest.mark.django_db(transaction=True)
+    def test_concurrent_searches_for_the_same_key_are_coalesced(self):
+        search_results_cache = SearchResultsCache(search_settings=SearchSettings.model_validate(BASE_SEARCH_SETTINGS))
+        searched_keys: list[list[str]] = []
+
+        def search(keys: list[str]) -> dict[str, list[str]]:
+            searched_keys.append(keys)
+            time.sleep(0.5)  # long enough for every thread to find this search in flight
+            return {key: [f"{key} result"] for key in keys}
+
+        results: list[dict[str, list[str]]] = []
+
+        def request() -> None:
+            try:
+                results.append(search_single_flight.search(search_results_cache, ["key"], search))
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=request) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert searched_keys == [["key"]]
+        assert results == [{"key": ["key result"]}] * 4
+        assert search_results_cache.get("key") == ["key result"]
+
+    def test_locks_are_claimed_together(self, monkeypatch):
+        keys = [f"key {i}" for i in range(300)]
+        lock_keys = [search_single_flight.get_lock_key(key) for key in keys]
+        requested_locks: list[list[str]] = []
+        get_many = cache.get_many
+
+        def record_get_many(keys, *args, **kwargs):
+            requested_locks.append(list(keys))
+            return get_many(keys, *args, **kwargs)
+
+        monkeypatch.setattr(cache, "get_many", record_get_many)
+        owned, remote_waits, local_waits = search_single_flight.claim(keys)
+        try:
+            assert owned == keys and not remote_waits and not local_waits
+            assert requested_locks == [lock_keys]
+            assert get_many(lock_keys).keys() == set(lock_keys)
+        finally:
+            cache.delete_many(lock_keys)
+            search_single_flight.release(owned)
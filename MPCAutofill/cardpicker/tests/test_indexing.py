@@ -0,0 +1,239 @@
+import pytest
+from elasticsearch.exceptions import ElasticsearchException
+
+from django.core.management import call_command
+from django.utils import timezone
+
+from cardpicker.documents import CardSearch
+from cardpicker.models import Card, CardTypes, SearchIndexOutboxEntry
+from cardpicker.schema_types import SearchQuery
+from cardpicker.search.caching import (
+    get_artefact_generation_key,
+    get_catalog_cache,
+    get_catalog_generation,
+)
+from cardpicker.search.cardback_table import CARDBACK_TABLE_KEY
+from cardpicker.search.catalog_filter import get_catalog_filter
+from cardpicker.search.indexing import (
+    IndexingExceptions,
+    drain_search_index_outbox,
+    get_alias_indices,
+    get_partitions,
+    rebuild_search_index,
+    sync_search_index,
+)
+from cardpicker.search.search_functions import (
+    get_elasticsearch_connection,
+    search_card_identifiers_batch,
+)
+from cardpicker.tests.constants import Cards
+from cardpicker.tests.test_search_backends import (
+    QUERIES,
+    SEARCH_SETTINGS,
+    get_search_settings,
+)
+
+
+class TestRebuildSearchIndex:
+    @pytest.fixture(autouse=True)
+    def autouse_populated_database(self, populated_database):
+        yield
+        # leave the search index as a concrete index rather than an alias for the next test to rebuild
+        es = get_elasticsearch_connection()
+        es.indices.delete(index=f"{CardSearch.Index.name}-*")
+
+    def test_search_index_is_served_through_alias(self):
+        search_settings = get_search_settings()
+        expected_results = search_card_identifiers_batch(search_settings=search_settings, queries=QUERIES)
+        es = get_elasticsearch_connection()
+        call_command("rebuild_search_index")
+        [first_index] = get_alias_indices(es, CardSearch.Index.name)
+        assert search_card_identifiers_batch(search_settings=search_settings, queries=QUERIES) == expected_results
+
+        call_command("rebuild_search_index")
+        [second_index] = get_alias_indices(es, CardSearch.Index.name)
+        assert second_index != first_index
+        assert not es.indices.exists(index=first_index)
+        assert search_card_identifiers_batch(search_settings=search_settings, queries=QUERIES) == expected_results
+
+    def test_invalid_index_is_not_swapped_in(self):
+        es = get_elasticsearch_connection()
+        call_command("rebuild_search_index")
+        [index] = get_alias_indices(es, CardSearch.Index.name)
+        with pytest.raises(IndexingExceptions.DocumentCountMismatchException):
+            rebuild_search_index(populate=lambda es, index_name: 0)
+        assert get_alias_indices(es, CardSearch.Index.name) == [index]
+        assert es.indices.get(index=f"{CardSearch.Index.name}-*").keys() == {index}
+
+    def test_catalog_filter_is_consulted_after_rebuild(self):
+        call_command("rebuild_search_index")
+        assert get_catalog_filter(generation=get_catalog_generation()) is not None
+
+    @pytest.mark.parametrize("partition_count", [1, 2, 3, 100])
+    def test_partitions_cover_every_card_once(self, partition_count):
+        partitions = get_partitions(partition_count)
+        assert len(partitions) <= partition_count
+        pks: list[int] = []
+        for lower, upper in partitions:
+            cards = Card.objects.all()
+            if lower is not None:
+                cards = cards.filter(pk__gte=lower)
+            if upper is not None:
+                cards = cards.filter(pk__lt=upper)
+            pks += cards.values_list("pk", flat=True)
+        assert sorted(pks) == sorted(Card.objects.values_list("pk", flat=True))
+
+    def test_concurrent_bulk_requests(self):
+        search_settings = get_search_settings()
+        expected_results = search_card_identifiers_batch(search_settings=search_settings, queries=QUERIES)
+        # the cards in the test database are only visible to this process, so they're loaded in one process
+        call_command("rebuild_search_index", "--processes", "1", "--threads", "3")
+        assert search_card_identifiers_batch(search_settings=search_settings, queries=QUERIES) == expected_results
+
+
+class TestSearchIndexOutbox:
+    @pytest.fixture(autouse=True)
+    def autouse_populated_database(self, populated_database):
+        pass
+
+    def test_changes_to_cards_are_synced_from_outbox(self):
+        es = get_elasticsearch_connection()
+        card = Card.objects.get(pk=Cards.BRAINSTORM.value.pk)
+        dpi = card.dpi
+        card.dpi = dpi + 100
+        card.save()
+        assert SearchIndexOutboxEntry.objects.filter(card_pk=card.pk).exists()
+        assert es.get(index=CardSearch.Index.name, id=card.pk)["_source"]["dpi"] == dpi
+
+        call_command("drain_search_index_outbox")
+        assert not SearchIndexOutboxEntry.objects.exists()
+        assert es.get(index=CardSearch.Index.name, id=card.pk)["_source"]["dpi"] == dpi + 100
+
+        card.delete()
+        call_command("drain_search_index_outbox")
+        assert not SearchIndexOutboxEntry.objects.exists()
+        assert not es.exists(index=CardSearch.Index.name, id=Cards.BRAINSTORM.value.pk)
+
+    def test_failed_outbox_entries_are_retried_later(self, monkeypatch):
+        def sync_search_index(index_pks, delete_pks, update_fields=None):
+            raise ElasticsearchException("Elasticsearch is unreachable")
+
+        monkeypatch.setattr("cardpicker.search.indexing.sync_search_index", sync_search_index)
+        Card.objects.get(pk=Cards.BRAINSTORM.value.pk).save()
+        with pytest.raises(IndexingExceptions.OutboxSyncException):
+            drain_search_index_outbox()
+        entries = list(SearchIndexOutboxEntry.objects.all())
+        assert entries and all(entry.attempts == 1 and entry.date_available > timezone.now() for entry in entries)
+        # the entries aren't due to be retried yet
+        assert drain_search_index_outbox() == 0
+
+    def test_outbox_entries_are_claimed_while_syncing(self, monkeypatch):
+        due_while_syncing: list[bool] = []
+
+        def claimed_sync_search_index(index_pks, delete_pks, update_fields=None):
+            # other workers don't see the entries as due while they're syncing
+            due_while_syncing.append(SearchIndexOutboxEntry.objects.filter(date_available__lte=timezone.now()).exists())
+            sync_search_index(index_pks=index_pks, delete_pks=delete_pks, update_fields=update_fields)
+
+        monkeypatch.setattr("cardpicker.search.indexing.sync_search_index", claimed_sync_search_index)
+        Card.objects.get(pk=Cards.BRAINSTORM.value.pk).save()
+        assert drain_search_index_outbox() == 1
+        assert due_while_syncing == [False]
+        assert not SearchIndexOutboxEntry.objects.exists()
+
+    def test_changes_which_cannot_affect_search_results_keep_catalog_generation(self, settings, ice_expansion):
+        settings.SERIALISED_CARDS_IN_SEARCH_ENGINE = True
+        call_command("search_index", "--rebuild", "-f")
+        call_command("drain_search_index_outbox")
+        generation = get_catalog_generation()
+        ice_expansion.name = "Ice Age Remastered"  # expansion names are only stored in serialised cards
+        ice_expansion.save()
+        assert drain_search_index_outbox()
+        assert get_catalog_generation() == generation
+
+        ice_expansion.code = "ia"
+        ice_expansion.save()
+        assert drain_search_index_outbox()
+        assert get_catalog_generation() != generation
+
+    def test_catalog_artefact_rebuilds_are_coalesced(self, monkeypatch):
+        catalog_cache = get_catalog_cache()
+        generation_key = get_artefact_generation_key(CARDBACK_TABLE_KEY)
+        card = Card.objects.get(pk=Cards.SIMPLE_CUBE.value.pk)
+        card.save()
+        call_command("drain_search_index_outbox")
+        assert catalog_cache.get(generation_key) == get_catalog_generation()
+
+        card.save()
+        call_command("drain_search_index_outbox")
+        # the cardback table was rebuilt too recently to be rebuilt again
+        assert catalog_cache.get(generation_key) != get_catalog_generation()
+        monkeypatch.setattr("cardpicker.search.indexing.CATALOG_ARTEFACT_REBUILD_INTERVAL", 0)
+        # the pending rebuild is made by the next drain, even if it doesn't drain anything
+        assert drain_search_index_outbox() == 0
+        assert catalog_cache.get(generation_key) == get_catalog_generation()
+
+    def test_expansion_changes_are_synced_as_partial_updates(self, ice_expansion):
+        es = get_elasticsearch_connection()
+        call_command("drain_search_index_outbox")
+        ice_expansion.name = "Ice Age Remastered"
+        ice_expansion.save()
+        # expansion names aren't stored in search documents (unless cards are serialised into them)
+        assert not SearchIndexOutboxEntry.objects.exists()
+
+        ice_expansion.code = "ia"
+        ice_expansion.save()
+        assert list(SearchIndexOutboxEntry.objects.values_list("card_pk", "document_fields")) == [
+            (Cards.BRAINSTORM.value.pk, ["expansion_code"])
+        ]
+        call_command("drain_search_index_outbox")
+        assert es.get(index=CardSearch.Index.name, id=Cards.BRAINSTORM.value.pk)["_source"]["expansion_code"] == "IA"
+
+    def test_tag_changes_rewrite_dependent_cards(self, tag_in_data, extended_tag):
+        es = get_elasticsearch_connection()
+        call_command("drain_search_index_outbox")
+        tag_in_data.name = "Renamed Tag"
+        tag_in_data.parent = extended_tag
+        tag_in_data.save()
+        call_command("drain_search_index_outbox")
+        for pk in [Cards.SIMPLE_CUBE.value.pk, Cards.SIMPLE_LOTUS.value.pk]:
+            tags = set(Card.objects.get(pk=pk).tags)
+            assert {"Renamed Tag", "Extended"} <= tags and "Tag in Data" not in tags
+            assert set(es.get(index=CardSearch.Index.name, id=pk)["_source"]["tags"]) == tags
+
+        tag_in_data.delete()
+        call_command("drain_search_index_outbox")
+        for pk in [Cards.SIMPLE_CUBE.value.pk, Cards.SIMPLE_LOTUS.value.pk]:
+            assert "Renamed Tag" not in Card.objects.get(pk=pk).tags
+            assert "Renamed Tag" not in es.get(index=CardSearch.Index.name, id=pk)["_source"]["tags"]
+
+
+class TestSearchIndexRouting:
+    @pytest.fixture(autouse=True)
+    def autouse_populated_database(self, populated_database):
+        pass
+
+    @pytest.mark.parametrize("search_settings", SEARCH_SETTINGS)
+    def test_routed_results_match_unrouted(self, settings, search_settings):
+        expected_results = search_card_identifiers_batch(search_settings=search_settings, queries=QUERIES)
+        settings.SEARCH_INDEX_ROUTING_BY_CARD_TYPE = True
+        call_command("search_index", "--rebuild", "-f")
+        assert search_card_identifiers_batch(search_settings=search_settings, queries=QUERIES) == expected_results
+
+    def test_card_type_changes_move_documents_between_shards(self, settings):
+        settings.SEARCH_INDEX_ROUTING_BY_CARD_TYPE = True
+        call_command("search_index", "--rebuild", "-f")
+        card = Card.objects.get(pk=Cards.GOBLIN.value.pk)
+        card.card_type = CardTypes.CARD
+        card.save()
+        call_command("drain_search_index_outbox")
+
+        es = get_elasticsearch_connection()
+        assert es.count(index=CardSearch.Index.name, body={"query": {"ids": {"values": [card.pk]}}})["count"] == 1
+        assert search_card_identifiers_batch(
+            search_settings=get_search_settings(),
+            queries=[
+                SearchQuery(query=Cards.GOBLIN.value.name, cardType="CARD"),
+                SearchQuery(query=Cards.GOBLIN.value.name, cardType="TOKEN"),
+            ],
+        ) == [[Cards.GOBLIN.value.identifier], []]
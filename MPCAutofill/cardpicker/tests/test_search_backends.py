@@ -0,0 +1,127 @@
+import time
+from copy import deepcopy
+
+import pytest
+
+from cardpicker.models import Card
+from cardpicker.schema_types import SearchQuery, SearchSettings
+from cardpicker.search.backends.in_memory import (
+    InMemorySearchBackend,
+    update_in_memory_index,
+)
+from cardpicker.search.caching import bump_catalog_generation
+from cardpicker.search.catalog_filter import update_catalog_filter
+from cardpicker.search.search_functions import (
+    query_precise_card_identifiers_batch,
+    search_card_identifiers_batch,
+)
+from cardpicker.tests.constants import Cards, Sources
+from cardpicker.tests.test_views import BASE_SEARCH_SETTINGS
+
+
+def get_search_settings(**kwargs) -> SearchSettings:
+    search_settings = deepcopy(BASE_SEARCH_SETTINGS)
+    for key, value in kwargs.items():
+        section = next(section for section in search_settings.values() if key in section)
+        section[key] = value
+    return SearchSettings.model_validate(search_settings)
+
+
+QUERIES = [
+    SearchQuery(query=Cards.BRAINSTORM.value.name, cardType="CARD"),
+    SearchQuery(query=Cards.ISLAND.value.name, cardType="CARD"),
+    SearchQuery(query=Cards.PAST_IN_FLAMES_1.value.name, cardType="CARD"),
+    SearchQuery(query=Cards.SIMPLE_LOTUS.value.name, cardType="CARDBACK"),
+    SearchQuery(query=Cards.GOBLIN.value.name, cardType="TOKEN"),
+    SearchQuery(query="past", cardType="CARD"),
+    SearchQuery(query="does not exist", cardType="CARD"),
+]
+
+
+SEARCH_SETTINGS = [
+    get_search_settings(),
+    get_search_settings(sources=[[Sources.EXAMPLE_DRIVE_2.value.pk, True], [Sources.EXAMPLE_DRIVE_1.value.pk, True]]),
+    get_search_settings(sources=[[Sources.EXAMPLE_DRIVE_1.value.pk, True], [Sources.EXAMPLE_DRIVE_2.value.pk, False]]),
+    get_search_settings(minimumDPI=200, maximumDPI=300),
+    get_search_settings(maximumSize=1),
+    get_search_settings(languages=["EN"]),
+    get_search_settings(includesTags=["Another Tag in Data"]),
+    get_search_settings(excludesTags=["Another Tag in Data"]),
+]
+
+
+class TestSearchBackends:
+    @pytest.fixture(autouse=True)
+    def autouse_populated_database(self, populated_database):
+        pass
+
+    @pytest.mark.parametrize("fuzzy_search", [False, True])
+    @pytest.mark.parametrize("search_settings", SEARCH_SETTINGS)
+    def test_in_memory_results_match_elasticsearch(self, search_settings, fuzzy_search):
+        search_settings = search_settings.model_copy(deep=True)
+        search_settings.searchTypeSettings.fuzzySearch = fuzzy_search
+        assert InMemorySearchBackend.search_card_identifiers_batch(
+            search_settings=search_settings, queries=QUERIES
+        ) == search_card_identifiers_batch(search_settings=search_settings, queries=QUERIES)
+
+    def test_in_memory_index_is_served_until_rebuilt(self):
+        def search() -> list[str]:
+            [results] = InMemorySearchBackend.search_card_identifiers_batch(
+                search_settings=get_search_settings(),
+                queries=[SearchQuery(query=Cards.BRAINSTORM.value.name, cardType="CARD")],
+            )
+            return results
+
+        assert search() == [Cards.BRAINSTORM.value.identifier]
+        Card.objects.filter(pk=Cards.BRAINSTORM.value.pk).delete()
+        bump_catalog_generation()
+        # searches don't wait on the index to be rebuilt
+        assert search() == [Cards.BRAINSTORM.value.identifier]
+        update_in_memory_index()
+        # the rebuilt index is loaded in the background
+        deadline = time.monotonic() + 5
+        while search() and time.monotonic() < deadline:
+            time.sleep(0.01)
+        assert search() == []
+
+    @pytest.mark.parametrize("search_settings", SEARCH_SETTINGS)
+    def test_precise_database_results_match_elasticsearch(self, search_settings):
+        assert query_precise_card_identifiers_batch(
+            search_settings=search_settings, queries=QUERIES
+        ) == search_card_identifiers_batch(search_settings=search_settings, queries=QUERIES)
+
+    def test_precise_search_key_follows_saved_name(self):
+        card = Card.objects.get(pk=Cards.BRAINSTORM.value.pk)
+        card.searchq = "brainstorm again"
+        card.save(update_fields=["searchq"])
+        assert query_precise_card_identifiers_batch(
+            search_settings=get_search_settings(), queries=[SearchQuery(query="Brainstorm Again", cardType="CARD")]
+        ) == [[Cards.BRAINSTORM.value.identifier]]
+
+
+class TestCatalogFilter:
+    @pytest.fixture(autouse=True)
+    def autouse_populated_database(self, populated_database):
+        pass
+
+    @pytest.mark.parametrize(
+        "fuzzy_search, searched_queries",
+        [(False, [Cards.BRAINSTORM.value.name]), (True, [Cards.BRAINSTORM.value.name, "does not exist"])],
+        ids=["precise queries are filtered", "fuzzy queries are always searched for"],
+    )
+    def test_queries_which_cannot_match_are_not_searched_for(self, monkeypatch, fuzzy_search, searched_queries):
+        update_catalog_filter()
+        search_settings = get_search_settings(fuzzySearch=fuzzy_search)
+
+        def search_card_identifiers_batch(search_settings, queries):
+            assert [search_query.query for search_query in queries] == searched_queries
+            return [[Cards.BRAINSTORM.value.identifier] if i == 0 else [] for i in range(len(queries))]
+
+        monkeypatch.setattr(InMemorySearchBackend, "search_card_identifiers_batch", search_card_identifiers_batch)
+        assert InMemorySearchBackend.retrieve_card_identifiers_batch(
+            search_settings=search_settings,
+            queries=[
+                SearchQuery(query=Cards.BRAINSTORM.value.name, cardType="CARD"),
+                SearchQuery(query="does not exist", cardType="CARD"),
+            ],
+        ) == [[Cards.BRAINSTORM.value.identifier], []]
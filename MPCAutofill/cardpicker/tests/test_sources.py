@@ -2,12 +2,20 @@ import datetime as dt
 
 import freezegun
 import pytest
+from elasticsearch.exceptions import ElasticsearchException
 
 from django.core import management
 from django.utils.timezone import make_aware, make_naive
 
 from cardpicker.documents import CardSearch
-from cardpicker.models import CanonicalArtist, CanonicalCard, Card
+from cardpicker.models import (
+    CanonicalArtist,
+    CanonicalCard,
+    Card,
+    SearchIndexOutboxEntry,
+)
+from cardpicker.search.indexing import get_sync_actions
+from cardpicker.search.search_functions import get_elasticsearch_connection
 from cardpicker.sources.api import Folder, Image
 from cardpicker.sources.update_database import bulk_sync_objects, update_database
 from cardpicker.tags import Tags
@@ -465,6 +473,99 @@ class TestUpdateDatabase:
             for result in CardSearch().search().scan()
         } == set(incoming_cards)
 
+    def test_bulk_sync_objects_suspends_refresh_for_large_syncs(
+        self, monkeypatch, django_settings, elasticsearch, example_drive_1
+    ):
+        monkeypatch.setattr("cardpicker.search.indexing.SEARCH_INDEX_SUSPEND_REFRESH_THRESHOLD", 1)
+        management.call_command("search_index", "--rebuild", "-f")
+        es = get_elasticsearch_connection()
+        refresh_intervals: list[dict] = []
+
+        def get_sync_actions_while_recording_refresh_interval(*args, **kwargs):
+            refresh_intervals.append(
+                es.indices.get_settings(index=CardSearch.Index.name, name="index.refresh_interval")
+            )
+            yield from get_sync_actions(*args, **kwargs)
+
+        monkeypatch.setattr(
+            "cardpicker.search.indexing.get_sync_actions", get_sync_actions_while_recording_refresh_interval
+        )
+        bulk_sync_objects(
+            source=example_drive_1,
+            cards=[
+                Card(
+                    identifier=f"created {i}",
+                    searchq=f"Created Card {i}",
+                    date_created=make_aware(DEFAULT_DATE),
+                    date_modified=make_aware(DEFAULT_DATE),
+                    source=example_drive_1,
+                    size=0,
+                    image_hash=0,
+                )
+                for i in range(3)
+            ],
+        )
+
+        # refreshes were suspended during the sync and restored afterwards
+        [settings_during_sync] = refresh_intervals
+        assert [
+            index_settings["settings"]["index"]["refresh_interval"] for index_settings in settings_during_sync.values()
+        ] == ["-1"]
+        settings_after_sync = es.indices.get_settings(index=CardSearch.Index.name, name="index.refresh_interval")
+        assert all("index" not in index_settings["settings"] for index_settings in settings_after_sync.values())
+        assert {result.identifier for result in CardSearch().search().scan()} == {f"created {i}" for i in range(3)}
+
+    @pytest.mark.parametrize("sync_fails", [False, True])
+    def test_bulk_sync_objects_records_failed_syncs_in_outbox(
+        self, monkeypatch, django_settings, elasticsearch, example_drive_1, sync_fails
+    ):
+        if sync_fails:
+
+            def sync_search_index(index_pks, delete_pks):
+                raise ElasticsearchException("Elasticsearch is unreachable")
+
+            monkeypatch.setattr("cardpicker.sources.update_database.sync_search_index", sync_search_index)
+        bulk_sync_objects(
+            source=example_drive_1,
+            cards=[
+                Card(
+                    identifier="created",
+                    searchq="Created Card",
+                    date_created=make_aware(DEFAULT_DATE),
+                    date_modified=make_aware(DEFAULT_DATE),
+                    source=example_drive_1,
+                    size=0,
+                    image_hash=0,
+                )
+            ],
+        )
+        card = Card.objects.get(identifier="created")
+        # the outbox is only left to sync the card with the search index if the sync failed
+        assert SearchIndexOutboxEntry.objects.filter(card_pk=card.pk).exists() is sync_fails
+
+    def test_bulk_sync_objects_records_deletions_in_bulk(
+        self, monkeypatch, django_settings, elasticsearch, example_drive_1
+    ):
+        card = Card.objects.create(
+            identifier="deleted",
+            searchq="Deleted Card",
+            date_created=make_aware(DEFAULT_DATE),
+            date_modified=make_aware(DEFAULT_DATE),
+            source=example_drive_1,
+            size=0,
+            image_hash=0,
+        )
+        SearchIndexOutboxEntry.objects.all().delete()
+
+        def sync_search_index(index_pks, delete_pks):
+            raise ElasticsearchException("Elasticsearch is unreachable")
+
+        monkeypatch.setattr("cardpicker.sources.update_database.sync_search_index", sync_search_index)
+        bulk_sync_objects(source=example_drive_1, cards=[])
+        assert not Card.objects.filter(pk=card.pk).exists()
+        # the deletion is recorded once by `bulk_sync_objects`, rather than again by `record_card_change`
+        assert list(SearchIndexOutboxEntry.objects.values_list("card_pk", flat=True)) == [card.pk]
+
     @pytest.mark.parametrize(
         "canonical_cards, new_card, expected_expansion, expected_collector_number",
         [
@@ -1,6 +1,6 @@
 import pytest
 
-from cardpicker.search.sanitisation import to_searchable
+from cardpicker.search.sanitisation import to_searchable, to_searchable_many
 
 
 class TestUtils:
@@ -37,4 +37,9 @@ class TestUtils:
     def test_to_searchable(self, input_string, output) -> None:
         assert to_searchable(input_string) == output
 
+    def test_to_searchable_many(self) -> None:
+        input_strings = ["", "Lightning Bolt", " Black Lotus (Masterpiece) [NSFW]", "Kodama’s Reach", "1. Island-"]
+        assert to_searchable_many(input_strings) == [to_searchable(input_string) for input_string in input_strings]
+        assert to_searchable_many(iter(input_strings)) == to_searchable_many(input_strings)
+
     # endregion
@@ -1,17 +1,29 @@
 import datetime as dt
+import json
 from collections import Counter
 from copy import deepcopy
 
 import freezegun
 import pytest
+from asgiref.sync import async_to_sync, iscoroutinefunction
+from elasticsearch.exceptions import TransportError
 from requests import Response
 from syrupy import SnapshotAssertion
 
+from django.core.management import call_command
 from django.urls import reverse
 
 from cardpicker import views
+from cardpicker.documents import CardSearch
+from cardpicker.models import Card, serialise_cards
+from cardpicker.schema_types import SortBy
+from cardpicker.search.async_search_functions import async_connections
+from cardpicker.search.autocomplete import update_autocomplete_index
+from cardpicker.search.caching import bump_catalog_generation
+from cardpicker.search.cardback_table import update_cardback_table
+from cardpicker.search.search_functions import SearchEngineHealthMonitor
 from cardpicker.tests.constants import Cards, DummyImportSite, Sources
-from cardpicker.tests.factories import SourceFactory
+from cardpicker.tests.factories import CanonicalCardFactory, SourceFactory
 
 
 def snapshot_response(response: Response, snapshot: SnapshotAssertion):
@@ -457,6 +469,59 @@ class TestPostEditorSearchResults:
         assert response.status_code == 200
         assert response.json()["results"]["key1"] == [Cards.BRAINSTORM.value.identifier]
 
+    def test_search_spanning_multiple_batches(self, client, settings, monkeypatch):
+        settings.PRECISE_SEARCH_FROM_DATABASE = False
+        # force the queries to be split across several `_msearch` requests,
+        # and force queries with more than one hit to be paged through (one hit per page) with a point in time
+        monkeypatch.setattr("cardpicker.search.search_functions.EDITOR_SEARCH_MSEARCH_BATCH_SIZE", 2)
+        monkeypatch.setattr("cardpicker.search.search_functions.EDITOR_SEARCH_MSEARCH_PAGE_SIZE", 1)
+        monkeypatch.setattr("cardpicker.search.search_functions.EDITOR_SEARCH_PIT_PAGE_SIZE", 1)
+        response = client.post(
+            reverse(views.post_editor_search),
+            {
+                "searchSettings": BASE_SEARCH_SETTINGS,
+                "queries": {
+                    "key1": {"query": Cards.BRAINSTORM.value.name, "cardType": "CARD"},
+                    "key2": {"query": Cards.ISLAND.value.name, "cardType": "CARD"},
+                    "key3": {"query": Cards.SIMPLE_CUBE.value.name, "cardType": "CARDBACK"},
+                    "key4": {"query": Cards.PAST_IN_FLAMES_1.value.name, "cardType": "CARD"},
+                    "key5": {"query": Cards.GOBLIN.value.name, "cardType": "TOKEN"},
+                    "key6": {"query": None, "cardType": "CARD"},
+                },
+            },
+            content_type="application/json",
+        )
+        assert response.status_code == 200
+        assert response.json()["results"] == {
+            "key1": [Cards.BRAINSTORM.value.identifier],
+            "key2": [Cards.ISLAND.value.identifier, Cards.ISLAND_CLASSICAL.value.identifier],
+            "key3": [Cards.SIMPLE_CUBE.value.identifier],
+            "key4": [Cards.PAST_IN_FLAMES_1.value.identifier, Cards.PAST_IN_FLAMES_2.value.identifier],
+            "key5": [Cards.GOBLIN.value.identifier],
+        }
+
+    def test_search_results_are_cached_until_catalog_generation_is_bumped(self, client, settings, brainstorm):
+        settings.PRECISE_SEARCH_FROM_DATABASE = False
+
+        def search() -> list[str]:
+            response = client.post(
+                reverse(views.post_editor_search),
+                {
+                    "searchSettings": BASE_SEARCH_SETTINGS,
+                    "queries": {"key1": {"query": Cards.BRAINSTORM.value.name, "cardType": "CARD"}},
+                },
+                content_type="application/json",
+            )
+            assert response.status_code == 200
+            return response.json()["results"]["key1"]
+
+        assert search() == [Cards.BRAINSTORM.value.identifier]
+        # remove the card from the search index without invalidating the cache
+        CardSearch().update(brainstorm, action="delete", refresh=True)
+        assert search() == [Cards.BRAINSTORM.value.identifier]
+        bump_catalog_generation()
+        assert search() == []
+
     def test_page_equal_to_max_size(self, client, monkeypatch, snapshot):
         monkeypatch.setattr("cardpicker.views.EDITOR_SEARCH_MAX_QUERIES", 2)
         response = client.post(
@@ -530,6 +595,128 @@ class TestPostEditorSearchResults:
         snapshot_response(response, snapshot)
         assert response.status_code == 400
 
+    def test_suggestions_for_queries_with_no_results(self, client):
+        response = client.post(
+            reverse(views.post_editor_search),
+            {
+                "searchSettings": BASE_SEARCH_SETTINGS,
+                "queries": {
+                    "key1": {"query": Cards.BRAINSTORM.value.name, "cardType": "CARD"},
+                    "key2": {"query": "brianstrom", "cardType": "CARD"},
+                    "key3": {"query": "simple cub", "cardType": "CARDBACK"},
+                    "key4": {"query": "does not exist", "cardType": "CARD"},
+                },
+                "suggest": True,
+            },
+            content_type="application/json",
+        )
+        assert response.status_code == 200
+        assert response.json()["suggestions"] == {"key2": ["brainstorm"], "key3": ["simple cube"], "key4": []}
+
+    def test_suggestions_are_not_included_unless_requested(self, client):
+        response = client.post(
+            reverse(views.post_editor_search),
+            {
+                "searchSettings": BASE_SEARCH_SETTINGS,
+                "queries": {"key1": {"query": "brianstrom", "cardType": "CARD"}},
+            },
+            content_type="application/json",
+        )
+        assert response.status_code == 200
+        assert response.json() == {"results": {"key1": []}}
+
+
+class TestPostEditorSearchStream:
+    @pytest.fixture(autouse=True)
+    def autouse_populated_database(self, populated_database):
+        pass
+
+    def test_one_line_per_query(self, client, monkeypatch):
+        monkeypatch.setattr("cardpicker.views.EDITOR_SEARCH_STREAM_CHUNK_SIZE", 2)
+        response = client.post(
+            reverse(views.post_editor_search_stream),
+            {
+                "searchSettings": BASE_SEARCH_SETTINGS,
+                "queries": {
+                    "key1": {"query": Cards.BRAINSTORM.value.name, "cardType": "CARD"},
+                    "key2": {"query": Cards.ISLAND.value.name, "cardType": "CARD"},
+                    "key3": {"query": Cards.SIMPLE_CUBE.value.name, "cardType": "CARDBACK"},
+                    "key4": {"query": None, "cardType": "CARD"},
+                },
+            },
+            content_type="application/json",
+        )
+        assert response.status_code == 200
+        assert response["Content-Type"] == "application/x-ndjson"
+        lines = b"".join(response.streaming_content).decode("utf-8").splitlines()
+        assert [json.loads(line) for line in lines] == [
+            {"results": {"key1": [Cards.BRAINSTORM.value.identifier]}},
+            {"results": {"key2": [Cards.ISLAND.value.identifier, Cards.ISLAND_CLASSICAL.value.identifier]}},
+            {"results": {"key3": [Cards.SIMPLE_CUBE.value.identifier]}},
+        ]
+
+    def test_get_request(self, client):
+        response = client.get(reverse(views.post_editor_search_stream))
+        assert response.status_code == 400
+        assert response.json()["name"] == "Bad request"
+
+
+class TestAsyncSearchViews:
+    @pytest.fixture(autouse=True)
+    def autouse_populated_database(self, populated_database):
+        pass
+
+    @staticmethod
+    def post(rf, view, body: dict) -> dict:
+        request = rf.post("/", body, content_type="application/json")
+        response = async_to_sync(view)(request) if iscoroutinefunction(view) else view(request)
+        assert response.status_code == 200
+        return json.loads(response.content)
+
+    @pytest.mark.parametrize("fuzzy_search", [False, True], ids=["precise search", "fuzzy search"])
+    def test_editor_search_matches_synchronous_view(self, rf, fuzzy_search):
+        search_settings = deepcopy(BASE_SEARCH_SETTINGS)
+        search_settings["searchTypeSettings"]["fuzzySearch"] = fuzzy_search
+        body = {
+            "searchSettings": search_settings,
+            "queries": {
+                "key1": {"query": Cards.BRAINSTORM.value.name, "cardType": "CARD"},
+                "key2": {"query": "past in flames", "cardType": "CARD"},
+                "key3": {"query": "", "cardType": "CARDBACK"},
+            },
+        }
+        expected_results = self.post(rf, views.post_editor_search, body)
+        bump_catalog_generation()  # don't serve the async view from the search results cache
+        assert self.post(rf, views.async_post_editor_search, body) == expected_results
+
+    def test_explore_search_matches_synchronous_view(self, rf):
+        body = {
+            "searchSettings": BASE_SEARCH_SETTINGS,
+            "query": None,
+            "cardTypes": [],
+            "sortBy": "dateCreatedDescending",
+            "pageSize": 5,
+            "pageStart": 0,
+        }
+        assert self.post(rf, views.async_post_explore_search, body) == self.post(rf, views.post_explore_search, body)
+
+    def test_cardbacks_match_synchronous_view(self, rf):
+        body = {"searchSettings": BASE_SEARCH_SETTINGS}
+        assert self.post(rf, views.async_post_cardbacks, body) == self.post(rf, views.post_cardbacks, body)
+
+    def test_search_engine_client_is_closed_with_its_event_loop(self, rf):
+        body = {
+            "searchSettings": BASE_SEARCH_SETTINGS,
+            "query": None,
+            "cardTypes": [],
+            "sortBy": "dateCreatedDescending",
+            "pageSize": 5,
+            "pageStart": 0,
+        }
+        self.post(rf, views.async_post_explore_search, body)
+        # `async_to_sync` ran the view in its own event loop, which has shut down
+        assert not async_connections
+
 
 class TestPostExploreSearchResults:
     @pytest.fixture(autouse=True)
@@ -711,6 +898,76 @@ class TestPostExploreSearchResults:
             expected_card.identifier for expected_card in expected_cards
         ]
 
+    def test_explore_search_cursor_pagination(self, client, monkeypatch):
+        monkeypatch.setattr("cardpicker.views.EXPLORE_SEARCH_MAX_PAGE_SIZE", 3)
+        pages: list[list[str]] = []
+        cursor = None
+        for _ in range(5):
+            response = client.post(
+                reverse(views.post_explore_search),
+                {
+                    "searchSettings": BASE_SEARCH_SETTINGS,
+                    "query": None,
+                    "cardTypes": [],
+                    "sortBy": "dateCreatedDescending",
+                    "pageSize": 3,
+                    "pageStart": 0,
+                    **({"cursor": cursor} if cursor is not None else {}),
+                },
+                content_type="application/json",
+            )
+            assert response.status_code == 200
+            response_json = response.json()
+            assert response_json["count"] == 13
+            pages.append([item["identifier"] for item in response_json["cards"]])
+            cursor = response_json.get("cursor")
+        assert cursor is None
+        assert pages == [
+            [
+                Cards.BRAINSTORM.value.identifier,
+                Cards.DELVER_OF_SECRETS.value.identifier,
+                Cards.GOBLIN.value.identifier,
+            ],
+            [
+                Cards.HUNTMASTER_OF_THE_FELLS.value.identifier,
+                Cards.INSECTILE_ABERRATION.value.identifier,
+                Cards.ISLAND_CLASSICAL.value.identifier,
+            ],
+            [Cards.ISLAND.value.identifier, Cards.MOUNTAIN.value.identifier, Cards.PAST_IN_FLAMES_2.value.identifier],
+            [
+                Cards.PAST_IN_FLAMES_1.value.identifier,
+                Cards.RAVAGER_OF_THE_FELLS.value.identifier,
+                Cards.SIMPLE_CUBE.value.identifier,
+            ],
+            [Cards.SIMPLE_LOTUS.value.identifier],
+        ]
+
+    @pytest.mark.parametrize(
+        "cursor",
+        [
+            pytest.param("not a cursor", id="malformed cursor"),
+            pytest.param(
+                views.encode_explore_search_cursor(sort_by=SortBy.nameAscending, search_after=["brainstorm", "id"]),
+                id="cursor for a different sort order",
+            ),
+        ],
+    )
+    def test_explore_search_invalid_cursor(self, client, cursor):
+        response = client.post(
+            reverse(views.post_explore_search),
+            {
+                "searchSettings": BASE_SEARCH_SETTINGS,
+                "query": None,
+                "cardTypes": [],
+                "sortBy": "dateCreatedDescending",
+                "pageSize": 3,
+                "pageStart": 0,
+                "cursor": cursor,
+            },
+            content_type="application/json",
+        )
+        assert response.status_code == 400
+
     @pytest.mark.parametrize(
         "page_start, page_size",
         [
@@ -803,6 +1060,43 @@ class TestPostCards:
         snapshot_response(response, snapshot)
         assert response.status_code == 400
 
+    def test_query_count_is_independent_of_card_count(self, client, django_assert_max_num_queries):
+        # one query each for cards, sources, canonical cards, and canonical artists
+        with django_assert_max_num_queries(4):
+            response = client.post(
+                reverse(views.post_cards),
+                {"cardIdentifiers": [card.value.identifier for card in Cards]},
+                content_type="application/json",
+            )
+        assert response.status_code == 200
+        assert len(response.json()["results"]) == len(Cards)
+
+    def test_bulk_serialisation_matches_serialisation(self):
+        cards = list(Card.objects.order_by("pk"))
+        assert serialise_cards(cards) == [card.serialise() for card in cards]
+
+    def test_cards_served_from_search_engine(self, client, settings, monkeypatch, elasticsearch):
+        card_identifiers = [Cards.GOBLIN.value.identifier, Cards.HUNTMASTER_OF_THE_FELLS.value.identifier]
+        expected_response = client.post(
+            reverse(views.post_cards), {"cardIdentifiers": card_identifiers}, content_type="application/json"
+        ).json()
+
+        settings.SERIALISED_CARDS_IN_SEARCH_ENGINE = True
+        call_command("search_index", "--rebuild", "-f")
+        serialised_from_database: list[list[str]] = []
+
+        def serialise_cards_from_database(card_identifiers):
+            serialised_from_database.append(card_identifiers)
+            return {}
+
+        monkeypatch.setattr("cardpicker.views.serialise_cards_from_database", serialise_cards_from_database)
+        response = client.post(
+            reverse(views.post_cards), {"cardIdentifiers": card_identifiers}, content_type="application/json"
+        )
+        assert response.status_code == 200
+        assert response.json() == expected_response
+        assert serialised_from_database == [[]]
+
     @pytest.mark.parametrize(
         "json_body",
         [{}, {"test": "i should be a json body but i ain't"}, {"cardIdentifiers": "i should be a list but i ain't"}],
@@ -1113,6 +1407,25 @@ class TestPostCardbacks:
         assert response.status_code == 200
         assert len(response.json()["cardbacks"]) == 2
 
+    def test_cardback_table_is_served_until_rebuilt(self, client, simple_cube, simple_lotus):
+        search_settings = deepcopy(BASE_SEARCH_SETTINGS)
+        search_settings["searchTypeSettings"]["filterCardbacks"] = True
+
+        def get_cardbacks() -> list[str]:
+            response = client.post(
+                reverse(views.post_cardbacks), {"searchSettings": search_settings}, content_type="application/json"
+            )
+            assert response.status_code == 200
+            return response.json()["cardbacks"]
+
+        assert get_cardbacks() == [Cards.SIMPLE_CUBE.value.identifier, Cards.SIMPLE_LOTUS.value.identifier]
+        simple_cube.delete()
+        bump_catalog_generation()
+        # requests don't wait on the cardback table to be rebuilt, and results from the stale table aren't cached
+        assert get_cardbacks() == [Cards.SIMPLE_CUBE.value.identifier, Cards.SIMPLE_LOTUS.value.identifier]
+        update_cardback_table()
+        assert get_cardbacks() == [Cards.SIMPLE_LOTUS.value.identifier]
+
     @pytest.mark.parametrize(
         "json_body",
         [{}, ["test"], {"man": "man"}, {"searchSettings": "test2"}],
@@ -1303,6 +1616,36 @@ class TestGetSearchEngineHealth:
         snapshot_response(response, snapshot)
         assert response.json()["online"] is True
 
+    def test_unhealthy_status_is_rechecked(self, client, django_settings, elasticsearch, monkeypatch):
+        monitor = SearchEngineHealthMonitor(ttl=60)
+        monkeypatch.setattr("cardpicker.views.search_engine_health", monitor)
+        monkeypatch.setattr(monitor, "check", lambda: (False, False))
+        assert client.get(reverse(views.get_search_engine_health)).json()["online"] is False
+        monkeypatch.setattr(monitor, "check", lambda: (True, True))
+        assert client.get(reverse(views.get_search_engine_health)).json()["online"] is True
+        # a healthy status is trusted until its TTL elapses
+        monkeypatch.setattr(monitor, "check", lambda: (False, False))
+        assert client.get(reverse(views.get_search_engine_health)).json()["online"] is True
+
+    def test_server_errors_are_unhealthy(self, elasticsearch, monkeypatch):
+        def exists(*args, **kwargs):
+            raise TransportError(503, "Service Unavailable")
+
+        monkeypatch.setattr("elasticsearch_dsl.Index.exists", exists)
+        assert SearchEngineHealthMonitor(ttl=60).get_status() == (False, False)
+
+    def test_failed_refresh_does_not_block_later_refreshes(self, monkeypatch):
+        monitor = SearchEngineHealthMonitor(ttl=60)
+        monitor.refreshing = True
+
+        def check():
+            raise RuntimeError("Unexpected failure")
+
+        monkeypatch.setattr(monitor, "check", check)
+        with pytest.raises(RuntimeError):
+            monitor.refresh()
+        assert monitor.refreshing is False
+
     # TODO: consider how to test elasticsearch being unhealthy
     def test_post_request(self, client, django_settings, snapshot):
         response = client.post(reverse(views.get_search_engine_health))
@@ -1310,6 +1653,51 @@ class TestGetSearchEngineHealth:
         assert response.status_code == 400
 
 
+class TestGetAutocomplete:
+    @pytest.fixture(autouse=True)
+    def autouse_populated_database(self, django_settings, all_sources, all_cards):
+        pass
+
+    def test_completions(self, client):
+        CanonicalCardFactory(name="Island Sanctuary")
+        response = client.get(reverse(views.get_autocomplete), {"q": "ISL"})
+        assert response.status_code == 200
+        assert response.json()["completions"] == ["island", "Island Sanctuary"]
+
+    def test_no_completions(self, client):
+        response = client.get(reverse(views.get_autocomplete), {"q": "does not exist"})
+        assert response.status_code == 200
+        assert response.json()["completions"] == []
+
+    def test_limit(self, client):
+        response = client.get(reverse(views.get_autocomplete), {"q": "i", "limit": 1})
+        assert response.status_code == 200
+        assert response.json()["completions"] == ["insectile aberration"]
+
+    def test_index_is_served_until_rebuilt(self, client):
+        assert client.get(reverse(views.get_autocomplete), {"q": "gob"}).json()["completions"] == ["goblin"]
+        Card.objects.filter(name=Cards.GOBLIN.value.name).delete()
+        bump_catalog_generation()
+        # requests don't wait on the autocomplete index to be rebuilt
+        assert client.get(reverse(views.get_autocomplete), {"q": "gob"}).json()["completions"] == ["goblin"]
+        update_autocomplete_index()
+        bump_catalog_generation()
+        assert client.get(reverse(views.get_autocomplete), {"q": "gob"}).json()["completions"] == []
+
+    @pytest.mark.parametrize(
+        "params",
+        [{}, {"q": "island", "limit": "a"}, {"q": "island", "limit": 0}, {"q": "island", "limit": 1000}],
+        ids=["query not specified", "invalid limit", "limit too small", "limit too large"],
+    )
+    def test_invalid_params(self, client, params):
+        response = client.get(reverse(views.get_autocomplete), params)
+        assert response.status_code == 400
+
+    def test_post_request(self, client):
+        response = client.post(reverse(views.get_autocomplete), {"q": "island"})
+        assert response.status_code == 400
+
+
 class TestNewCardsFirstPages:
     @pytest.fixture(autouse=True)
     def autouse_django_settings(self, django_settings):
@@ -1,10 +1,19 @@
+from django.conf import settings
 from django.urls import path
 
 from . import views
 
-urlpatterns = [
+# when enabled, these take precedence over the synchronous views for the same paths
+async_search_urlpatterns = [
+    path("3/editorSearch/", views.async_post_editor_search),  # type: ignore  # django-stubs does not accept async views
+    path("2/exploreSearch/", views.async_post_explore_search),  # type: ignore  # django-stubs does not accept async views
+    path("2/cardbacks/", views.async_post_cardbacks),  # type: ignore  # django-stubs does not accept async views
+]
+
+urlpatterns = (async_search_urlpatterns if settings.ASYNC_SEARCH_VIEWS else []) + [
     path("2/editorSearch/", views.old_post_editor_search),
     path("3/editorSearch/", views.post_editor_search),
+    path("3/editorSearchStream/", views.post_editor_search_stream),
     path("2/exploreSearch/", views.post_explore_search),
     path("2/cards/", views.post_cards),
     path("2/sources/", views.get_sources),
@@ -12,6 +21,7 @@ urlpatterns = [
     path("2/languages/", views.get_languages),
     path("2/tags/", views.get_tags),
     path("2/cardbacks/", views.post_cardbacks),
+    path("2/autocomplete/", views.get_autocomplete),
     path("2/importSites/", views.get_import_sites),
     path("2/importSiteDecklist/", views.post_import_site_decklist),
     path("2/sampleCards/", views.get_sample_cards),
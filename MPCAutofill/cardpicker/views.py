@@ -1,29 +1,54 @@
+import base64
 import itertools
 import json
 from collections import defaultdict
 from random import sample
-from typing import Any, Callable, TypeVar, Union, cast
+from typing import (
+    Any,
+    Awaitable,
+    Callable,
+    Iterator,
+    Optional,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
 
 import pycountry
-from elasticsearch_dsl.index import Index
+from asgiref.sync import markcoroutinefunction, sync_to_async
+from elasticsearch_dsl.response import Response
 from pydantic import ValidationError
 
 from django.conf import settings
 from django.db.models import Q
-from django.http import HttpRequest, HttpResponse, JsonResponse
+from django.http import HttpRequest, HttpResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 
 from cardpicker.constants import (
+    AUTOCOMPLETE_DEFAULT_LIMIT,
+    AUTOCOMPLETE_MAX_LIMIT,
     CARDS_PAGE_SIZE,
     DEFAULT_LANGUAGE,
     EDITOR_SEARCH_MAX_QUERIES,
+    EDITOR_SEARCH_STREAM_CHUNK_SIZE,
     EXPLORE_SEARCH_MAX_PAGE_SIZE,
     NSFW,
 )
 from cardpicker.documents import CardSearch
 from cardpicker.integrations.integrations import get_configured_game_integration
 from cardpicker.integrations.patreon import get_patreon_campaign_details, get_patrons
-from cardpicker.models import Card, CardTypes, DFCPair, Source, summarise_contributions
+from cardpicker.models import (
+    Card,
+    CardTypes,
+    DFCPair,
+    Source,
+    serialise_cards,
+    summarise_contributions,
+)
+from cardpicker.responses import SchemaResponse
+from cardpicker.schema_types import AutocompleteResponse
+from cardpicker.schema_types import Card as SerialisedCard
 from cardpicker.schema_types import CardbacksRequest, CardbacksResponse
 from cardpicker.schema_types import Cards as SampleCards
 from cardpicker.schema_types import (
@@ -53,22 +78,32 @@ from cardpicker.schema_types import (
     PatreonResponse,
     SampleCardsResponse,
     SearchEngineHealthResponse,
+    SearchQuery,
     SortBy,
     SourcesResponse,
     TagsResponse,
 )
+from cardpicker.search.async_search_functions import async_execute_search
+from cardpicker.search.autocomplete import get_autocomplete_index
+from cardpicker.search.backends.backends import get_configured_search_backend
+from cardpicker.search.backends.base import SearchBackend
+from cardpicker.search.caching import get_catalog_generation
 from cardpicker.search.search_functions import (
     SearchExceptions,
+    ensure_search_engine_is_available,
     get_new_cards_paginator,
     get_search,
-    ping_elasticsearch,
-    retrieve_card_identifiers,
+    get_serialised_cards,
     retrieve_cardback_identifiers,
+    search_engine_health,
+    search_serialised_cards,
 )
+from cardpicker.search.spelling import get_spelling_dictionary
 from cardpicker.tags import Tags
 
 # https://mypy.readthedocs.io/en/stable/generics.html#declaring-decorators
 F = TypeVar("F", bound=Callable[..., Any])
+AF = TypeVar("AF", bound=Callable[..., Awaitable[Any]])
 
 
 class BadRequestException(Exception):
@@ -81,63 +116,157 @@ class ErrorWrappers:
     to the user.
     """
 
+    @staticmethod
+    def to_error_response(e: Exception) -> tuple[ErrorResponse, int]:
+        """
+        Returns the error response and status code for exception `e`.
+        """
+
+        if isinstance(e, ValidationError):
+            # send pydantic validation errors to client
+            error = ErrorResponse(
+                name="Schema error/s",
+                message="See `errors` field for detailed breakdown.",
+                errors=[dict(item) for item in e.errors()],
+            )
+            return error, 400
+        if isinstance(e, SearchExceptions.ElasticsearchOfflineException):
+            return ErrorResponse(name="Search engine is offline", message=None), 500
+        if isinstance(e, BadRequestException):
+            return ErrorResponse(name="Bad request", message=e.args[0]), 400
+        # sentry_sdk.capture_exception(e)
+        return ErrorResponse(name=f"Unhandled {e.__class__.__name__}", message=str(e.args[0])), 500
+
     @staticmethod
     def to_json(func: F) -> F:
         def wrapper(*args: Any, **kwargs: Any) -> Union[F, HttpResponse]:
             try:
                 return func(*args, **kwargs)
-            except ValidationError as e:
-                # send pydantic validation errors to client
-                error = ErrorResponse(
-                    name="Schema error/s",
-                    message="See `errors` field for detailed breakdown.",
-                    errors=[dict(item) for item in e.errors()],
-                )
-                return JsonResponse(error.model_dump(), status=400)
-            except SearchExceptions.ElasticsearchOfflineException:
-                error = ErrorResponse(name="Search engine is offline", message=None)
-                return JsonResponse(error.model_dump(), status=500)
-            except BadRequestException as bad_request_exception:
-                error = ErrorResponse(name="Bad request", message=bad_request_exception.args[0])
-                return JsonResponse(error.model_dump(), status=400)
             except Exception as e:
-                # sentry_sdk.capture_exception(e)
-                error = ErrorResponse(name=f"Unhandled {e.__class__.__name__}", message=str(e.args[0]))
-                return JsonResponse(error.model_dump(), status=500)
+                error, status = ErrorWrappers.to_error_response(e)
+                return SchemaResponse(error, status=status)
 
         return cast(F, wrapper)
 
+    @staticmethod
+    def to_json_async(func: AF) -> AF:
+        """
+        The async equivalent of `to_json`.
+        """
 
-@csrf_exempt
-@ErrorWrappers.to_json
-def post_editor_search(request: HttpRequest) -> HttpResponse:
+        async def wrapper(*args: Any, **kwargs: Any) -> HttpResponse:
+            try:
+                return await func(*args, **kwargs)
+            except Exception as e:
+                error, status = ErrorWrappers.to_error_response(e)
+                return SchemaResponse(error, status=status)
+
+        return cast(AF, wrapper)
+
+
+def async_csrf_exempt(view_func: AF) -> AF:
+    """
+    `csrf_exempt` for async views. Django 4.2's `csrf_exempt` wraps views in a synchronous function, which would hide
+    that the view is a coroutine function.
+    """
+
+    return markcoroutinefunction(csrf_exempt(view_func))
+
+
+def parse_editor_search_request(request: HttpRequest) -> tuple[EditorSearchRequest, Type[SearchBackend]]:
     if request.method != "POST":
         raise BadRequestException("Expected POST request.")
 
     editor_search_request = EditorSearchRequest.model_validate(json.loads(request.body))
-    if not ping_elasticsearch():
-        raise SearchExceptions.ElasticsearchOfflineException()
-    if not Index(CardSearch.Index.name).exists():
-        raise SearchExceptions.IndexNotFoundException(CardSearch.__name__)
+    search_backend = get_configured_search_backend()
+    search_backend.ensure_available()
 
     if len(editor_search_request.queries) > EDITOR_SEARCH_MAX_QUERIES:
         raise BadRequestException(
             f"Invalid query count {len(editor_search_request.queries)}. "
             f"Must be less than or equal to {EDITOR_SEARCH_MAX_QUERIES}."
         )
+    return editor_search_request, search_backend
 
-    results: dict[str, list[str]] = {}
-    for hash_key, search_query in editor_search_request.queries.items():
-        if search_query.query is not None and hash_key not in results.keys():
-            hits = retrieve_card_identifiers(
-                search_settings=editor_search_request.searchSettings,
-                query=search_query.query,
-                card_type=search_query.cardType,
-                expansion_code=search_query.expansionCode,
-                collector_number=search_query.collectorNumber,
-            )
-            results[hash_key] = hits
-    return JsonResponse(EditorSearchResponse(results=results).model_dump())
+
+def get_editor_search_queries(editor_search_request: EditorSearchRequest) -> dict[str, SearchQuery]:
+    return {
+        hash_key: search_query
+        for hash_key, search_query in editor_search_request.queries.items()
+        if search_query.query is not None
+    }
+
+
+def get_editor_search_suggestions(
+    editor_search_request: EditorSearchRequest, queries: dict[str, SearchQuery], results: dict[str, list[str]]
+) -> Optional[dict[str, list[str]]]:
+    """
+    Suggest alternative names for each of `queries` which has no results, if the request asked for suggestions.
+    Suggestions are drawn from the whole catalog, so they aren't guaranteed to have results under the search settings.
+    """
+
+    if not editor_search_request.suggest:
+        return None
+    generation = get_catalog_generation()
+    return {
+        hash_key: get_spelling_dictionary(generation=generation, card_type=search_query.cardType).suggest(
+            search_query.query
+        )
+        for hash_key, search_query in queries.items()
+        if search_query.query and not results[hash_key]
+    }
+
+
+@csrf_exempt
+@ErrorWrappers.to_json
+def post_editor_search(request: HttpRequest) -> HttpResponse:
+    editor_search_request, search_backend = parse_editor_search_request(request)
+    queries = get_editor_search_queries(editor_search_request)
+    hits = search_backend.retrieve_card_identifiers_batch(
+        search_settings=editor_search_request.searchSettings, queries=list(queries.values())
+    )
+    results: dict[str, list[str]] = dict(zip(queries.keys(), hits))
+    suggestions = get_editor_search_suggestions(editor_search_request, queries=queries, results=results)
+    return SchemaResponse(
+        EditorSearchResponse(results=results, suggestions=suggestions),
+        exclude={"suggestions"} if suggestions is None else None,
+    )
+
+
+@csrf_exempt
+@ErrorWrappers.to_json
+def post_editor_search_stream(request: HttpRequest) -> StreamingHttpResponse:
+    """
+    Equivalent to `post_editor_search`, but the results are streamed as newline-delimited JSON so the client can
+    display each query's results as soon as they're ready. Each line is an `EditorSearchResponse` containing the
+    results of a single query. If an error occurs after the response has started streaming, the final line is an
+    `ErrorResponse`.
+    """
+
+    editor_search_request, search_backend = parse_editor_search_request(request)
+    queries = list(get_editor_search_queries(editor_search_request).items())
+
+    def stream() -> Iterator[str]:
+        try:
+            for i in range(0, len(queries), EDITOR_SEARCH_STREAM_CHUNK_SIZE):
+                chunk = queries[i : i + EDITOR_SEARCH_STREAM_CHUNK_SIZE]
+                hits = search_backend.retrieve_card_identifiers_batch(
+                    search_settings=editor_search_request.searchSettings,
+                    queries=[search_query for _, search_query in chunk],
+                )
+                for (hash_key, search_query), identifiers in zip(chunk, hits):
+                    results = {hash_key: identifiers}
+                    suggestions = get_editor_search_suggestions(
+                        editor_search_request, queries={hash_key: search_query}, results=results
+                    )
+                    yield EditorSearchResponse(results=results, suggestions=suggestions or None).model_dump_json(
+                        exclude_none=True
+                    ) + "\n"
+        except Exception as e:
+            error, _ = ErrorWrappers.to_error_response(e)
+            yield error.model_dump_json() + "\n"
+
+    return StreamingHttpResponse(stream(), content_type="application/x-ndjson")
 
 
 @csrf_exempt
@@ -159,10 +288,8 @@ def old_post_editor_search(request: HttpRequest) -> HttpResponse:
         raise BadRequestException("Expected POST request.")
 
     editor_search_request = OldEditorSearchRequest.model_validate(json.loads(request.body))
-    if not ping_elasticsearch():
-        raise SearchExceptions.ElasticsearchOfflineException()
-    if not Index(CardSearch.Index.name).exists():
-        raise SearchExceptions.IndexNotFoundException(CardSearch.__name__)
+    search_backend = get_configured_search_backend()
+    search_backend.ensure_available()
 
     if len(editor_search_request.queries) > EDITOR_SEARCH_MAX_QUERIES:
         raise BadRequestException(
@@ -173,16 +300,40 @@ def old_post_editor_search(request: HttpRequest) -> HttpResponse:
     results: dict[str, dict[str, list[str]]] = defaultdict(dict)
     for query, card_type in sorted({(item.query, item.cardType) for item in editor_search_request.queries}):
         if query is not None and results[query].get(card_type.value, None) is None:
-            hits = retrieve_card_identifiers(
+            hits = search_backend.retrieve_card_identifiers(
                 query=query, card_type=card_type, search_settings=editor_search_request.searchSettings
             )
             results[query][card_type.value] = hits
-    return JsonResponse(OldEditorSearchResponse(results=results).model_dump())
+    return SchemaResponse(OldEditorSearchResponse(results=results))
 
 
-@csrf_exempt
-@ErrorWrappers.to_json
-def post_explore_search(request: HttpRequest) -> HttpResponse:
+def serialise_cards_from_database(card_identifiers: list[str]) -> dict[str, SerialisedCard]:
+    if not card_identifiers:
+        return {}
+    return {card.identifier: card for card in serialise_cards(Card.objects.filter(identifier__in=card_identifiers))}
+
+
+def encode_explore_search_cursor(sort_by: SortBy, search_after: list[Any]) -> str:
+    """
+    Explore search cursors are opaque to the frontend. They hold the sort values of the last hit on a page.
+    """
+
+    return base64.urlsafe_b64encode(json.dumps({"sortBy": sort_by, "searchAfter": search_after}).encode()).decode()
+
+
+def decode_explore_search_cursor(cursor: str, sort_by: SortBy, sort_key_count: int) -> list[Any]:
+    try:
+        decoded = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        search_after = decoded["searchAfter"]
+        cursor_sort_by = decoded["sortBy"]
+    except (ValueError, TypeError, KeyError):
+        raise BadRequestException("Invalid cursor.")
+    if cursor_sort_by != sort_by or not isinstance(search_after, list) or len(search_after) != sort_key_count:
+        raise BadRequestException("Invalid cursor. Cursors can only be used with the sort order which produced them.")
+    return search_after
+
+
+def parse_explore_search_request(request: HttpRequest) -> ExploreSearchRequest:
     if request.method != "POST":
         raise BadRequestException("Expected POST request.")
 
@@ -193,11 +344,10 @@ def post_explore_search(request: HttpRequest) -> HttpResponse:
         raise BadRequestException(
             f"Invalid page size {explore_search_request.pageSize}. Must be less than or equal to {EXPLORE_SEARCH_MAX_PAGE_SIZE}."
         )
-    if not ping_elasticsearch():
-        raise SearchExceptions.ElasticsearchOfflineException()
-    if not Index(CardSearch.Index.name).exists():
-        raise SearchExceptions.IndexNotFoundException(CardSearch.__name__)
+    return explore_search_request
+
 
+def get_explore_search(explore_search_request: ExploreSearchRequest) -> CardSearch:
     sort: dict[str, dict[str, str]] = {
         SortBy.nameAscending: {"searchq_keyword": {"order": "asc"}},
         SortBy.nameDescending: {"searchq_keyword": {"order": "desc"}},
@@ -206,23 +356,61 @@ def post_explore_search(request: HttpRequest) -> HttpResponse:
         SortBy.dateModifiedAscending: {"date_modified": {"order": "asc"}, "searchq_keyword": {"order": "asc"}},
         SortBy.dateModifiedDescending: {"date_modified": {"order": "desc"}, "searchq_keyword": {"order": "asc"}},
     }[explore_search_request.sortBy]
-
-    s = get_search(
-        search_settings=explore_search_request.searchSettings,
-        query=explore_search_request.query,
-        card_types=explore_search_request.cardTypes,
-    ).sort(sort)
-    count = s.extra(track_total_hits=True).count()
-
-    s_sliced = s[explore_search_request.pageStart : explore_search_request.pageStart + explore_search_request.pageSize]
-    card_ids = [man.identifier for man in s_sliced.execute()]
-    # TODO: the below code feels inefficient but is set up this way to ensure sorting from elasticsearch is respected.
-    card_id_object_dict = {
-        card.identifier: card.serialise()
-        for card in (Card.objects.select_related("source", "canonical_card").filter(identifier__in=card_ids))
-    }
+    # identifiers are unique, so breaking ties with them gives every hit a distinct position to resume from
+    sort = sort | {"identifier": {"order": "asc"}}
+
+    s = (
+        get_search(
+            search_settings=explore_search_request.searchSettings,
+            query=explore_search_request.query,
+            card_types=explore_search_request.cardTypes,
+        )
+        .sort(sort)
+        .extra(track_total_hits=True, size=explore_search_request.pageSize)
+    )
+    if explore_search_request.cursor is not None:
+        # resuming from the previous page's last hit is as cheap as fetching the first page, however deep it is
+        s = s.extra(
+            search_after=decode_explore_search_cursor(
+                cursor=explore_search_request.cursor, sort_by=explore_search_request.sortBy, sort_key_count=len(sort)
+            )
+        )
+    else:
+        s = s.extra(from_=explore_search_request.pageStart)
+    if settings.SERIALISED_CARDS_IN_SEARCH_ENGINE:
+        s = s.source(fields=["identifier", "serialised"])
+    return s
+
+
+def get_explore_search_response(explore_search_request: ExploreSearchRequest, response: Response) -> HttpResponse:
+    card_ids = [man.identifier for man in response]
+    card_id_object_dict = get_serialised_cards(response) if settings.SERIALISED_CARDS_IN_SEARCH_ENGINE else {}
+    # documents indexed before serialised cards were stored in the search engine are served from the database
+    card_id_object_dict |= serialise_cards_from_database(
+        card_identifiers=[card_id for card_id in card_ids if card_id not in card_id_object_dict]
+    )
     cards = [card_id_object_dict[card_id] for card_id in card_ids]
-    return JsonResponse(ExploreSearchResponse(cards=cards, count=count).model_dump())
+    cursor = (
+        encode_explore_search_cursor(
+            sort_by=explore_search_request.sortBy, search_after=list(response.hits[-1].meta.sort)
+        )
+        if len(response.hits) == explore_search_request.pageSize
+        else None
+    )
+    # the cursor is omitted on the last page
+    return SchemaResponse(
+        ExploreSearchResponse(cards=cards, count=response.hits.total.value, cursor=cursor),
+        exclude={"cursor"} if cursor is None else None,
+    )
+
+
+@csrf_exempt
+@ErrorWrappers.to_json
+def post_explore_search(request: HttpRequest) -> HttpResponse:
+    explore_search_request = parse_explore_search_request(request)
+    ensure_search_engine_is_available()
+    response = get_explore_search(explore_search_request).execute()  # hits and total hit count are retrieved together
+    return get_explore_search_response(explore_search_request=explore_search_request, response=response)
 
 
 @csrf_exempt
@@ -238,13 +426,16 @@ def post_cards(request: HttpRequest) -> HttpResponse:
             f"Must be less than or equal to {CARDS_PAGE_SIZE}."
         )
 
-    results = {
-        card.identifier: card.serialise()
-        for card in Card.objects.select_related("source", "canonical_card").filter(
-            identifier__in=cards_request.cardIdentifiers
-        )
-    }
-    return JsonResponse(CardsResponse(results=results).model_dump())
+    results: dict[str, SerialisedCard] = {}
+    if settings.SERIALISED_CARDS_IN_SEARCH_ENGINE:
+        try:
+            results = search_serialised_cards(card_identifiers=cards_request.cardIdentifiers)
+        except (SearchExceptions.ConnectionTimedOutException, SearchExceptions.IndexNotFoundException):
+            pass  # the database can serve every card on its own
+    results |= serialise_cards_from_database(
+        card_identifiers=[identifier for identifier in cards_request.cardIdentifiers if identifier not in results]
+    )
+    return SchemaResponse(CardsResponse(results=results))
 
 
 @csrf_exempt
@@ -258,7 +449,7 @@ def get_sources(request: HttpRequest) -> HttpResponse:
         raise BadRequestException("Expected GET request.")
 
     results = {str(source.pk): source.serialise() for source in Source.objects.order_by("ordinal", "pk")}
-    return JsonResponse(SourcesResponse(results=results).model_dump())
+    return SchemaResponse(SourcesResponse(results=results))
 
 
 @csrf_exempt
@@ -272,7 +463,7 @@ def get_dfc_pairs(request: HttpRequest) -> HttpResponse:
         raise BadRequestException("Expected GET request.")
 
     dfc_pairs = {x.front: x.back for x in DFCPair.objects.all()}
-    return JsonResponse(DFCPairsResponse(dfcPairs=dfc_pairs).model_dump())
+    return SchemaResponse(DFCPairsResponse(dfcPairs=dfc_pairs))
 
 
 @csrf_exempt
@@ -284,7 +475,7 @@ def get_languages(request: HttpRequest) -> HttpResponse:
 
     if request.method != "GET":
         raise BadRequestException("Expected GET request.")
-    return JsonResponse(
+    return SchemaResponse(
         LanguagesResponse(
             languages=sorted(
                 [
@@ -295,7 +486,7 @@ def get_languages(request: HttpRequest) -> HttpResponse:
                 # sort like this so DEFAULT_LANGUAGE is first, then the rest of the languages are in alphabetical order
                 key=lambda language: "-" if language.code == DEFAULT_LANGUAGE.alpha_2 else language.name,
             )
-        ).model_dump()
+        )
     )
 
 
@@ -308,10 +499,10 @@ def get_tags(request: HttpRequest) -> HttpResponse:
 
     if request.method != "GET":
         raise BadRequestException("Expected GET request.")
-    return JsonResponse(
+    return SchemaResponse(
         TagsResponse(
             tags=sorted([tag.serialise() for tag in Tags().tags.values() if tag.parent is None], key=lambda x: x.name)
-        ).model_dump()
+        )
     )
 
 
@@ -327,7 +518,80 @@ def post_cardbacks(request: HttpRequest) -> HttpResponse:
 
     cardbacks_request = CardbacksRequest.model_validate(json.loads(request.body))
     cardbacks = retrieve_cardback_identifiers(search_settings=cardbacks_request.searchSettings)
-    return JsonResponse(CardbacksResponse(cardbacks=cardbacks).model_dump())
+    return SchemaResponse(CardbacksResponse(cardbacks=cardbacks))
+
+
+@csrf_exempt
+@ErrorWrappers.to_json
+def get_autocomplete(request: HttpRequest) -> HttpResponse:
+    """
+    Return the names in the catalog which start with the query `q`, for typeahead as the user types a card name.
+    At most `limit` names are returned.
+    """
+
+    if request.method != "GET":
+        raise BadRequestException("Expected GET request.")
+
+    query = request.GET.get("q")
+    if query is None:
+        raise BadRequestException("Query not specified.")
+    try:
+        limit = int(request.GET.get("limit", AUTOCOMPLETE_DEFAULT_LIMIT))
+    except ValueError:
+        raise BadRequestException("Invalid limit specified.")
+    if not (AUTOCOMPLETE_MAX_LIMIT >= limit > 0):
+        raise BadRequestException(f"Invalid limit {limit} specified - must be between 1 and {AUTOCOMPLETE_MAX_LIMIT}.")
+
+    index = get_autocomplete_index(generation=get_catalog_generation())
+    return SchemaResponse(AutocompleteResponse(completions=index.complete(prefix=query, limit=limit)))
+
+
+# region async search views
+# these are used in place of the equivalent synchronous views when `settings.ASYNC_SEARCH_VIEWS` is enabled.
+# they only help when served under ASGI, where a worker can handle other requests while waiting on the search engine.
+
+
+@async_csrf_exempt
+@ErrorWrappers.to_json_async
+async def async_post_editor_search(request: HttpRequest) -> HttpResponse:
+    editor_search_request, search_backend = await sync_to_async(parse_editor_search_request)(request)
+    queries = get_editor_search_queries(editor_search_request)
+    hits = await search_backend.async_retrieve_card_identifiers_batch(
+        search_settings=editor_search_request.searchSettings, queries=list(queries.values())
+    )
+    results: dict[str, list[str]] = dict(zip(queries.keys(), hits))
+    suggestions = await sync_to_async(get_editor_search_suggestions)(
+        editor_search_request, queries=queries, results=results
+    )
+    return SchemaResponse(
+        EditorSearchResponse(results=results, suggestions=suggestions),
+        exclude={"suggestions"} if suggestions is None else None,
+    )
+
+
+@async_csrf_exempt
+@ErrorWrappers.to_json_async
+async def async_post_explore_search(request: HttpRequest) -> HttpResponse:
+    explore_search_request = parse_explore_search_request(request)
+    await sync_to_async(ensure_search_engine_is_available)()
+    response = await async_execute_search(get_explore_search(explore_search_request))
+    return await sync_to_async(get_explore_search_response)(
+        explore_search_request=explore_search_request, response=response
+    )
+
+
+@async_csrf_exempt
+@ErrorWrappers.to_json_async
+async def async_post_cardbacks(request: HttpRequest) -> HttpResponse:
+    if request.method != "POST":
+        raise BadRequestException("Expected POST request.")
+
+    cardbacks_request = CardbacksRequest.model_validate(json.loads(request.body))
+    cardbacks = await sync_to_async(retrieve_cardback_identifiers)(search_settings=cardbacks_request.searchSettings)
+    return SchemaResponse(CardbacksResponse(cardbacks=cardbacks))
+
+
+# endregion
 
 
 @csrf_exempt
@@ -342,13 +606,13 @@ def get_import_sites(request: HttpRequest) -> HttpResponse:
 
     game_integration = get_configured_game_integration()
     if game_integration is None:
-        return JsonResponse(ImportSitesResponse(importSites=[]).model_dump())
+        return SchemaResponse(ImportSitesResponse(importSites=[]))
 
     import_sites = [
         ImportSite(name=site.__name__, url=f"https://{site.get_host_names()[0]}")
         for site in game_integration.get_import_sites()
     ]
-    return JsonResponse(ImportSitesResponse(importSites=import_sites).model_dump())
+    return SchemaResponse(ImportSitesResponse(importSites=import_sites))
 
 
 @csrf_exempt
@@ -370,7 +634,7 @@ def post_import_site_decklist(request: HttpRequest) -> HttpResponse:
         decklist = game_integration.query_import_site(url=import_site_decklist_request.url)
         if decklist is None:
             raise BadRequestException("The specified decklist URL does not match any known import sites.")
-        return JsonResponse(ImportSiteDecklistResponse(cards=decklist).model_dump())
+        return SchemaResponse(ImportSiteDecklistResponse(cards=decklist))
     except ValueError as e:
         raise BadRequestException(str(e))
 
@@ -406,12 +670,7 @@ def get_sample_cards(request: HttpRequest) -> HttpResponse:
     ]
 
     # retrieve the full ORM objects for the selected identifiers and group by type
-    cards = [
-        card.serialise()
-        for card in Card.objects.select_related("source", "canonical_card")
-        .filter(pk__in=selected_identifiers)
-        .order_by("card_type")
-    ]
+    cards = serialise_cards(Card.objects.filter(pk__in=selected_identifiers).order_by("card_type"))
     cards_by_type = {
         card_type: list(grouped_cards_iterable)
         for card_type, grouped_cards_iterable in itertools.groupby(cards, key=lambda x: x.cardType)
@@ -420,7 +679,7 @@ def get_sample_cards(request: HttpRequest) -> HttpResponse:
     sample_cards_response = SampleCardsResponse(
         cards=SampleCards(**({CardTypes.CARD: [], CardTypes.CARDBACK: [], CardTypes.TOKEN: []} | cards_by_type))
     )
-    return JsonResponse(sample_cards_response.model_dump())
+    return SchemaResponse(sample_cards_response)
 
 
 @csrf_exempt
@@ -435,10 +694,10 @@ def get_contributions(request: HttpRequest) -> HttpResponse:
         raise BadRequestException("Expected GET request.")
 
     sources, card_count_by_type, total_database_size = summarise_contributions()
-    return JsonResponse(
+    return SchemaResponse(
         ContributionsResponse(
             sources=sources, cardCountByType=card_count_by_type, totalDatabaseSize=total_database_size
-        ).model_dump()
+        )
     )
 
 
@@ -456,9 +715,9 @@ def get_new_cards_first_pages(request: HttpRequest) -> HttpResponse:
                 source=source.serialise(),
                 hits=paginator.count,
                 pages=paginator.num_pages,
-                cards=[card.serialise() for card in paginator.get_page(1).object_list],
+                cards=serialise_cards(paginator.get_page(1).object_list),
             )
-    return JsonResponse(NewCardsFirstPagesResponse(results=results).model_dump())
+    return SchemaResponse(NewCardsFirstPagesResponse(results=results))
 
 
 @csrf_exempt
@@ -486,9 +745,7 @@ def get_new_cards_page(request: HttpRequest) -> HttpResponse:
                 f"Invalid page {page_int} specified - must be between 1 and {paginator.num_pages} "
                 f"for source {source_key}."
             )
-        return JsonResponse(
-            NewCardsPageResponse(cards=[card.serialise() for card in paginator.page(page).object_list]).model_dump()
-        )
+        return SchemaResponse(NewCardsPageResponse(cards=serialise_cards(paginator.page(page).object_list)))
     except ValueError:
         raise BadRequestException("Invalid page specified.")
 
@@ -504,7 +761,7 @@ def get_info(request: HttpRequest) -> HttpResponse:
     if request.method != "GET":
         raise BadRequestException("Expected GET request.")
 
-    return JsonResponse(
+    return SchemaResponse(
         InfoResponse(
             info=Info(
                 name=settings.SITE_NAME,
@@ -513,7 +770,7 @@ def get_info(request: HttpRequest) -> HttpResponse:
                 reddit=settings.REDDIT,
                 discord=settings.DISCORD,
             )
-        ).model_dump()
+        )
     )
 
 
@@ -526,7 +783,7 @@ def get_patreon(request: HttpRequest) -> HttpResponse:
     campaign, tiers = get_patreon_campaign_details()
     members = get_patrons(campaign.id, tiers) if campaign is not None and tiers is not None else None
 
-    return JsonResponse(
+    return SchemaResponse(
         PatreonResponse(
             patreon=Patreon(
                 url=settings.PATREON_URL,
@@ -534,7 +791,7 @@ def get_patreon(request: HttpRequest) -> HttpResponse:
                 tiers=tiers,
                 campaign=campaign,
             )
-        ).model_dump()
+        )
     )
 
 
@@ -544,4 +801,4 @@ def get_search_engine_health(request: HttpRequest) -> HttpResponse:
     if request.method != "GET":
         raise BadRequestException("Expected GET request.")
 
-    return JsonResponse(SearchEngineHealthResponse(online=ping_elasticsearch()).model_dump())
+    return SchemaResponse(SearchEngineHealthResponse(online=search_engine_health.get_status()[0]))
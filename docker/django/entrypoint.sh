@@ -20,6 +20,9 @@ done
 # Gather static files
 python3 manage.py collectstatic --noinput
 
+# Create the catalog cache table (this does nothing if it already exists)
+python3 manage.py createcachetable
+
 # Check if we are running for the first time
 if ! python3 manage.py migrate --check; then
     # Run migrations and populate database
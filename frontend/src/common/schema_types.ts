@@ -2,7 +2,7 @@
 
 // To parse this data:
 //
-//   import { Convert, Campaign, CanonicalArtist, CanonicalCard, Card, CardType, FilterSettings, Game, ImportSite, Language, NewCardsFirstPage, SearchQuery, SearchSettings, SearchTypeSettings, SortBy, Source, SourceContribution, SourceSettings, SourceType, Supporter, SupporterTier, Tag, CardbacksRequest, CardbacksResponse, CardsRequest, CardsResponse, ContributionsResponse, DFCPairsResponse, EditorSearchRequest, EditorSearchResponse, ErrorResponse, ExploreSearchRequest, ExploreSearchResponse, ImportSiteDecklistRequest, ImportSiteDecklistResponse, ImportSitesResponse, InfoResponse, LanguagesResponse, NewCardsFirstPagesResponse, NewCardsPageResponse, OldEditorSearchRequest, OldEditorSearchResponse, PatreonResponse, SampleCardsResponse, SearchEngineHealthResponse, SourcesResponse, TagsResponse } from "./file";
+//   import { Convert, Campaign, CanonicalArtist, CanonicalCard, Card, CardType, FilterSettings, Game, ImportSite, Language, NewCardsFirstPage, SearchQuery, SearchSettings, SearchTypeSettings, SortBy, Source, SourceContribution, SourceSettings, SourceType, Supporter, SupporterTier, Tag, AutocompleteResponse, CardbacksRequest, CardbacksResponse, CardsRequest, CardsResponse, ContributionsResponse, DFCPairsResponse, EditorSearchRequest, EditorSearchResponse, ErrorResponse, ExploreSearchRequest, ExploreSearchResponse, ImportSiteDecklistRequest, ImportSiteDecklistResponse, ImportSitesResponse, InfoResponse, LanguagesResponse, NewCardsFirstPagesResponse, NewCardsPageResponse, OldEditorSearchRequest, OldEditorSearchResponse, PatreonResponse, SampleCardsResponse, SearchEngineHealthResponse, SourcesResponse, TagsResponse } from "./file";
 //
 //   const campaign = Convert.toCampaign(json);
 //   const canonicalArtist = Convert.toCanonicalArtist(json);
@@ -26,6 +26,7 @@
 //   const supporter = Convert.toSupporter(json);
 //   const supporterTier = Convert.toSupporterTier(json);
 //   const tag = Convert.toTag(json);
+//   const autocompleteResponse = Convert.toAutocompleteResponse(json);
 //   const cardbacksRequest = Convert.toCardbacksRequest(json);
 //   const cardbacksResponse = Convert.toCardbacksResponse(json);
 //   const cardsRequest = Convert.toCardsRequest(json);
@@ -59,6 +60,10 @@ export enum Game {
   Mtg = "MTG",
 }
 
+export interface AutocompleteResponse {
+  completions: string[];
+}
+
 export interface CardbacksRequest {
   searchSettings: SearchSettings;
 }
@@ -209,6 +214,10 @@ export interface DFCPairsResponse {
 export interface EditorSearchRequest {
   queries: { [key: string]: SearchQuery };
   searchSettings: SearchSettings;
+  /**
+   * Whether to suggest alternative names for queries which have no results.
+   */
+  suggest?: boolean;
 }
 
 export interface SearchQuery {
@@ -220,6 +229,10 @@ export interface SearchQuery {
 
 export interface EditorSearchResponse {
   results: { [key: string]: string[] };
+  /**
+   * Alternative names for each query which has no results. Only included when requested.
+   */
+  suggestions?: { [key: string]: string[] };
 }
 
 export interface ErrorResponse {
@@ -230,6 +243,11 @@ export interface ErrorResponse {
 
 export interface ExploreSearchRequest {
   cardTypes: CardType[];
+  /**
+   * The cursor returned with the previous page of results. When specified, `pageStart` is
+   * ignored.
+   */
+  cursor?: string;
   pageSize: number;
   pageStart: number;
   query: null | string;
@@ -249,6 +267,11 @@ export enum SortBy {
 export interface ExploreSearchResponse {
   cards: Card[];
   count: number;
+  /**
+   * Pass this in the next request to retrieve the following page of results. Omitted on the
+   * last page.
+   */
+  cursor?: string;
 }
 
 export interface ImportSiteDecklistRequest {
@@ -577,6 +600,16 @@ export class Convert {
     return JSON.stringify(uncast(value, r("Tag")), null, 2);
   }
 
+  public static toAutocompleteResponse(json: string): AutocompleteResponse {
+    return cast(JSON.parse(json), r("AutocompleteResponse"));
+  }
+
+  public static autocompleteResponseToJson(
+    value: AutocompleteResponse
+  ): string {
+    return JSON.stringify(uncast(value, r("AutocompleteResponse")), null, 2);
+  }
+
   public static toCardbacksRequest(json: string): CardbacksRequest {
     return cast(JSON.parse(json), r("CardbacksRequest"));
   }
@@ -1009,6 +1042,10 @@ function r(name: string) {
 }
 
 const typeMap: any = {
+  AutocompleteResponse: o(
+    [{ json: "completions", js: "completions", typ: a("") }],
+    false
+  ),
   CardbacksRequest: o(
     [
       {
@@ -1164,6 +1201,7 @@ const typeMap: any = {
         js: "searchSettings",
         typ: r("SearchSettings"),
       },
+      { json: "suggest", js: "suggest", typ: u(undefined, true) },
     ],
     false
   ),
@@ -1177,7 +1215,10 @@ const typeMap: any = {
     false
   ),
   EditorSearchResponse: o(
-    [{ json: "results", js: "results", typ: m(a("")) }],
+    [
+      { json: "results", js: "results", typ: m(a("")) },
+      { json: "suggestions", js: "suggestions", typ: u(undefined, m(a(""))) },
+    ],
     false
   ),
   ErrorResponse: o(
@@ -1191,6 +1232,7 @@ const typeMap: any = {
   ExploreSearchRequest: o(
     [
       { json: "cardTypes", js: "cardTypes", typ: a(r("CardType")) },
+      { json: "cursor", js: "cursor", typ: u(undefined, "") },
       { json: "pageSize", js: "pageSize", typ: 0 },
       { json: "pageStart", js: "pageStart", typ: 0 },
       { json: "query", js: "query", typ: u(null, "") },
@@ -1207,6 +1249,7 @@ const typeMap: any = {
     [
       { json: "cards", js: "cards", typ: a(r("Card")) },
       { json: "count", js: "count", typ: 0 },
+      { json: "cursor", js: "cursor", typ: u(undefined, "") },
     ],
     false
   ),